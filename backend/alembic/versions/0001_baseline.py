@@ -0,0 +1,89 @@
+"""Baseline schema: vendors and items
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+Databases created before migrations existed (via ``create_all``) already
+have these tables; they are left as they are, so ``alembic upgrade head``
+works on both fresh and existing databases.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ITEM_FLAGS = (
+    "vegetarian", "pescetarian", "vegan", "keto", "organic", "gmo_free", "locally_sourced", "raw",
+    "kosher", "halal", "beef", "chicken", "pork", "seafood", "no_pork_products", "no_red_meat",
+    "no_milk", "no_eggs", "no_fish", "no_shellfish", "no_peanuts", "no_treenuts", "gluten_free",
+    "no_soy", "no_sesame", "no_msg", "no_alliums", "low_sugar", "high_protein", "low_carb",
+    "entree", "sweet",
+)
+
+VENDOR_FLAGS = (
+    "delivery", "takeout", "grubhub", "doordash", "ubereats", "postmates", "yelp", "google_reviews",
+    "tripadvisor", "custom_by_nature", "cuisine_usa", "cuisine_europe",
+    "cuisine_north_africa_middle_east", "cuisine_mexico_south_america", "cuisine_sub_saharan_africa",
+    "cuisine_east_asia", "fusion",
+)
+
+# Single-column indexes of the original models
+ITEM_FLAG_INDEXES = ("vegetarian", "vegan", "keto", "gluten_free")
+
+
+def _timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    ]
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "vendors" not in existing:
+        op.create_table(
+            "vendors",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(255), nullable=False),
+            sa.Column("address", sa.Text()),
+            sa.Column("zipcode", sa.Integer()),
+            sa.Column("phone", sa.String(20)),
+            sa.Column("website", sa.Text()),
+            sa.Column("hours", sa.Text()),
+            sa.Column("seo_tags", sa.Text()),
+            sa.Column("lat", sa.Float(), nullable=False),
+            sa.Column("lng", sa.Float(), nullable=False),
+            sa.Column("region", sa.Integer()),
+            *(sa.Column(flag, sa.Boolean()) for flag in VENDOR_FLAGS),
+            *_timestamps(),
+        )
+        for column in ("id", "name", "lat", "lng"):
+            op.create_index(f"ix_vendors_{column}", "vendors", [column])
+
+    if "items" not in existing:
+        op.create_table(
+            "items",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("vendor_id", sa.Integer(), sa.ForeignKey("vendors.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("name", sa.String(255), nullable=False),
+            sa.Column("price", sa.Float()),
+            sa.Column("pictures", sa.Text()),
+            *(sa.Column(flag, sa.Boolean()) for flag in ITEM_FLAGS),
+            sa.Column("upvotes", sa.Integer()),
+            sa.Column("total_votes", sa.Integer()),
+            *_timestamps(),
+        )
+        for column in ("id", "vendor_id", *ITEM_FLAG_INDEXES):
+            op.create_index(f"ix_items_{column}", "items", [column])
+
+
+def downgrade() -> None:
+    op.drop_table("items")
+    op.drop_table("vendors")
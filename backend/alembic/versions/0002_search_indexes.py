@@ -0,0 +1,75 @@
+"""Composite and partial indexes for the search queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:30:00.000000
+
+Replaces the single-column location, vendor_id and dietary flag indexes
+with indexes matching the VendorService search predicates:
+
+- vendors (lat, lng): the distance bounding box
+- items (vendor_id, price): loading menus (vendor_id IN ...) and max
+  price filters within a vendor
+- items (vendor_id, price) WHERE <flag>: the most-selected dietary
+  preferences; a boolean column on its own is too unselective to index
+
+Index operations check what exists first, so the migration also applies
+to databases whose tables were created from the current models.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXED_FLAGS = ("vegetarian", "vegan", "keto", "gluten_free")
+
+OLD_INDEXES = {
+    "vendors": [("ix_vendors_lat", ["lat"]), ("ix_vendors_lng", ["lng"])],
+    "items": [("ix_items_vendor_id", ["vendor_id"])] + [(f"ix_items_{flag}", [flag]) for flag in INDEXED_FLAGS],
+}
+
+NEW_INDEXES = {
+    "vendors": [("ix_vendors_lat_lng", ["lat", "lng"], None)],
+    "items": [("ix_items_vendor_id_price", ["vendor_id", "price"], None)] + [
+        (f"ix_items_vendor_price_{flag}", ["vendor_id", "price"], flag) for flag in INDEXED_FLAGS
+    ],
+}
+
+
+def _existing_indexes(table: str) -> set:
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _create(table: str, name: str, columns, flag) -> None:
+    kwargs = {}
+    if flag:
+        predicate = sa.literal_column(flag) == sa.true()
+        kwargs = {"postgresql_where": predicate, "sqlite_where": predicate}
+    op.create_index(name, table, columns, **kwargs)
+
+
+def upgrade() -> None:
+    for table in ("vendors", "items"):
+        existing = _existing_indexes(table)
+        for name, columns, flag in NEW_INDEXES[table]:
+            if name not in existing:
+                _create(table, name, columns, flag)
+        for name, _ in OLD_INDEXES[table]:
+            if name in existing:
+                op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    for table in ("vendors", "items"):
+        existing = _existing_indexes(table)
+        for name, columns in OLD_INDEXES[table]:
+            if name not in existing:
+                op.create_index(name, table, columns)
+        for name, _, _ in NEW_INDEXES[table]:
+            if name in existing:
+                op.drop_index(name, table_name=table)
@@ -0,0 +1,85 @@
+"""Item groups: per-vendor summaries of items sharing a dietary profile
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 10:00:00.000000
+
+Creates item_groups and fills it from the existing items (the application
+keeps it up to date from then on, see ItemGroupService). The table is left
+alone if it already exists, e.g. created from the current models.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+# Bit i of item_groups.flags is FLAG_BITS[i] (app.models.item_group.FLAG_BITS
+# when this migration was written)
+FLAG_BITS = (
+    "vegetarian", "pescetarian", "vegan", "keto", "organic", "gmo_free", "locally_sourced", "raw",
+    "kosher", "halal", "beef", "chicken", "pork", "seafood", "no_pork_products", "no_red_meat",
+    "no_milk", "no_eggs", "no_fish", "no_shellfish", "no_peanuts", "no_treenuts", "gluten_free",
+    "no_soy", "no_sesame", "no_msg", "no_alliums", "low_sugar", "high_protein", "low_carb",
+    "entree", "sweet",
+)
+
+
+def _backfill() -> None:
+    items = sa.table(
+        "items",
+        sa.column("vendor_id"), sa.column("price"), sa.column("upvotes"), sa.column("total_votes"),
+        *(sa.column(flag, sa.Boolean) for flag in FLAG_BITS)
+    )
+    groups = sa.table(
+        "item_groups",
+        *(sa.column(name) for name in
+          ("vendor_id", "flags", "min_price", "max_price", "item_count", "upvotes", "total_votes"))
+    )
+    mask = sum(
+        (sa.case((items.c[flag] == sa.true(), sa.literal(1 << bit)), else_=sa.literal(0))
+         for bit, flag in enumerate(FLAG_BITS)),
+        sa.literal(0)
+    )
+    unpriced = sa.case((items.c.price.is_(None), 1), else_=0)
+    summary = sa.select(
+        items.c.vendor_id,
+        mask,
+        sa.func.min(items.c.price),
+        sa.func.max(items.c.price),
+        sa.func.count(),
+        sa.func.coalesce(sa.func.sum(items.c.upvotes), 0),
+        sa.func.coalesce(sa.func.sum(items.c.total_votes), 0),
+    ).group_by(items.c.vendor_id, mask, unpriced)
+    op.execute(groups.insert().from_select(
+        ["vendor_id", "flags", "min_price", "max_price", "item_count", "upvotes", "total_votes"], summary
+    ))
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("item_groups"):
+        return
+    op.create_table(
+        "item_groups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("vendor_id", sa.Integer(), nullable=False),
+        sa.Column("flags", sa.BigInteger(), nullable=False),
+        sa.Column("min_price", sa.Float(), nullable=True),
+        sa.Column("max_price", sa.Float(), nullable=True),
+        sa.Column("item_count", sa.Integer(), nullable=False),
+        sa.Column("upvotes", sa.Integer(), nullable=False),
+        sa.Column("total_votes", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["vendor_id"], ["vendors.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_item_groups_vendor_id", "item_groups", ["vendor_id"])
+    _backfill()
+
+
+def downgrade() -> None:
+    op.drop_index("ix_item_groups_vendor_id", table_name="item_groups")
+    op.drop_table("item_groups")
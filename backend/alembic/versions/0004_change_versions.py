@@ -0,0 +1,88 @@
+"""Change versions and tombstones for delta sync
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 12:00:00.000000
+
+Adds vendors.change_version and items.change_version, the catalog_state
+counter and the tombstones table (the application maintains them from then
+on, see SyncService). Existing rows get distinct versions after the current
+time in microseconds, so any earlier sync state is treated as a replaced
+catalog. Parts that already exist, e.g. created from the current models,
+are left alone.
+"""
+import time
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def _add_change_version(inspector, table: str) -> bool:
+    """Add table.change_version and its index; False if it was already there."""
+    if any(column["name"] == "change_version" for column in inspector.get_columns(table)):
+        return False
+    with op.batch_alter_table(table) as batch:
+        batch.add_column(sa.Column("change_version", sa.BigInteger(), nullable=False, server_default="0"))
+    op.create_index(f"ix_{table}_change_version", table, ["change_version"])
+    return True
+
+
+def _backfill(base: int) -> None:
+    """Number vendors, then items, after base in id order, and point catalog_state past them."""
+    bind = op.get_bind()
+    max_vendor_id = bind.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM vendors")).scalar()
+    max_item_id = bind.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM items")).scalar()
+    op.execute(sa.text("UPDATE vendors SET change_version = :base + id").bindparams(base=base))
+    op.execute(sa.text("UPDATE items SET change_version = :base + id").bindparams(base=base + max_vendor_id))
+    op.execute(sa.text("DELETE FROM catalog_state"))
+    op.execute(
+        sa.text("INSERT INTO catalog_state (id, version, reset_version) VALUES (1, :version, :base)")
+        .bindparams(version=base + max_vendor_id + max_item_id, base=base)
+    )
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    added = [_add_change_version(inspector, table) for table in ("vendors", "items")]
+
+    if not inspector.has_table("catalog_state"):
+        op.create_table(
+            "catalog_state",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("version", sa.BigInteger(), nullable=False),
+            sa.Column("reset_version", sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    if not inspector.has_table("tombstones"):
+        op.create_table(
+            "tombstones",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("kind", sa.String(length=10), nullable=False),
+            sa.Column("row_id", sa.Integer(), nullable=False),
+            sa.Column("vendor_id", sa.Integer(), nullable=False),
+            sa.Column("lat", sa.Float(), nullable=False),
+            sa.Column("lng", sa.Float(), nullable=False),
+            sa.Column("change_version", sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_tombstones_change_version", "tombstones", ["change_version"])
+
+    if any(added):
+        _backfill(time.time_ns() // 1000)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tombstones_change_version", table_name="tombstones")
+    op.drop_table("tombstones")
+    op.drop_table("catalog_state")
+    for table in ("items", "vendors"):
+        op.drop_index(f"ix_{table}_change_version", table_name=table)
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("change_version")
@@ -0,0 +1,46 @@
+"""Change versions from a sequence on PostgreSQL
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 16:00:00.000000
+
+Creates the catalog_versions sequence, which hands out change versions on
+PostgreSQL without locking (see SyncService.reserve), starting past the
+catalog_state counter. The gap leaves room for versions that instances
+still running the previous release take from the counter during the
+deploy. SQLite keeps using the counter, so nothing changes there.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+# Versions skipped between the catalog_state counter and the sequence
+HANDOVER_GAP = 1_000_000
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    op.execute(sa.schema.CreateSequence(sa.Sequence("catalog_versions"), if_not_exists=True))
+    version = bind.execute(sa.text("SELECT version FROM catalog_state WHERE id = 1")).scalar()
+    if version is not None:
+        op.execute(
+            sa.text("SELECT setval('catalog_versions', :version)").bindparams(version=version + HANDOVER_GAP)
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    op.execute(sa.text(
+        "UPDATE catalog_state SET version = (SELECT last_value FROM catalog_versions) WHERE id = 1"
+    ))
+    op.execute(sa.schema.DropSequence(sa.Sequence("catalog_versions")))
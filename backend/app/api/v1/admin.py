@@ -1,24 +1,196 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db, engine, Base
-from app.seed import seed_database
+import os
+import secrets
+import tempfile
+from typing import Optional
 
-router = APIRouter()
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from app import jobs
+from app.config import settings
+from app.monitoring import profiling
+from app.schemas.synthetic import SyntheticConfig
 
+_bearer = HTTPBearer(auto_error=False)
 
-@router.post("/admin/reseed")
-async def reseed_database(db: Session = Depends(get_db)):
+
+def require_admin(credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)) -> None:
+    """
+    Dependency guarding the admin endpoints: requires `Authorization: Bearer <ADMIN_TOKEN>`.
+
+    Raises 403 while ADMIN_TOKEN is not configured, 401 for a missing or wrong token.
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)"
+        )
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode(), settings.ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing admin token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+def start_reseed_job(config: Optional[SyntheticConfig] = None) -> jobs.Job:
+    """
+    Start a background catalog reseed.
+
+    Loads the seed restaurants (or a synthetic dataset if config is given)
+    into staging tables and swaps them in, so reads keep being served.
+    Raises 409 if a reseed is already running.
+    """
+    from app.services.import_service import ImportService
+
+    def run(job: jobs.Job):
+        if config is None:
+            from app.seed import build_seed_rows
+            rows = build_seed_rows()
+        else:
+            from app.synthetic import generate
+            rows = generate(config)
+        return ImportService.reseed(rows, progress=job.update)
+
+    description = "seed restaurants" if config is None else f"synthetic dataset ({config.vendors} vendors)"
+    try:
+        return jobs.registry.submit("reseed", run, description)
+    except jobs.JobConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.post("/admin/reseed", status_code=status.HTTP_202_ACCEPTED)
+async def reseed_database(config: Optional[SyntheticConfig] = Body(default=None)):
+    """
+    ADMIN ONLY: Replace the catalog with fresh seed data in the background.
+
+    Data is loaded into staging tables and swapped in atomically; the API
+    keeps serving the current catalog meanwhile. Poll the returned status
+    URL for progress.
+
+    - **body** (optional): Synthetic dataset parameters; omit for the seed restaurants
+    """
+    job = start_reseed_job(config)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"{settings.API_V1_PREFIX}/admin/jobs/{job.id}",
+    }
+
+
+@router.post("/admin/import", status_code=status.HTTP_202_ACCEPTED)
+async def import_catalog(
+    request: Request,
+    kind: str = Query("vendors", pattern="^(vendors|items)$", description="Record type"),
+    format: str = Query("jsonl", pattern="^(jsonl|csv)$", description="Body format")
+):
+    """
+    ADMIN ONLY: Append vendors (optionally with menus) or items from a JSONL/CSV body.
+
+    The upload is streamed to a temporary file, then imported in the
+    background in validated batches. The job result lists rejected rows.
+    Bodies over IMPORT_MAX_UPLOAD_BYTES are rejected with 413.
+    See app/importer.py for the record formats.
+    """
+    from app import importer
+
+    limit = settings.IMPORT_MAX_UPLOAD_BYTES
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=f"Upload exceeds {limit} bytes"
+    )
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > limit:
+        raise too_large
+
+    upload = tempfile.NamedTemporaryFile(prefix="import-", suffix=f".{format}", delete=False)
+    try:
+        with upload:
+            size = 0
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > limit:
+                    # Chunked bodies (no Content-Length) are cut off here
+                    raise too_large
+                upload.write(chunk)
+    except BaseException:
+        os.unlink(upload.name)
+        raise
+
+    def run(job: jobs.Job):
+        try:
+            report = importer.import_file(upload.name, kind, format, progress=job.update)
+            return {**report.model_dump(), "rows_per_second": round(report.rows_per_second)}
+        finally:
+            os.unlink(upload.name)
+
+    try:
+        job = jobs.registry.submit("import", run, f"{kind} ({format})")
+    except jobs.JobConflict as e:
+        os.unlink(upload.name)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"{settings.API_V1_PREFIX}/admin/jobs/{job.id}",
+    }
+
+
+@router.get("/admin/export")
+async def export_catalog(
+    format: str = Query("ndjson", pattern="^(ndjson|arrow)$", description="ndjson or arrow")
+):
     """
-    ADMIN ONLY: Drop all data and reseed database.
-    WARNING: This will delete all existing data!
+    ADMIN ONLY: Stream the full catalog (vendors, menus, dietary flags, votes).
+
+    - **ndjson**: One vendor per line with nested items (re-importable via /admin/import)
+    - **arrow**: Arrow IPC stream of item rows with vendor columns (requires pyarrow)
+
+    Rows are read through a server-side cursor, so memory use does not
+    grow with the catalog size.
     """
-    # Drop all tables
-    Base.metadata.drop_all(bind=engine)
+    from app import exporter
+
+    if format not in exporter.available_formats():
+        raise HTTPException(status_code=400, detail="Arrow export requires the pyarrow package")
+    extension = "jsonl" if format == exporter.NDJSON else "arrows"
+    return StreamingResponse(
+        exporter.stream_export(format),
+        media_type=exporter.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="catalog.{extension}"'}
+    )
+
+
+@router.get("/admin/jobs")
+async def list_jobs():
+    """ADMIN ONLY: Recent background jobs, newest first."""
+    return [job.to_dict() for job in jobs.registry.list()]
 
-    # Recreate tables
-    Base.metadata.create_all(bind=engine)
 
-    # Seed with new data
-    seed_database()
+@router.get("/admin/jobs/{job_id}")
+async def get_job(job_id: str):
+    """ADMIN ONLY: Status and progress of a background job."""
+    job = jobs.registry.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
 
-    return {"message": "Database reseeded successfully with new varied patterns"}
+
+@router.get("/admin/profiling")
+async def get_profiling_summary(reset: bool = False):
+    """
+    ADMIN ONLY: Aggregated per-stage search pipeline timings.
+
+    Requires PROFILING_ENABLED. Returns request count, per-stage latency
+    percentiles and SQL statement counts, and per-request counters
+    (candidates, items hydrated, matched vendors).
+
+    - **reset**: Clear the aggregates after reading them
+    """
+    summary = profiling.aggregator.summary()
+    if reset:
+        profiling.aggregator.reset()
+    return summary
@@ -1,5 +1,7 @@
 """Configuration endpoint for app-wide settings."""
-from fastapi import APIRouter
+import hashlib
+from functools import lru_cache
+from fastapi import APIRouter, Request
 from app.schemas.config import (
     AppConfig,
     PricingConfig,
@@ -11,13 +13,15 @@ from app.schemas.config import (
     PreferenceMetadata,
     PreferenceCategory
 )
+from app import cache
 from app.config import settings
+from app.middleware.compression import PrecompressedPayload, available_encodings
 
 router = APIRouter()
 
 
 @router.get("/config", response_model=AppConfig)
-async def get_app_config():
+async def get_app_config(request: Request):
     """
     Get application configuration.
 
@@ -30,6 +34,73 @@ async def get_app_config():
     This ensures all clients (Android, iOS, Web) use consistent business rules
     without hardcoding values in each client.
     """
+    return _app_config_payload().response(request.headers.get("accept-encoding"))
+
+
+@router.get("/preferences", response_model=PreferencesConfig)
+async def get_preferences(request: Request):
+    """
+    Get dietary preference metadata.
+
+    Returns all available dietary preferences with their:
+    - API names (snake_case for backend)
+    - Display names (user-facing text)
+    - Categories (dietary, meat, allergen, etc.)
+    - Descriptions
+
+    This ensures all clients (Android, iOS, Web) display preferences
+    with identical formatting without hardcoding display strings.
+    """
+    return _preferences_payload().response(request.headers.get("accept-encoding"))
+
+
+@lru_cache(maxsize=None)
+def _app_config_payload() -> PrecompressedPayload:
+    """Serialize and precompress the static app config once per process."""
+    return _precompress(build_app_config())
+
+
+@lru_cache(maxsize=None)
+def _preferences_payload() -> PrecompressedPayload:
+    """Serialize and precompress the static preference metadata once per process."""
+    return _precompress(build_preferences_config())
+
+
+def warm_payloads() -> None:
+    """Build both payloads ahead of the first request (startup cache warming)."""
+    _app_config_payload()
+    _preferences_payload()
+
+
+def _precompress(model) -> PrecompressedPayload:
+    """
+    Serialize and precompress model, reusing variants another worker compressed.
+
+    The shared cache key is derived from the serialized body, so a changed
+    payload never picks up stale variants from a previous deploy.
+    """
+    body = model.model_dump_json().encode()
+    key = ":".join([
+        hashlib.sha256(body).hexdigest(),
+        str(settings.COMPRESSION_ENABLED),
+        str(settings.COMPRESSION_MINIMUM_SIZE),
+        ",".join(available_encodings()),
+    ])
+    cached = cache.payloads.get(key)
+    if cached is not None:
+        return PrecompressedPayload.from_bytes(cached)
+
+    payload = PrecompressedPayload(
+        body,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        compress=settings.COMPRESSION_ENABLED
+    )
+    cache.payloads.set(key, payload.to_bytes())
+    return payload
+
+
+def build_app_config() -> AppConfig:
+    """Build the application configuration."""
     return AppConfig(
         version="1.0.0",
         pricing=PricingConfig(
@@ -60,20 +131,8 @@ async def get_app_config():
     )
 
 
-@router.get("/preferences", response_model=PreferencesConfig)
-async def get_preferences():
-    """
-    Get dietary preference metadata.
-
-    Returns all available dietary preferences with their:
-    - API names (snake_case for backend)
-    - Display names (user-facing text)
-    - Categories (dietary, meat, allergen, etc.)
-    - Descriptions
-
-    This ensures all clients (Android, iOS, Web) display preferences
-    with identical formatting without hardcoding display strings.
-    """
+def build_preferences_config() -> PreferencesConfig:
+    """Build the dietary preference metadata."""
     return PreferencesConfig(
         version="1.0.0",
         preferences=[
@@ -0,0 +1,66 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.config import settings
+from app.database import get_db
+from app.schemas.sync import SyncDeletion, SyncResponse
+from app.services.sync_service import DELETED, ITEM, SyncArea, SyncPage, SyncService
+
+router = APIRouter()
+
+
+@router.get("/sync", response_model=SyncResponse)
+async def sync_catalog(
+    since: int = Query(0, ge=0, description="next_since of the previous sync (0: full sync)"),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius: Optional[float] = Query(None, gt=0, description="Miles around lat/lng (default MAX_DISTANCE_MILES)"),
+    limit: Optional[int] = Query(None, ge=1, description="Changes read per page (default SYNC_PAGE_SIZE)"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json or ndjson"),
+    db: Session = Depends(get_db)
+):
+    """
+    Catalog changes (vendors, items, deletions) after version since, so a
+    client can keep a local copy of the catalog, or of the area around
+    lat/lng, and pull only what changed.
+
+    - **since**: 0 for a full sync, then next_since of the last page
+    - **lat/lng/radius**: Only vendors within radius miles (and their items)
+    - **limit**: Rows read per page; request the next page while has_more
+    - **format**: json (one object) or ndjson (streamed: a "sync" header
+      line, one line per change in version order, an "end" line)
+
+    A reset page means the catalog was replaced since the client's last
+    sync: drop the local copy and sync again from since=0.
+    """
+    if (lat is None) != (lng is None):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="lat and lng must be given together"
+        )
+    area = None
+    if lat is not None:
+        area = SyncArea(lat, lng, min(radius or settings.MAX_DISTANCE_MILES, settings.SYNC_MAX_RADIUS_MILES))
+    limit = min(limit or settings.SYNC_PAGE_SIZE, settings.SYNC_MAX_PAGE_SIZE)
+
+    if format == "ndjson":
+        return StreamingResponse(SyncService.stream(since, limit, area), media_type="application/x-ndjson")
+
+    page = SyncPage(db.connection(), since, limit, area)
+    vendors, items, deleted = [], [], []
+    for change in page:
+        if change.kind == DELETED:
+            deleted.append(SyncDeletion(**change.data, version=change.version))
+        else:
+            (items if change.kind == ITEM else vendors).append(change.data)
+
+    return SyncResponse(
+        version=page.state.version,
+        next_since=page.next_since,
+        has_more=page.has_more,
+        reset=page.reset,
+        vendors=vendors,
+        items=items,
+        deleted=deleted
+    )
@@ -1,46 +1,182 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.database import get_db
+from starlette.concurrency import run_in_threadpool
+from typing import Callable, Dict, List, Optional, TypeVar
+from app import cache, deadlines, etags, singleflight
+from app.config import settings
+from app.database import SessionLocal, get_db
 from app.schemas.vendor import (
+    MAX_GROUP_SIZE,
+    UserFilters,
+    VendorSearchBatchRequest,
+    VendorSearchBatchResponse,
     VendorSearchRequest,
     VendorSearchResponse,
+    VendorResponse,
     VendorDetailResponse,
     PaginationMeta,
+    PreferenceFacets,
     DeliveryOptions,
     ReviewLinks
 )
 from app.schemas.item import ItemResponse, DietaryFlags, ItemRating
+from app.services.search_executor import SearchExecutor
 from app.services.vendor_service import VendorService
 from app.services.display_service import build_display_text
+from app.services.sync_service import SyncArea, SyncService
+import hashlib
 import math
+from functools import partial
 
 router = APIRouter()
 
+_USER_FILTERS = TypeAdapter(List[UserFilters])
+
+T = TypeVar("T")
+
 
 @router.post("/vendors/search", response_model=VendorSearchResponse)
-async def search_vendors(
-    request: VendorSearchRequest,
-    db: Session = Depends(get_db)
-):
+async def search_vendors(request: VendorSearchRequest, if_none_match: Optional[str] = Header(None)):
     """
     Search vendors based on dietary preferences.
 
-    - **user1_preferences**: List of dietary preferences for user 1
-    - **user2_preferences**: List of dietary preferences for user 2
+    - **users**: Group search, one {preferences, max_price} per diner; vendors need
+      an item for every diner with filters (at most 8 diners)
+    - **user1_preferences**: List of dietary preferences for user 1 (two-user form)
+    - **user2_preferences**: List of dietary preferences for user 2 (two-user form)
     - **lat/lng**: Optional user location for distance calculation
     - **sort_by**: Sort by 'rating', 'distance', or 'item_count'
     - **sort_direction**: 'asc' or 'desc'
     - **page**: Page number (starts at 1)
     - **page_size**: Results per page (1-100)
+
+    Responses carry an ETag; send it back in If-None-Match to get a 304 while
+    nothing in the search area has changed.
+    """
+    version = (await _run_off_loop(partial(_search_versions, [request])))[0] if settings.ETAGS_ENABLED else None
+    key = _search_key(request, version)
+    etag = etags.make(key) if version is not None else None
+    if etag is not None and etags.matches(if_none_match, etag):
+        return etags.not_modified(etag)
+
+    # Cached responses are serialized once and shared across workers (CACHE_BACKEND)
+    body = cache.search_results.get(key) if settings.SEARCH_CACHE_ENABLED else None
+    if body is None:
+        # Concurrent identical searches await one computation, which inherits the deadline
+        with deadlines.deadline(settings.SEARCH_DEADLINE_SECONDS):
+            body = await singleflight.search.run(key, partial(_run_off_loop, partial(_search_body, key, request)))
+    return Response(content=body, media_type="application/json", headers=etags.headers(etag) if etag else None)
+
+
+@router.post("/vendors/search/batch", response_model=VendorSearchBatchResponse)
+async def search_vendors_batch(batch: VendorSearchBatchRequest, if_none_match: Optional[str] = Header(None)):
+    """
+    Run several searches at once, e.g. one search under different sorts or preferences.
+
+    - **searches**: Up to 10 search requests, as for /vendors/search
+
+    Searches with the same location, vendor filters and search query fetch their
+    candidate vendors once. Returns one search response per search, in order.
+    Supports ETag / If-None-Match like /vendors/search.
+    """
+    versions = (
+        await _run_off_loop(partial(_search_versions, batch.searches)) if settings.ETAGS_ENABLED
+        else [None] * len(batch.searches)
+    )
+    keys = [_search_key(request, version) for request, version in zip(batch.searches, versions)]
+    etag = etags.make("batch", *keys) if None not in versions else None
+    if etag is not None and etags.matches(if_none_match, etag):
+        return etags.not_modified(etag)
+
+    bodies = dict.fromkeys(keys)
+    if settings.SEARCH_CACHE_ENABLED:
+        bodies.update((key, cache.search_results.get(key)) for key in bodies)
+
+    # Searches not cached, once each
+    missing = {key: request for key, request in zip(keys, batch.searches) if bodies[key] is None}
+    if missing:
+        with deadlines.deadline(settings.SEARCH_DEADLINE_SECONDS):
+            load = partial(_search_batch_bodies, list(missing), list(missing.values()))
+            bodies.update(await singleflight.search.run(("batch", *missing), partial(_run_off_loop, load)))
+
+    # Search responses are serialized JSON already: join them instead of re-encoding
+    content = b'{"results":[' + b",".join(bodies[key] for key in keys) + b"]}"
+    return Response(content=content, media_type="application/json", headers=etags.headers(etag) if etag else None)
+
+
+def _search_key(request: VendorSearchRequest, version: Optional[int] = None) -> str:
+    # Canonical request: its JSON with defaults filled in and fields in schema order.
+    # With a data version, cached responses are never older than it.
+    key = hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+    return key if version is None else f"{key}:{version}"
+
+
+def _search_versions(requests: List[VendorSearchRequest]) -> List[Optional[int]]:
+    """
+    Per request, the data version of its search area (SyncService.area_version),
+    or None if its response can change without one: the "open" filter depends
+    on the time of day, and a columnar snapshot may lag the database.
     """
-    vendors, total_count = VendorService.search_vendors(db, request)
+    areas = [
+        SyncArea(request.lat, request.lng, settings.MAX_DISTANCE_MILES)
+        if request.lat is not None and request.lng is not None else None
+        for request in requests
+    ]
+    with SessionLocal() as db:
+        versions = {area: SyncService.area_version(db.connection(), area) for area in set(areas)}
+
+    if settings.SEARCH_ENGINE == "columnar":
+        from app.services.columnar_search import ColumnarSearch
 
+        versions = {area: version if ColumnarSearch.covers(version) else None for area, version in versions.items()}
+    return [
+        None if "open" in [f.lower().strip() for f in request.vendor_filters] else versions[area]
+        for request, area in zip(requests, areas)
+    ]
+
+
+async def _run_off_loop(function: Callable[[], T]) -> T:
+    """Run function in the thread pool if SEARCH_EXECUTOR moves work off the event loop."""
+    if SearchExecutor.runs_off_loop():
+        return await run_in_threadpool(function)
+    return function()
+
+
+def _search_body(key: str, request: VendorSearchRequest) -> bytes:
+    # Own session: a coalesced computation can outlive the request that started it
+    with SessionLocal() as db, deadlines.statement_timeout(db):
+        body = _build_search_response(db, request).model_dump_json().encode()
+    if settings.SEARCH_CACHE_ENABLED:
+        cache.search_results.set(key, body)
+    return body
+
+
+def _search_batch_bodies(keys: List[str], requests: List[VendorSearchRequest]) -> Dict[str, bytes]:
+    with SessionLocal() as db, deadlines.statement_timeout(db):
+        results = VendorService.search_batch(db, requests)
+    bodies = {}
+    for key, request, result in zip(keys, requests, results):
+        bodies[key] = _search_response(request, *result).model_dump_json().encode()
+        if settings.SEARCH_CACHE_ENABLED:
+            cache.search_results.set(key, bodies[key])
+    return bodies
+
+
+def _build_search_response(db: Session, request: VendorSearchRequest) -> VendorSearchResponse:
+    return _search_response(request, *VendorService.search_vendors(db, request))
+
+
+def _search_response(
+    request: VendorSearchRequest,
+    vendors: List[VendorResponse],
+    total_count: int,
+    facets: Optional[PreferenceFacets]
+) -> VendorSearchResponse:
     total_pages = math.ceil(total_count / request.page_size) if total_count > 0 else 0
 
-    # Generate display text for both users
-    user1_display = build_display_text(request.user1_preferences, request.user1_max_price)
-    user2_display = build_display_text(request.user2_preferences, request.user2_max_price)
+    # Generate display text for every user
+    user_displays = [build_display_text(user.preferences, user.max_price) for user in request.user_filters()]
 
     return VendorSearchResponse(
         vendors=vendors,
@@ -50,8 +186,10 @@ async def search_vendors(
             total_results=total_count,
             total_pages=total_pages
         ),
-        user1_display=user1_display,
-        user2_display=user2_display
+        user1_display=user_displays[0] if len(user_displays) > 0 else "",
+        user2_display=user_displays[1] if len(user_displays) > 1 else "",
+        user_displays=user_displays,
+        facets=facets
     )
 
 
@@ -105,11 +243,13 @@ async def get_vendor_details(
 @router.get("/vendors/{vendor_id}/items", response_model=List[ItemResponse])
 async def get_vendor_items(
     vendor_id: int,
+    response: Response,
     user1_preferences: str = "",
     user2_preferences: str = "",
     user1_max_price: Optional[float] = None,
     user2_max_price: Optional[float] = None,
-    db: Session = Depends(get_db)
+    users: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Get all menu items for a specific vendor.
@@ -118,24 +258,68 @@ async def get_vendor_items(
     - **user2_preferences**: Comma-separated dietary preferences for user 2
     - **user1_max_price**: Maximum price filter for user 1
     - **user2_max_price**: Maximum price filter for user 2
+    - **users**: Group form instead of user1_*/user2_*: JSON list of
+      {"preferences": [...], "max_price": ...}, one per diner
 
     Returns items with flags indicating which user's preferences they match.
+    Responses carry an ETag; send it back in If-None-Match to get a 304 while
+    the vendor and its menu are unchanged.
     """
-    # Check if vendor exists
-    vendor = VendorService.get_vendor_by_id(db, vendor_id)
-    if not vendor:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Vendor with id {vendor_id} not found"
-        )
+    if users is not None:
+        if user1_preferences or user2_preferences or user1_max_price is not None or user2_max_price is not None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Use either users or the user1_*/user2_* parameters, not both"
+            )
+        try:
+            user_filters = _USER_FILTERS.validate_json(users)
+        except ValidationError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.errors(include_url=False))
+        if len(user_filters) > MAX_GROUP_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"At most {MAX_GROUP_SIZE} users"
+            )
+    else:
+        # Parse preferences
+        user_filters = [
+            UserFilters(preferences=[p.strip() for p in user1_preferences.split(",") if p.strip()],
+                        max_price=user1_max_price),
+            UserFilters(preferences=[p.strip() for p in user2_preferences.split(",") if p.strip()],
+                        max_price=user2_max_price),
+        ]
 
-    # Parse preferences
-    user1_prefs = [p.strip() for p in user1_preferences.split(",") if p.strip()]
-    user2_prefs = [p.strip() for p in user2_preferences.split(",") if p.strip()]
+    key = (vendor_id, tuple((tuple(user.preferences), user.max_price) for user in user_filters))
+    if settings.ETAGS_ENABLED:
+        version = await _run_off_loop(partial(_vendor_version, vendor_id))
+        if version is not None:  # Unknown vendors get their 404 below
+            etag = etags.make(key, version)
+            if etags.matches(if_none_match, etag):
+                return etags.not_modified(etag)
+            response.headers.update(etags.headers(etag))
 
-    items = VendorService.get_vendor_items(
-        db, vendor_id, user1_prefs, user2_prefs, user1_max_price, user2_max_price
-    )
+    # Concurrent requests for the same menu and filters await one computation
+    load = partial(_vendor_items_response, vendor_id, user_filters)
+    return await singleflight.vendor_items.run(key, partial(_run_off_loop, load))
+
+
+def _vendor_version(vendor_id: int) -> Optional[int]:
+    with SessionLocal() as db:
+        return SyncService.vendor_version(db.connection(), vendor_id)
+
+
+def _vendor_items_response(vendor_id: int, user_filters: List[UserFilters]) -> List[ItemResponse]:
+    # Own session: a coalesced computation can outlive the request that started it
+    with SessionLocal() as db, deadlines.statement_timeout(db):
+        # Check if vendor exists
+        vendor = VendorService.get_vendor_by_id(db, vendor_id)
+        if not vendor:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Vendor with id {vendor_id} not found"
+            )
+
+        items = VendorService.get_vendor_items(db, vendor_id, user_filters)
 
     # Convert to response schema
     response_items = []
@@ -189,6 +373,7 @@ async def get_vendor_items(
             ),
             matches_user1=getattr(item, 'matches_user1', None),
             matches_user2=getattr(item, 'matches_user2', None),
+            matches_users=getattr(item, 'matches_users', None),
             created_at=item.created_at
         ))
 
@@ -0,0 +1,226 @@
+"""
+Bulk loading of vendors and items.
+
+Inserts (vendor_fields, [item_fields, ...]) rows -- as produced by
+app/seed.py and app/synthetic.py -- without the ORM unit of work:
+
+- ``copy``: PostgreSQL ``COPY ... FROM STDIN`` through psycopg2 (fastest)
+- ``executemany``: Core ``insert()`` batches with client-assigned vendor ids
+- ``returning``: Core ``insert().returning(id)`` batches, ids assigned by the
+  database and matched back to rows in parameter order
+
+``copy`` and ``executemany`` assign vendor ids starting after the current
+maximum, so they must not run concurrently with other vendor inserts; the
+vendor id sequence is advanced afterwards on PostgreSQL.
+
+Loads into the live tables also write each batch's item groups
+(ItemGroupService) and stamp its rows with change versions (SyncService);
+staging loads leave both to the swap.
+"""
+import csv
+import io
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import func, insert, select, text
+
+from app.models.item import Item
+from app.models.vendor import Vendor
+from app.services.item_group_service import ItemGroupService
+from app.services.sync_service import SyncService
+
+METHODS = ("auto", "copy", "executemany", "returning")
+
+DEFAULT_BATCH_SIZE = 2000  # vendors per batch
+
+Row = Tuple[dict, List[dict]]
+
+
+class LoadStats(BaseModel):
+    """Result of a bulk load."""
+    method: str
+    vendors: int = 0
+    items: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return (self.vendors + self.items) / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.vendors} vendors / {self.items} items in {self.seconds:.1f}s "
+            f"({self.rows_per_second:,.0f} rows/s, {self.method})"
+        )
+
+
+def resolve_method(engine, method: str = "auto") -> str:
+    """Pick the fastest method available for engine ('auto'), or validate method."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown load method '{method}' (choose from {', '.join(METHODS)})")
+    is_psycopg2 = engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+    if method == "auto":
+        return "copy" if is_psycopg2 else "executemany"
+    if method == "copy" and not is_psycopg2:
+        raise ValueError("COPY loading requires PostgreSQL with psycopg2")
+    return method
+
+
+def load(
+    engine,
+    rows: Iterable[Row],
+    method: str = "auto",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[Callable[[LoadStats], None]] = None,
+    vendor_table=None,
+    item_table=None,
+    commit_per_batch: bool = False
+) -> LoadStats:
+    """
+    Load rows into the vendor and item tables in one transaction (by default).
+
+    Args:
+        rows: (vendor_fields, [item_fields, ...]) tuples; item vendor_id is filled in
+        method: One of METHODS
+        batch_size: Vendors per batch (items of those vendors go in the same batch)
+        progress: Called with running LoadStats after each batch
+        vendor_table, item_table: Target tables (default: the live vendors/items tables)
+        commit_per_batch: Commit after every batch instead of once at the end.
+            Keeps write locks short (SQLite readers are blocked while a write
+            transaction spills to disk); use for staging tables only.
+    """
+    method = resolve_method(engine, method)
+    vendor_table = vendor_table if vendor_table is not None else Vendor.__table__
+    item_table = item_table if item_table is not None else Item.__table__
+    live = item_table is Item.__table__
+    stats = LoadStats(method=method)
+    start = time.perf_counter()
+
+    with engine.connect() as conn:
+        if method == "returning":
+            write_batch = _returning_writer(conn, vendor_table, item_table)
+        else:
+            next_id = (conn.execute(select(func.max(vendor_table.c.id))).scalar() or 0) + 1
+            if method == "copy":
+                write_batch = _copy_writer(conn, vendor_table, item_table)
+            else:
+                write_batch = _executemany_writer(conn, vendor_table, item_table)
+
+        for batch in _batches(rows, batch_size):
+            if method != "returning":
+                for vendor, _ in batch:
+                    vendor["id"] = next_id
+                    next_id += 1
+            if live:
+                SyncService.stamp(conn, [row for vendor, menu in batch for row in (vendor, *menu)])
+            stats.items += write_batch(batch)
+            stats.vendors += len(batch)
+            if live:
+                ItemGroupService.rebuild(conn, (vendor["id"] for vendor, _ in batch))
+            if commit_per_batch:
+                conn.commit()
+            stats.seconds = time.perf_counter() - start
+            if progress:
+                progress(stats)
+
+        if method != "returning":
+            reset_sequence(conn, vendor_table)
+        conn.commit()
+
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def reset_sequence(conn, table) -> None:
+    """Advance table's id sequence past its max id (PostgreSQL only)."""
+    if conn.dialect.name != "postgresql":
+        return
+    conn.execute(
+        text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+        )
+    )
+
+
+def _batches(rows: Iterable[Row], size: int) -> Iterator[List[Row]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _item_rows(batch: List[Row], vendor_ids: Iterable[int]) -> List[Dict]:
+    return [
+        {**item, "vendor_id": vendor_id}
+        for (_, menu), vendor_id in zip(batch, vendor_ids)
+        for item in menu
+    ]
+
+
+def _executemany_writer(conn, vendor_table, item_table):
+    def write(batch: List[Row]) -> int:
+        conn.execute(insert(vendor_table), [vendor for vendor, _ in batch])
+        items = _item_rows(batch, (vendor["id"] for vendor, _ in batch))
+        if items:
+            conn.execute(insert(item_table), items)
+        return len(items)
+    return write
+
+
+def _returning_writer(conn, vendor_table, item_table):
+    statement = insert(vendor_table).returning(vendor_table.c.id, sort_by_parameter_order=True)
+
+    def write(batch: List[Row]) -> int:
+        vendor_ids = conn.execute(statement, [vendor for vendor, _ in batch]).scalars().all()
+        for (vendor, _), vendor_id in zip(batch, vendor_ids):
+            vendor["id"] = vendor_id
+        items = _item_rows(batch, vendor_ids)
+        if items:
+            conn.execute(insert(item_table), items)
+        return len(items)
+    return write
+
+
+def _copy_writer(conn, vendor_table, item_table):
+    """Stream each batch to COPY as CSV; omitted columns get their server defaults."""
+    cursor = conn.connection.driver_connection.cursor()
+    columns = {}
+
+    def copy(table, records: List[Dict]) -> None:
+        if not records:
+            return
+        names = columns.get(table.name)
+        if names is None:
+            names = columns[table.name] = [c.name for c in table.columns if c.name in records[0]]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for record in records:
+            writer.writerow([_copy_value(record.get(name)) for name in names])
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(names)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buffer
+        )
+
+    def write(batch: List[Row]) -> int:
+        copy(vendor_table, [vendor for vendor, _ in batch])
+        items = _item_rows(batch, (vendor["id"] for vendor, _ in batch))
+        copy(item_table, items)
+        return len(items)
+    return write
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if value is True:
+        return "t"
+    if value is False:
+        return "f"
+    return value
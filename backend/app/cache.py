@@ -0,0 +1,212 @@
+"""
+Response caches with an optional store shared between worker processes.
+
+Each cache keeps a small in-process LRU tier. With ``CACHE_BACKEND=sqlite``
+misses fall through to a SQLite file shared by every worker on the host,
+so a payload built (or a search answered) by one worker is reused by the
+others instead of each worker warming independently. Values are bytes
+(serialized response bodies); callers own the encoding.
+
+The shared store is best effort: if it is locked or unavailable, lookups
+count as misses and writes are dropped, so a request never fails because
+of the cache.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from app.config import settings
+from app.monitoring import metrics
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("local", "sqlite")
+
+# Expired rows are purged from the shared store every this many writes
+PURGE_INTERVAL = 500
+
+
+class LocalCache:
+    """Thread-safe in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, expires_at: Optional[float]) -> None:
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    Key/value store in a SQLite file, shared by the processes on one host.
+
+    Connections are opened lazily per process (a connection inherited
+    across fork is never reused) and serialized with a lock.
+    """
+
+    def __init__(self, path: str, timeout: float = 0.5):
+        self.path = path
+        self.timeout = timeout
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, expires_at REAL, "
+                "PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+            )
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        """(value, expires_at) or None if missing, expired or unavailable."""
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (namespace, key)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug("Shared cache read failed: %s", e)
+            return None
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0], row[1]
+
+    def set(self, namespace: str, key: str, value: bytes, expires_at: Optional[float]) -> None:
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                    (namespace, key, value, expires_at)
+                )
+                self._writes += 1
+                if self._writes % PURGE_INTERVAL == 0:
+                    conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+        except sqlite3.Error as e:
+            logger.debug("Shared cache write failed: %s", e)
+
+    def clear(self, namespace: str) -> None:
+        try:
+            with self._lock:
+                self._connection().execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+        except sqlite3.Error as e:
+            logger.warning("Shared cache clear failed: %s", e)
+
+
+class Cache:
+    """
+    A named cache: the in-process tier in front of the optional shared store.
+
+    Lookups are counted in ``cache_requests_total`` as ``hit`` (local),
+    ``shared_hit`` or ``miss``.
+    """
+
+    def __init__(self, name: str, ttl: Optional[float], max_entries: int, shared: Optional[SQLiteCache] = None):
+        self.name = name
+        self.ttl = ttl
+        self.local = LocalCache(max_entries)
+        self.shared = shared
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.local.get(key)
+        result = "hit"
+        if value is None and self.shared is not None:
+            entry = self.shared.get(self.name, key)
+            if entry is not None:
+                value = entry[0]
+                self.local.set(key, value, entry[1])
+                result = "shared_hit"
+        metrics.cache_requests.labels(self.name, result if value is not None else "miss").inc()
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        self.local.set(key, value, expires_at)
+        if self.shared is not None:
+            self.shared.set(self.name, key, value, expires_at)
+
+    def get_or_set(self, key: str, build: Callable[[], bytes]) -> bytes:
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries here and in the shared store (other workers' local tiers expire by TTL)."""
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear(self.name)
+
+
+def _shared_store() -> Optional[SQLiteCache]:
+    if settings.CACHE_BACKEND not in BACKENDS:
+        raise ValueError(f"Unknown CACHE_BACKEND '{settings.CACHE_BACKEND}' (choose from {', '.join(BACKENDS)})")
+    if settings.CACHE_BACKEND == "sqlite":
+        return SQLiteCache(settings.CACHE_SQLITE_PATH)
+    return None
+
+
+_shared = _shared_store()
+
+# Serialized /config and /preferences payloads (static, never expire)
+payloads = Cache("payloads", ttl=None, max_entries=16, shared=_shared)
+
+# Serialized search responses (used when SEARCH_CACHE_ENABLED)
+search_results = Cache(
+    "search", ttl=settings.SEARCH_CACHE_TTL_SECONDS, max_entries=settings.CACHE_MAX_ENTRIES, shared=_shared
+)
+
+CACHES: Dict[str, Cache] = {cache.name: cache for cache in (payloads, search_results)}
+
+
+def clear_search_results() -> None:
+    """Drop cached search responses after the catalog changes (reseed, import)."""
+    search_results.clear()
+
+
+def _collect_entries():
+    return [("cache_entries", {"cache": name}, len(cache.local)) for name, cache in CACHES.items()]
+
+
+metrics.registry.register_collector(
+    "cache_entries", "gauge", "Entries in each in-process cache tier", _collect_entries
+)
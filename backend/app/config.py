@@ -20,9 +20,71 @@ class Settings(BaseSettings):
         "dietprefs://"
     ]
 
+    # Admin endpoints (/api/v1/admin/*, /seed)
+    ADMIN_TOKEN: str = ""  # Bearer token the admin endpoints require; empty disables them (403)
+    IMPORT_MAX_UPLOAD_BYTES: int = 256 * 2**20  # Largest /admin/import body; larger uploads get 413
+
     # Search Configuration
     MAX_DISTANCE_MILES: float = 10.0  # Maximum distance for vendor search results
 
+    # Response compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 500  # Responses smaller than this (bytes) are sent uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1 (fastest) - 9 (smallest)
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0 (fastest) - 11 (smallest), used if brotli is installed
+
+    # Metrics (Prometheus text format at /metrics)
+    METRICS_ENABLED: bool = True
+
+    # Query guard (flags slow requests and N+1 query patterns)
+    QUERY_GUARD_ENABLED: bool = True
+    QUERY_GUARD_MAX_STATEMENTS: int = 20  # SQL statements per request before a warning
+    QUERY_GUARD_MAX_DURATION_MS: float = 500.0  # SQL time per request before a warning
+    QUERY_GUARD_REPEAT_THRESHOLD: int = 10  # Executions of one statement template flagged as N+1
+    QUERY_GUARD_STRICT: bool = False  # Raise instead of logging (use in test runs)
+
+    # Profiling (per-stage search timings, Server-Timing header)
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 1.0  # Fraction of requests profiled when enabled
+
+    # Caches (in-process LRU, optionally backed by a store shared between workers)
+    CACHE_BACKEND: str = "local"  # local (per process) or sqlite (shared file, one host)
+    CACHE_SQLITE_PATH: str = "/tmp/dietprefs-cache.sqlite3"  # Shared store used by the sqlite backend
+    CACHE_MAX_ENTRIES: int = 1024  # Search responses kept in each process
+    SEARCH_CACHE_ENABLED: bool = False  # Cache serialized search responses
+    SEARCH_CACHE_TTL_SECONDS: float = 30.0  # Longest a cached search can lag a data change in other workers
+    REQUEST_COALESCING_ENABLED: bool = True  # Concurrent identical searches / menu requests share one computation
+    ETAGS_ENABLED: bool = True  # ETag / If-None-Match (304) on search and menu responses, keyed by data version
+
+    # Admission control (see app/middleware/admission.py); limits are per worker process
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_SEARCH_CONCURRENCY: int = 4  # Searches running at once
+    ADMISSION_SEARCH_QUEUE: int = 16  # Searches waiting for a slot; more are shed with 503
+    ADMISSION_MENU_CONCURRENCY: int = 8  # Vendor menu requests running at once
+    ADMISSION_MENU_QUEUE: int = 32  # Vendor menu requests waiting for a slot
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2.0  # Longest wait for a slot before the request is shed
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1  # Retry-After on shed requests and missed deadlines
+    SEARCH_DEADLINE_SECONDS: float = 10.0  # Per-search deadline, also applied to its SQL statements (0 disables)
+
+    # Delta sync (GET /sync, see app/services/sync_service.py)
+    SYNC_PAGE_SIZE: int = 1000  # Changes read per sync page by default
+    SYNC_MAX_PAGE_SIZE: int = 10000  # Largest limit a client may ask for
+    SYNC_MAX_RADIUS_MILES: float = 100.0  # Largest sync area radius
+
+    # Search execution (see app/services/search_executor.py)
+    SEARCH_EXECUTOR: str = "thread"  # thread (thread pool), process (thread pool + process pool), inline (event loop)
+    SEARCH_EXECUTOR_WORKERS: int = 2  # Process pool size per API worker (process mode)
+    SEARCH_PARALLEL_MIN_VENDORS: int = 2000  # Candidate count from which post-processing is split across processes
+    SEARCH_CHUNK_SIZE: int = 500  # Minimum vendors per process pool task
+
+    # Search engine
+    SEARCH_ENGINE: str = "sql"  # sql (query per search) or columnar (in-memory NumPy snapshot, needs numpy)
+    COLUMNAR_MAX_AGE_SECONDS: float = 300.0  # Full snapshot reload interval, picks up other workers' writes (0 = never)
+
+    # Startup
+    SCHEMA_STARTUP_MODE: str = "verify"  # verify (tables exist, revision at head), create (create_all), skip
+    STARTUP_WARM_CACHES: bool = False  # Open a DB connection and build cached payloads before serving
+
     # Environment
     ENVIRONMENT: str = "development"
 
@@ -0,0 +1,87 @@
+"""
+Per-request deadlines.
+
+A deadline is set for the current context (request handler, and the tasks and
+thread pool calls it starts, which copy the context) with ``deadline()``.
+Work checks it between stages with ``check()``, and ``statement_timeout()``
+carries the remaining time to the database, so a slow query is cancelled
+by the server instead of running on after the client has given up:
+
+- PostgreSQL: ``SET LOCAL statement_timeout`` for the session's transaction
+- SQLite: a progress handler that interrupts statements past the deadline
+
+Either way, exceeding the deadline raises DeadlineExceeded (the API answers
+503 with Retry-After).
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+# SQLite virtual machine instructions between deadline checks
+SQLITE_PROGRESS_INTERVAL = 10_000
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The current request ran past its deadline."""
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Set a deadline seconds from now for the enclosed work (None or <= 0: no deadline)."""
+    if not seconds or seconds <= 0:
+        yield
+        return
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (may be negative), None without a deadline."""
+    expires_at = _deadline.get()
+    return None if expires_at is None else expires_at - time.monotonic()
+
+
+def check() -> None:
+    """Raise DeadlineExceeded if the current deadline has passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+
+
+@contextmanager
+def statement_timeout(db: Session) -> Iterator[None]:
+    """Cancel db's statements that run past the current deadline (no-op without a deadline)."""
+    expires_at = _deadline.get()
+    if expires_at is None:
+        yield
+        return
+    check()
+
+    conn = db.connection()
+    dialect = conn.dialect.name
+    raw = None
+    if dialect == "postgresql":
+        timeout_ms = max(int((expires_at - time.monotonic()) * 1000), 1)
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+    elif dialect == "sqlite":
+        raw = conn.connection.driver_connection
+        raw.set_progress_handler(lambda: time.monotonic() > expires_at, SQLITE_PROGRESS_INTERVAL)
+
+    try:
+        yield
+    except OperationalError as e:
+        if time.monotonic() > expires_at:
+            raise DeadlineExceeded("Database statement cancelled at the request deadline") from e
+        raise
+    finally:
+        if raw is not None:
+            raw.set_progress_handler(None, 0)
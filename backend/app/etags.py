@@ -0,0 +1,41 @@
+"""
+Conditional requests: ETags and If-None-Match on search and menu responses.
+
+A response's ETag is a hash of its canonical request and the version of
+the data it was computed from (SyncService.area_version for searches,
+SyncService.vendor_version for menus). Versions are maintained on writes,
+so a request whose If-None-Match holds the current tag gets a 304 after a
+version lookup, without running the search or reading items.
+
+Tags are weak: the compression middleware may encode the same body
+differently, and clients only need semantic equivalence.
+"""
+import hashlib
+from typing import Dict, Optional
+
+from fastapi import Response, status
+
+
+def make(*parts) -> str:
+    """Weak ETag for a request key and data version (any str()-able parts)."""
+    digest = hashlib.sha256(":".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header holds etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def headers(etag: str) -> Dict[str, str]:
+    # no-cache: clients may store the response but revalidate it before reuse
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers(etag))
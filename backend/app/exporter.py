@@ -0,0 +1,203 @@
+"""
+Streaming catalog export.
+
+Dumps every vendor with its menu (dietary flags and vote counts included)
+through a server-side cursor, so memory stays constant regardless of
+catalog size. Two encodings are available:
+
+- NDJSON: one vendor per line with nested ``items`` -- the same shape
+  app/importer.py accepts, so an export can seed another database
+- Arrow IPC stream: columnar record batches of items with their vendor
+  columns (``vendor_`` prefix), if the optional ``pyarrow`` package is
+  installed
+
+Usage (from the backend directory):
+    python -m app.exporter catalog.jsonl
+    python -m app.exporter catalog.arrows --format arrow
+"""
+import argparse
+import io
+import json
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, select
+
+from app.models.item import Item
+from app.models.vendor import Vendor
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pyarrow is optional
+    pyarrow = None
+
+NDJSON = "ndjson"
+ARROW = "arrow"
+
+MEDIA_TYPES = {
+    NDJSON: "application/x-ndjson",
+    ARROW: "application/vnd.apache.arrow.stream",
+}
+
+# Rows fetched from the server-side cursor at a time
+DEFAULT_CHUNK_SIZE = 2000
+
+# Every column is exported (vendor_id is implied by nesting items under their vendor)
+_VENDOR_COLUMNS = [c for c in Vendor.__table__.columns]
+_ITEM_COLUMNS = [c for c in Item.__table__.columns if c.name != "vendor_id"]
+
+
+def available_formats() -> List[str]:
+    return [NDJSON, ARROW] if pyarrow is not None else [NDJSON]
+
+
+def iter_catalog(conn, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[Dict, List[Dict]]]:
+    """
+    Yield (vendor, [items]) in vendor id order from one streamed join.
+
+    Rows arrive ordered by vendor and item id, so a vendor is complete as
+    soon as the next vendor id shows up; only one menu is held at a time.
+    """
+    vendor_labels = [f"v_{c.name}" for c in _VENDOR_COLUMNS]
+    item_labels = [f"i_{c.name}" for c in _ITEM_COLUMNS]
+    statement = (
+        select(
+            *(c.label(label) for c, label in zip(_VENDOR_COLUMNS, vendor_labels)),
+            *(c.label(label) for c, label in zip(_ITEM_COLUMNS, item_labels)),
+        )
+        .select_from(Vendor.__table__.outerjoin(Item.__table__, Item.vendor_id == Vendor.id))
+        .order_by(Vendor.id, Item.id)
+    )
+    result = conn.execution_options(yield_per=chunk_size).execute(statement)
+
+    vendor: Optional[Dict] = None
+    items: List[Dict] = []
+    for partition in result.partitions():
+        for row in partition:
+            mapping = row._mapping
+            if vendor is None or mapping["v_id"] != vendor["id"]:
+                if vendor is not None:
+                    yield vendor, items
+                vendor = {c.name: mapping[label] for c, label in zip(_VENDOR_COLUMNS, vendor_labels)}
+                items = []
+            if mapping["i_id"] is not None:
+                items.append({c.name: mapping[label] for c, label in zip(_ITEM_COLUMNS, item_labels)})
+    if vendor is not None:
+        yield vendor, items
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def ndjson_chunks(catalog: Iterator[Tuple[Dict, List[Dict]]], vendors_per_chunk: int = 100) -> Iterator[bytes]:
+    """Encode the catalog as NDJSON, a few vendors per yielded chunk."""
+    lines = []
+    for vendor, items in catalog:
+        lines.append(json.dumps({**vendor, "items": items}, default=_json_default, separators=(",", ":")))
+        if len(lines) >= vendors_per_chunk:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def arrow_schema():
+    """Arrow schema for exported item rows, derived from the table columns."""
+    def arrow_type(column):
+        if isinstance(column.type, Boolean):
+            return pyarrow.bool_()
+        if isinstance(column.type, Integer):
+            return pyarrow.int64()
+        if isinstance(column.type, Float):
+            return pyarrow.float64()
+        if isinstance(column.type, DateTime):
+            return pyarrow.timestamp("us", tz="UTC")
+        return pyarrow.string()
+
+    return pyarrow.schema(
+        [(f"vendor_{c.name}", arrow_type(c)) for c in _VENDOR_COLUMNS]
+        + [(c.name, arrow_type(c)) for c in _ITEM_COLUMNS]
+    )
+
+
+def arrow_chunks(catalog: Iterator[Tuple[Dict, List[Dict]]], rows_per_batch: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Encode the catalog as an Arrow IPC stream of item rows with vendor columns."""
+    if pyarrow is None:
+        raise RuntimeError("Arrow export requires the pyarrow package")
+
+    schema = arrow_schema()
+    sink = io.BytesIO()
+    writer = pyarrow.ipc.new_stream(sink, schema)
+    columns: Dict[str, list] = {name: [] for name in schema.names}
+    rows = 0
+
+    def flush() -> bytes:
+        writer.write_batch(pyarrow.RecordBatch.from_pydict(columns, schema=schema))
+        for values in columns.values():
+            values.clear()
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    for vendor, items in catalog:
+        for item in items:
+            for key, value in vendor.items():
+                columns[f"vendor_{key}"].append(value)
+            for key, value in item.items():
+                columns[key].append(value)
+            rows += 1
+        if rows >= rows_per_batch:
+            yield flush()
+            rows = 0
+
+    if rows:
+        yield flush()
+    writer.close()
+    yield sink.getvalue()
+
+
+def stream_export(fmt: str = NDJSON, engine=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Encoded export chunks, read through a connection held for the whole stream.
+
+    Opens its own connection (not the request session), since request
+    dependencies are closed before a streaming response body is sent.
+    """
+    if engine is None:
+        from app.database import engine
+
+    with engine.connect() as conn:
+        catalog = iter_catalog(conn, chunk_size)
+        if fmt == ARROW:
+            yield from arrow_chunks(catalog, chunk_size)
+        else:
+            yield from ndjson_chunks(catalog)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the vendor catalog")
+    parser.add_argument("path", help="Output file")
+    parser.add_argument("--format", choices=[NDJSON, ARROW], default=NDJSON)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per cursor fetch")
+    args = parser.parse_args()
+
+    if args.format not in available_formats():
+        parser.error("Arrow export requires the pyarrow package")
+
+    start = time.perf_counter()
+    written = 0
+    with open(args.path, "wb") as f:
+        for chunk in stream_export(args.format, chunk_size=args.chunk_size):
+            f.write(chunk)
+            written += len(chunk)
+    print(f"✅ Exported {written / 1e6:.1f} MB to {args.path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
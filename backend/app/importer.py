@@ -0,0 +1,291 @@
+"""
+Streaming vendor/menu importer.
+
+Reads JSON Lines or CSV records incrementally (constant memory), validates
+them in batches against the API schemas and appends the valid ones to the
+live tables with batched inserts. Invalid rows are skipped and reported
+with their line number; each batch is committed on its own, so an
+interrupted import keeps the batches already written.
+
+Record formats:
+- vendors: ``VendorImport`` (``VendorCreate`` plus cuisine flags), with an
+  optional nested ``items`` list in JSONL
+- items: ``ItemCreate`` (``vendor_id`` must reference an existing vendor)
+
+Dietary flags may be given nested (``"dietary_flags": {"vegan": true}``) or
+as top-level fields/CSV columns (``vegan``), so files written by
+``python -m app.synthetic --output`` import as-is.
+
+Usage (from the backend directory):
+    python -m app.importer vendors.jsonl
+    python -m app.importer menus.csv --kind items
+"""
+import argparse
+import csv
+import io
+import json
+import time
+from typing import IO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+
+from app import bulk_load
+from app.cache import clear_search_results
+from app.config import settings
+from app.models.item import Item
+from app.models.vendor import Vendor
+from app.schemas.item import DietaryFlags, ItemCreate
+from app.schemas.vendor import VendorImport
+from app.services.item_group_service import ItemGroupService
+from app.services.sync_service import SyncService
+
+KINDS = ("vendors", "items")
+FORMATS = ("jsonl", "csv")
+
+DEFAULT_BATCH_SIZE = 1000  # records per batch
+
+# Rejected rows included in the report (all are counted)
+MAX_REPORTED_REJECTIONS = 100
+
+_FLAG_NAMES = set(DietaryFlags.model_fields)
+
+
+class ImportReport(BaseModel):
+    """Outcome of an import, updated after every batch."""
+    kind: str
+    format: str
+    batches: int = 0
+    vendors: int = 0
+    items: int = 0
+    rejected: int = 0
+    rejections: List[Dict] = []
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return (self.vendors + self.items) / self.seconds if self.seconds else 0.0
+
+    def reject(self, line: int, error: str) -> None:
+        self.rejected += 1
+        if len(self.rejections) < MAX_REPORTED_REJECTIONS:
+            self.rejections.append({"line": line, "error": error})
+
+
+def detect_format(filename: str) -> str:
+    return "csv" if filename.lower().endswith(".csv") else "jsonl"
+
+
+def read_records(stream: IO[str], fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (line number, record, parse error) for each record in stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            # Empty cells are missing values, not empty strings
+            yield reader.line_num, {k: v for k, v in record.items() if v not in ("", None)}, None
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, record, None
+
+
+def _nest_flags(record: dict) -> dict:
+    """Move top-level dietary flag fields into dietary_flags."""
+    if "dietary_flags" in record:
+        return record
+    flags = {name: record.pop(name) for name in list(record) if name in _FLAG_NAMES}
+    return {**record, "dietary_flags": flags}
+
+
+def _format_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'record'}: {e['msg']}" for e in error.errors()
+    )
+
+
+def _item_columns(item) -> dict:
+    """Item table values from an ItemImport/ItemCreate."""
+    return {
+        "name": item.name,
+        "price": item.price,
+        "pictures": item.pictures,
+        **item.dietary_flags.model_dump(),
+    }
+
+
+def _batches(records, size: int):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_records(
+    stream: IO[str],
+    kind: str = "vendors",
+    fmt: str = "jsonl",
+    engine=None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    method: str = "returning",
+    progress: Optional[Callable[..., None]] = None
+) -> ImportReport:
+    """
+    Import vendor or item records from a text stream.
+
+    Args:
+        stream: Text stream of JSONL or CSV records
+        kind: "vendors" (optionally with nested items) or "items"
+        fmt: "jsonl" or "csv"
+        method: bulk_load method for vendor batches. The default lets the
+            database assign ids, which is safe alongside other writers.
+        progress: Called after each batch with keyword fields (batch, vendors,
+            items, rejected, batch_rows_per_second)
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown import kind '{kind}'")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown import format '{fmt}'")
+    if engine is None:
+        from app.database import engine
+
+    report = ImportReport(kind=kind, format=fmt)
+    start = time.perf_counter()
+
+    for batch in _batches(read_records(stream, fmt), batch_size):
+        batch_start = time.perf_counter()
+        if kind == "vendors":
+            rows = _validate_vendors(batch, report)
+            stats = bulk_load.load(engine, rows, method, batch_size=len(rows) or 1)
+            written = stats.vendors + stats.items
+            report.vendors += stats.vendors
+            report.items += stats.items
+        else:
+            written = _insert_items(engine, _validate_items(batch, report), report)
+            report.items += written
+
+        report.batches += 1
+        report.seconds = time.perf_counter() - start
+        if progress:
+            batch_seconds = time.perf_counter() - batch_start
+            progress(
+                stage="importing", batch=report.batches, vendors=report.vendors, items=report.items,
+                rejected=report.rejected, batch_rows_per_second=round(written / batch_seconds) if batch_seconds else 0
+            )
+
+    report.seconds = time.perf_counter() - start
+    if report.vendors or report.items:
+        clear_search_results()
+        if settings.SEARCH_ENGINE == "columnar":
+            from app.services.columnar_search import ColumnarSearch
+
+            ColumnarSearch.refresh_appended(engine)
+    return report
+
+
+def _validate_vendors(batch, report: ImportReport) -> List[bulk_load.Row]:
+    rows = []
+    for line, record, error in batch:
+        if error:
+            report.reject(line, error)
+            continue
+        try:
+            items = [_nest_flags(item) if isinstance(item, dict) else item for item in record.get("items") or []]
+            vendor = VendorImport.model_validate({**record, "items": items})
+        except ValidationError as e:
+            report.reject(line, _format_error(e))
+            continue
+        rows.append((
+            vendor.model_dump(exclude={"items"}),
+            [_item_columns(item) for item in vendor.items],
+        ))
+    return rows
+
+
+def _validate_items(batch, report: ImportReport) -> List[Tuple[int, ItemCreate]]:
+    items = []
+    for line, record, error in batch:
+        if error:
+            report.reject(line, error)
+            continue
+        try:
+            items.append((line, ItemCreate.model_validate(_nest_flags(record))))
+        except ValidationError as e:
+            report.reject(line, _format_error(e))
+    return items
+
+
+def _insert_items(engine, items: List[Tuple[int, ItemCreate]], report: ImportReport) -> int:
+    """Insert items whose vendor exists; reject the rest."""
+    if not items:
+        return 0
+    with engine.begin() as conn:
+        vendor_ids = {item.vendor_id for _, item in items}
+        existing = set(conn.execute(select(Vendor.id).where(Vendor.id.in_(vendor_ids))).scalars())
+        values = []
+        for line, item in items:
+            if item.vendor_id in existing:
+                values.append({**_item_columns(item), "vendor_id": item.vendor_id})
+            else:
+                report.reject(line, f"vendor_id: vendor {item.vendor_id} does not exist")
+        if values:
+            SyncService.stamp(conn, values)
+            conn.execute(insert(Item.__table__), values)
+            SyncService.restamp_vendors(conn, {value["vendor_id"] for value in values})
+            ItemGroupService.rebuild(conn, {value["vendor_id"] for value in values})
+    return len(values)
+
+
+def import_file(path: str, kind: str = "vendors", fmt: Optional[str] = None, **kwargs) -> ImportReport:
+    """Import records from a file; the format defaults to the file extension."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return import_records(f, kind, fmt or detect_format(path), **kwargs)
+
+
+def import_binary(stream: IO[bytes], kind: str, fmt: str, **kwargs) -> ImportReport:
+    """Import records from a binary (e.g. uploaded) UTF-8 stream."""
+    with io.TextIOWrapper(stream, encoding="utf-8", newline="") as text_stream:
+        return import_records(text_stream, kind, fmt, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import vendors or menu items from JSONL or CSV")
+    parser.add_argument("path", help="JSONL or CSV file")
+    parser.add_argument("--kind", choices=KINDS, default="vendors", help="Record type")
+    parser.add_argument("--format", choices=FORMATS, help="File format (default: from extension)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Records per batch")
+    parser.add_argument("--method", choices=bulk_load.METHODS, default="returning", help="Vendor load method")
+    args = parser.parse_args()
+
+    def progress(stage, batch, vendors, items, rejected, batch_rows_per_second):
+        print(f"  batch {batch}: {vendors} vendors / {items} items, {rejected} rejected "
+              f"({batch_rows_per_second:,} rows/s)")
+
+    print(f"Importing {args.kind} from {args.path}...")
+    report = import_file(
+        args.path, args.kind, args.format,
+        batch_size=args.batch_size, method=args.method, progress=progress
+    )
+    print(f"✅ Imported {report.vendors} vendors / {report.items} items in {report.seconds:.1f}s "
+          f"({report.rows_per_second:,.0f} rows/s)")
+    if report.rejected:
+        print(f"❌ Rejected {report.rejected} records:")
+        for rejection in report.rejections:
+            print(f"   line {rejection['line']}: {rejection['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+In-process background jobs with progress reporting.
+
+Long-running admin work (reseeds, imports) runs in a worker thread so the
+request that started it returns immediately with a job id. Jobs live in
+process memory: with multiple workers, poll the worker that accepted the
+job (or run the CLI equivalent instead).
+"""
+import logging
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept for status polling
+MAX_FINISHED_JOBS = 50
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobConflict(Exception):
+    """Raised when a job of the same kind is already running."""
+
+
+class Job:
+    """A unit of background work. The target updates progress as it goes."""
+
+    def __init__(self, kind: str, description: str = ""):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.description = description
+        self.status = PENDING
+        self.progress: Dict = {}
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def update(self, **progress) -> None:
+        """Merge progress fields (stage, counts, rates) reported by the target."""
+        with self._lock:
+            self.progress = {**self.progress, **progress}
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "description": self.description,
+                "status": self.status,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at.isoformat(),
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            }
+
+
+class JobRegistry:
+    """Starts jobs in daemon threads and keeps their status for polling."""
+
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, target: Callable[[Job], Optional[Dict]], description: str = "") -> Job:
+        """
+        Run target(job) in a background thread.
+
+        Only one job of each kind runs at a time; a second submit raises
+        JobConflict. The target's return value becomes job.result.
+        """
+        job = Job(kind, description)
+        with self._lock:
+            if any(j.kind == kind and not j.done for j in self._jobs.values()):
+                raise JobConflict(f"A {kind} job is already running")
+            self._jobs[job.id] = job
+            self._prune()
+
+        thread = threading.Thread(target=self._run, args=(job, target), name=f"job-{kind}-{job.id[:8]}", daemon=True)
+        thread.start()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        return list(reversed(self._jobs.values()))
+
+    def _run(self, job: Job, target: Callable[[Job], Optional[Dict]]) -> None:
+        job.started_at = datetime.now(timezone.utc)
+        job.status = RUNNING
+        try:
+            job.result = target(job)
+            job.status = SUCCEEDED
+        except Exception as e:
+            logger.error("Job %s (%s) failed:\n%s", job.id, job.kind, traceback.format_exc())
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+
+registry = JobRegistry()
@@ -1,19 +1,88 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.config import settings
-from app.database import engine, Base
-from app.api.v1 import vendors, items, admin, config
+from app.database import engine
+from app.deadlines import DeadlineExceeded
+from app.middleware import (
+    AdmissionControlMiddleware,
+    CompressionMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    QueryGuardMiddleware,
+)
+from app.monitoring import install_sql_hooks, metrics
+from app.api.v1 import vendors, items, admin, config, sync
+from app.services.search_executor import SearchExecutor
+from app.startup import run_startup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Verify the schema (no create_all at import) and optionally warm caches."""
+    run_startup(engine)
+    yield
+    SearchExecutor.shutdown()
+    engine.dispose()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    description="Backend API for Dietprefs food vendor discovery app"
+    description="Backend API for Dietprefs food vendor discovery app",
+    lifespan=lifespan
 )
 
+# Compress larger responses (search results, menus)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+# Per-stage profiling with Server-Timing headers (off by default)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, sample_rate=settings.PROFILING_SAMPLE_RATE)
+
+# Concurrency limits and queues for expensive routes; overload is shed with 503
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        route_classes=[
+            ("search", "POST", rf"^{settings.API_V1_PREFIX}/vendors/search(/.*)?$"),
+            ("menu", "GET", rf"^{settings.API_V1_PREFIX}/vendors/\d+/items$"),
+        ],
+        limits={
+            "search": (settings.ADMISSION_SEARCH_CONCURRENCY, settings.ADMISSION_SEARCH_QUEUE),
+            "menu": (settings.ADMISSION_MENU_CONCURRENCY, settings.ADMISSION_MENU_QUEUE),
+        },
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    )
+
+# Request latency, in-flight and error metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    metrics.register_pool_collector(engine)
+
+# Slow-query and N+1 detection
+if settings.QUERY_GUARD_ENABLED:
+    app.add_middleware(
+        QueryGuardMiddleware,
+        max_statements=settings.QUERY_GUARD_MAX_STATEMENTS,
+        max_duration_ms=settings.QUERY_GUARD_MAX_DURATION_MS,
+        repeat_threshold=settings.QUERY_GUARD_REPEAT_THRESHOLD,
+        strict=settings.QUERY_GUARD_STRICT,
+    )
+
+if settings.PROFILING_ENABLED or settings.METRICS_ENABLED or settings.QUERY_GUARD_ENABLED:
+    install_sql_hooks(engine)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -24,6 +93,17 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    """A search ran past SEARCH_DEADLINE_SECONDS: answer like a shed request."""
+    metrics.deadline_exceeded.inc()
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Request took too long, retry shortly"},
+        headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+    )
+
+
 # Health check endpoints
 @app.get("/")
 async def root():
@@ -41,29 +121,35 @@ async def health_check():
     return {"status": "healthy"}
 
 
-@app.post("/seed")
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus text exposition of request, database and cache metrics."""
+    return PlainTextResponse(
+        metrics.registry.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.post("/seed", status_code=202, dependencies=[Depends(admin.require_admin)])
 async def seed_database_endpoint():
     """
-    Seed the database with sample restaurant data.
-    This will clear existing data and repopulate with fresh seed data.
+    ADMIN ONLY: Seed the database with sample restaurant data.
+    Runs in the background: data is loaded into staging tables and swapped
+    in atomically, so existing data keeps being served until it completes.
     Can be called multiple times to refresh the database.
     """
-    try:
-        from app.seed import seed_database
-        seed_database()
-        return {
-            "status": "success",
-            "message": "Database seeded successfully with 20 restaurants"
-        }
-    except Exception as e:
-        return {
-            "status": "error",
-            "message": f"Failed to seed database: {str(e)}"
-        }
+    job = admin.start_reseed_job()
+    return {
+        "status": "accepted",
+        "message": "Seeding started with 20 restaurants",
+        "job_id": job.id,
+        "status_url": f"{settings.API_V1_PREFIX}/admin/jobs/{job.id}"
+    }
 
 
 # Include API routers
 app.include_router(config.router, prefix=settings.API_V1_PREFIX, tags=["config"])
 app.include_router(vendors.router, prefix=settings.API_V1_PREFIX, tags=["vendors"])
 app.include_router(items.router, prefix=settings.API_V1_PREFIX, tags=["items"])
+app.include_router(sync.router, prefix=settings.API_V1_PREFIX, tags=["sync"])
 app.include_router(admin.router, prefix=settings.API_V1_PREFIX, tags=["admin"])
@@ -0,0 +1,140 @@
+"""
+Admission control middleware.
+
+Expensive routes are grouped into route classes, each with a concurrency
+limit and a bounded FIFO queue (per worker process). A request of a class at
+its limit waits in the queue; when the queue is full, or the wait exceeds
+the queue timeout, it is shed right away with 503 and ``Retry-After``
+instead of piling up behind the running requests. Routes outside every class
+(health checks, /config, votes, vendor details) are never queued, so they
+stay fast while searches saturate the worker.
+"""
+import asyncio
+import re
+from collections import deque
+from typing import Deque, Dict, Optional, Pattern, Sequence, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.monitoring import metrics
+
+
+class AdmissionGate:
+    """Concurrency limit with a bounded FIFO queue of waiting requests."""
+
+    def __init__(self, name: str, limit: int, queue_depth: int):
+        self.name = name
+        self.limit = max(limit, 1)
+        self.queue_depth = max(queue_depth, 0)
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, waiting up to timeout seconds in the queue. False if shed."""
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            return True
+        if self.queued >= self.queue_depth:
+            return False
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        timer = loop.call_later(timeout, self._expire, waiter)
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                self.release()  # Handed a slot while being cancelled: pass it on
+            raise
+        finally:
+            timer.cancel()
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the longest-waiting request if any."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+    def _expire(self, waiter: asyncio.Future) -> None:
+        if not waiter.done():
+            waiter.set_result(False)
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware applying per-route-class admission limits.
+
+    Args:
+        app: Wrapped ASGI application
+        route_classes: (class name, HTTP method, path regex) in match order
+        limits: Class name -> (concurrency limit, queue depth)
+        queue_timeout: Longest a request waits in a queue before it is shed
+        retry_after: Seconds advertised in Retry-After on shed requests
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        route_classes: Sequence[Tuple[str, str, str]],
+        limits: Dict[str, Tuple[int, int]],
+        queue_timeout: float = 1.0,
+        retry_after: int = 1
+    ):
+        self.app = app
+        self.route_classes: Sequence[Tuple[str, str, Pattern]] = [
+            (name, method, re.compile(pattern)) for name, method, pattern in route_classes
+        ]
+        self.gates = {name: AdmissionGate(name, limit, depth) for name, (limit, depth) in limits.items()}
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        metrics.registry.register_collector(
+            "admission_requests_in_progress", "gauge",
+            "Requests holding (active) or waiting for (queued) an admission slot, by route class",
+            self._collect
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        gate = self._gate(scope) if scope["type"] == "http" else None
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await gate.acquire(self.queue_timeout):
+            metrics.admission_requests.labels(gate.name, "shed").inc()
+            response = JSONResponse(
+                {"detail": "Server is busy, retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        metrics.admission_requests.labels(gate.name, "admitted").inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
+
+    def _gate(self, scope: Scope) -> Optional[AdmissionGate]:
+        for name, method, pattern in self.route_classes:
+            if scope["method"] == method and pattern.match(scope["path"]):
+                return self.gates.get(name)
+        return None
+
+    def _collect(self):
+        samples = []
+        for name, gate in self.gates.items():
+            samples.append(("admission_requests_in_progress", {"route_class": name, "state": "active"}, gate.active))
+            samples.append(("admission_requests_in_progress", {"route_class": name, "state": "queued"}, gate.queued))
+        return samples
@@ -0,0 +1,299 @@
+"""
+Response compression middleware.
+
+Compresses response bodies with brotli (when the optional ``brotli`` package
+is installed) or gzip, based on the client's Accept-Encoding header.
+Responses below the configured minimum size, responses that already carry a
+Content-Encoding, and non-text content types are passed through untouched.
+"""
+import json
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+
+GZIP = "gzip"
+BROTLI = "br"
+
+# Content types worth compressing (JSON, NDJSON, text, etc.)
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/xml")
+
+
+def available_encodings() -> list:
+    """Encodings supported in this process, in order of preference."""
+    return [BROTLI, GZIP] if brotli is not None else [GZIP]
+
+
+def select_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the best supported encoding from an Accept-Encoding header value.
+
+    The encoding with the highest q-value wins (ties go to the order of
+    available_encodings). ``*`` only covers encodings the header does not
+    name, so an explicit ``q=0`` refusal always holds.
+
+    Examples:
+        >>> select_encoding("gzip, deflate")
+        'gzip'
+
+        >>> select_encoding("gzip;q=0, identity") is None
+        True
+
+        >>> select_encoding("gzip;q=0, *") != GZIP
+        True
+    """
+    if not accept_encoding:
+        return None
+
+    qualities: Dict[str, float] = {}
+    for token in accept_encoding.split(","):
+        parts = token.strip().split(";")
+        name = parts[0].strip().lower()
+        quality = 1.0
+        for param in parts[1:]:
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            qualities[name] = max(quality, qualities.get(name, 0.0))
+
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_payload(body: bytes, encoding: str, level: int) -> bytes:
+    """One-shot compression of a complete body."""
+    encoder = _make_encoder(encoding, level)
+    return encoder.compress(body) + encoder.finish()
+
+
+class _GzipEncoder:
+    """Incremental gzip encoder (zlib with a gzip header)."""
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    """Incremental brotli encoder."""
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _make_encoder(encoding: str, level: int):
+    if encoding == BROTLI:
+        return _BrotliEncoder(level)
+    return _GzipEncoder(level)
+
+
+def _is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return any(content_type.startswith(t) for t in COMPRESSIBLE_TYPES) or "+json" in content_type
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with brotli or gzip.
+
+    Args:
+        app: Wrapped ASGI application
+        minimum_size: Bodies smaller than this (in bytes) are sent uncompressed
+        gzip_level: zlib compression level (1-9)
+        brotli_quality: brotli quality (0-11), used only if brotli is installed
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {GZIP: gzip_level, BROTLI: brotli_quality}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = select_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(
+            self.app, encoding, self.levels[encoding], self.minimum_size
+        )
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    """Per-request state for CompressionMiddleware."""
+
+    def __init__(self, app: ASGIApp, encoding: str, level: int, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.send = None
+        self.start_message: Optional[Message] = None
+        self.encoder = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_compression)
+
+    async def send_with_compression(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            # Defer the start message until the first body chunk tells us the size
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or not _is_compressible(headers.get("content-type", ""))
+            )
+            return
+
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            if self.start_message is not None:
+                await self.send(self.start_message)
+                self.start_message = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            # First body chunk: decide whether to compress
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(self.start_message)
+                self.start_message = None
+                await self.send(message)
+                return
+
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            self.encoder = _make_encoder(self.encoding, self.level)
+
+            if not more_body:
+                # Whole body available: compress in one shot
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start_message)
+                self.start_message = None
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+            # Streaming body: length is unknown up front
+            del headers["Content-Length"]
+            await self.send(self.start_message)
+            self.start_message = None
+
+        if more_body:
+            chunk = self.encoder.compress(body) + self.encoder.flush()
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            chunk = self.encoder.compress(body) + self.encoder.finish()
+            await self.send({"type": "http.response.body", "body": chunk})
+
+
+class PrecompressedPayload:
+    """
+    A serialized response body with its compressed variants computed once.
+
+    Used for static payloads (app config, preference metadata) so repeated
+    requests skip both JSON serialization and compression.
+    """
+
+    def __init__(
+        self,
+        body: bytes,
+        media_type: str = "application/json",
+        minimum_size: int = 500,
+        compress: bool = True
+    ):
+        self.body = body
+        self.media_type = media_type
+        self.variants: Dict[str, bytes] = {}
+
+        if compress and len(body) >= minimum_size:
+            for encoding in available_encodings():
+                # Static payloads are compressed once, so use the strongest level
+                level = 11 if encoding == BROTLI else 9
+                self.variants[encoding] = compress_payload(body, encoding, level)
+
+    def to_bytes(self) -> bytes:
+        """Encode the body and its variants (for a cache shared between workers)."""
+        parts = {"identity": self.body, **self.variants}
+        header = json.dumps({"media_type": self.media_type, "parts": {k: len(v) for k, v in parts.items()}})
+        return header.encode() + b"\n" + b"".join(parts.values())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PrecompressedPayload":
+        """Rebuild a payload from to_bytes() output without compressing again."""
+        header, _, rest = data.partition(b"\n")
+        meta = json.loads(header)
+        parts, offset = {}, 0
+        for name, size in meta["parts"].items():
+            parts[name] = rest[offset:offset + size]
+            offset += size
+        payload = cls(parts.pop("identity"), meta["media_type"], compress=False)
+        payload.variants = parts
+        return payload
+
+    def response(self, accept_encoding: Optional[str]) -> Response:
+        """Build a response using the best variant the client accepts."""
+        encoding = select_encoding(accept_encoding)
+        if encoding in self.variants:
+            return Response(
+                content=self.variants[encoding],
+                media_type=self.media_type,
+                headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+            )
+        return Response(content=self.body, media_type=self.media_type)
@@ -0,0 +1,59 @@
+"""
+Metrics middleware.
+
+Records per-route request counts, latency histograms, in-flight requests and
+error counts. Routes are labelled by their path template (``/vendors/{vendor_id}``)
+so label cardinality stays bounded.
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.monitoring import metrics
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding the HTTP metrics in app.monitoring.metrics."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        raised = False
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics.http_requests_in_flight.labels().inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            raised = True
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            metrics.http_requests_in_flight.labels().dec()
+
+            method = scope["method"]
+            route = _route_label(scope)
+            metrics.http_requests.labels(method, route, str(status_code)).inc()
+            metrics.http_request_duration.labels(method, route).observe(duration)
+            if raised:
+                metrics.http_errors.labels(method, route, "exception").inc()
+            elif status_code >= 500:
+                metrics.http_errors.labels(method, route, "5xx").inc()
+
+
+def _route_label(scope: Scope) -> str:
+    """Path template of the matched route (set on the scope by the router)."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
@@ -0,0 +1,49 @@
+"""
+Profiling middleware.
+
+Activates a RequestProfile for sampled requests, adds the recorded stage
+timings to the response as a ``Server-Timing`` header, and feeds the
+process-wide profile aggregator.
+"""
+import random
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.monitoring import profiling
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware recording per-request stage timings.
+
+    Args:
+        app: Wrapped ASGI application
+        sample_rate: Fraction of requests to profile (0.0 - 1.0)
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 1.0):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (
+            self.sample_rate < 1.0 and random.random() >= self.sample_rate
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile, token = profiling.start_profile()
+
+        async def send_with_server_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and profile.stages:
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", profile.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            profiling.end_profile(token)
+            if profile.stages:
+                profiling.aggregator.add(profile)
@@ -0,0 +1,57 @@
+"""
+Query guard middleware.
+
+Tracks the SQL statements each request executes and flags requests that
+exceed the configured statement count or SQL time, or that repeat the same
+statement template many times (the signature of an N+1 lazy load).
+"""
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.monitoring import query_guard
+
+
+class QueryGuardMiddleware:
+    """
+    ASGI middleware enforcing a per-request SQL budget.
+
+    Args:
+        app: Wrapped ASGI application
+        max_statements: Statements allowed per request before it is flagged
+        max_duration_ms: SQL time allowed per request before it is flagged
+        repeat_threshold: Executions of one statement template treated as N+1
+        strict: Raise QueryBudgetExceeded instead of logging (for test runs)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_statements: int = 20,
+        max_duration_ms: float = 500.0,
+        repeat_threshold: int = 10,
+        strict: bool = False
+    ):
+        self.app = app
+        self.max_statements = max_statements
+        self.max_duration_ms = max_duration_ms
+        self.repeat_threshold = repeat_threshold
+        self.strict = strict
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log, token = query_guard.start_log()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            query_guard.end_log(token)
+
+        query_guard.check_budget(
+            log,
+            f"{scope['method']} {scope['path']}",
+            self.max_statements,
+            self.max_duration_ms,
+            self.repeat_threshold,
+            self.strict
+        )
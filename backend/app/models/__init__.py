@@ -1,4 +1,7 @@
 from app.models.vendor import Vendor
 from app.models.item import Item
+from app.models.item_group import ItemGroup
+from app.models.catalog_state import CatalogState
+from app.models.tombstone import Tombstone
 
-__all__ = ["Vendor", "Item"]
+__all__ = ["Vendor", "Item", "ItemGroup", "CatalogState", "Tombstone"]
@@ -0,0 +1,28 @@
+from sqlalchemy import BigInteger, Column, Integer, Sequence
+from app.database import Base
+
+
+# Change versions on PostgreSQL (SyncService.reserve). Must not cache values
+# per session (CACHE 1, the default): readers rely on last_value.
+catalog_versions = Sequence("catalog_versions", metadata=Base.metadata)
+
+
+class CatalogState(Base):
+    """
+    The catalog's change counter: a single row (id 1) maintained by SyncService.
+
+    version is the last change version handed out to a vendor, item or
+    tombstone row (SQLite; PostgreSQL takes them from the catalog_versions
+    sequence). Versions up to reset_version belong to a catalog that has
+    since been replaced (swap, recreated tables), so clients that synced
+    before it start over.
+    """
+
+    __tablename__ = "catalog_state"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False)
+    reset_version = Column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<CatalogState(version={self.version}, reset_version={self.reset_version})>"
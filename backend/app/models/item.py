@@ -1,19 +1,38 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, DateTime, ForeignKey
+from sqlalchemy import (
+    BigInteger, Column, Integer, String, Float, Boolean, Text, DateTime, ForeignKey, Index, literal_column, true
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
+# Most-selected dietary preferences, each with a partial (vendor_id, price) index
+INDEXED_FLAGS = ("vegetarian", "vegan", "keto", "gluten_free")
+
+
+def _flag_index(flag: str) -> Index:
+    """Index over the items with flag set, for per-vendor preference and price lookups."""
+    predicate = literal_column(flag) == true()
+    return Index(
+        f"ix_items_vendor_price_{flag}", "vendor_id", "price",
+        postgresql_where=predicate, sqlite_where=predicate
+    )
+
 
 class Item(Base):
     """Menu item model with extensive dietary and allergen flags."""
 
     __tablename__ = "items"
+    __table_args__ = (
+        # Menu loading (vendor_id IN ...) and max price filters within a vendor
+        Index("ix_items_vendor_id_price", "vendor_id", "price"),
+        *(_flag_index(flag) for flag in INDEXED_FLAGS),
+    )
 
     # Primary key
     id = Column(Integer, primary_key=True, index=True)
 
     # Foreign key to vendor
-    vendor_id = Column(Integer, ForeignKey("vendors.id", ondelete="CASCADE"), nullable=False, index=True)
+    vendor_id = Column(Integer, ForeignKey("vendors.id", ondelete="CASCADE"), nullable=False)
 
     # Basic info
     name = Column(String(255), nullable=False)
@@ -21,10 +40,10 @@ class Item(Base):
     pictures = Column(Text)  # Comma-separated URLs
 
     # Dietary preferences
-    vegetarian = Column(Boolean, default=False, index=True)
+    vegetarian = Column(Boolean, default=False)
     pescetarian = Column(Boolean, default=False)
-    vegan = Column(Boolean, default=False, index=True)
-    keto = Column(Boolean, default=False, index=True)
+    vegan = Column(Boolean, default=False)
+    keto = Column(Boolean, default=False)
     organic = Column(Boolean, default=False)
     gmo_free = Column(Boolean, default=False)
     locally_sourced = Column(Boolean, default=False)
@@ -47,7 +66,7 @@ class Item(Base):
     no_shellfish = Column(Boolean, default=False)
     no_peanuts = Column(Boolean, default=False)
     no_treenuts = Column(Boolean, default=False)
-    gluten_free = Column(Boolean, default=False, index=True)
+    gluten_free = Column(Boolean, default=False)
     no_soy = Column(Boolean, default=False)
     no_sesame = Column(Boolean, default=False)
     no_msg = Column(Boolean, default=False)
@@ -66,6 +85,9 @@ class Item(Base):
     upvotes = Column(Integer, default=0)
     total_votes = Column(Integer, default=0)
 
+    # Delta sync: version of the row's last change (SyncService)
+    change_version = Column(BigInteger, nullable=False, server_default="0", index=True)
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -0,0 +1,37 @@
+from sqlalchemy import BigInteger, Column, Float, ForeignKey, Integer
+from app.database import Base
+
+# Bit i of ItemGroup.flags is FLAG_BITS[i]. Stored in the database: append new
+# flags at the end, never reorder.
+FLAG_BITS = (
+    "vegetarian", "pescetarian", "vegan", "keto", "organic", "gmo_free", "locally_sourced", "raw",
+    "kosher", "halal", "beef", "chicken", "pork", "seafood", "no_pork_products", "no_red_meat",
+    "no_milk", "no_eggs", "no_fish", "no_shellfish", "no_peanuts", "no_treenuts", "gluten_free",
+    "no_soy", "no_sesame", "no_msg", "no_alliums", "low_sugar", "high_protein", "low_carb",
+    "entree", "sweet",
+)
+
+
+class ItemGroup(Base):
+    """
+    Summary of a vendor's items that share one dietary profile.
+
+    One row per (vendor, flag mask, priced or not): unpriced items pass any
+    max price filter, so they are kept apart with NULL min/max prices.
+    Derived from the items table by ItemGroupService; never edit directly.
+    """
+
+    __tablename__ = "item_groups"
+
+    id = Column(Integer, primary_key=True)
+    vendor_id = Column(Integer, ForeignKey("vendors.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    flags = Column(BigInteger, nullable=False)  # Dietary flag mask, see FLAG_BITS
+    min_price = Column(Float)
+    max_price = Column(Float)
+    item_count = Column(Integer, nullable=False)
+    upvotes = Column(Integer, nullable=False)
+    total_votes = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<ItemGroup(vendor_id={self.vendor_id}, flags={self.flags:#x}, items={self.item_count})>"
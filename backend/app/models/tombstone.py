@@ -0,0 +1,27 @@
+from sqlalchemy import BigInteger, Column, Float, Integer, String
+from app.database import Base
+
+
+class Tombstone(Base):
+    """
+    A deleted vendor or item, kept so delta sync (GET /sync) can report it.
+
+    Written by SyncService in the deleting transaction. lat/lng are the
+    vendor's location at the time, for area-filtered syncs. A deleted
+    vendor's items get no tombstones of their own (clients drop them with
+    the vendor); a vendor that moves leaves a vendor tombstone at its old
+    location.
+    """
+
+    __tablename__ = "tombstones"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(10), nullable=False)  # "vendor" or "item"
+    row_id = Column(Integer, nullable=False)
+    vendor_id = Column(Integer, nullable=False)
+    lat = Column(Float, nullable=False)
+    lng = Column(Float, nullable=False)
+    change_version = Column(BigInteger, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<Tombstone({self.kind} {self.row_id}, version={self.change_version})>"
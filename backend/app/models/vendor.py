@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, DateTime
+from sqlalchemy import BigInteger, Column, Integer, String, Float, Boolean, Text, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -8,6 +8,10 @@ class Vendor(Base):
     """Vendor/Restaurant model representing food establishments."""
 
     __tablename__ = "vendors"
+    __table_args__ = (
+        # Distance search filters on a lat/lng bounding box
+        Index("ix_vendors_lat_lng", "lat", "lng"),
+    )
 
     # Primary key
     id = Column(Integer, primary_key=True, index=True)
@@ -22,8 +26,8 @@ class Vendor(Base):
     seo_tags = Column(Text)  # Comma-separated tags
 
     # Location
-    lat = Column(Float, nullable=False, index=True)
-    lng = Column(Float, nullable=False, index=True)
+    lat = Column(Float, nullable=False)
+    lng = Column(Float, nullable=False)
     region = Column(Integer)
 
     # Delivery options
@@ -51,12 +55,16 @@ class Vendor(Base):
     cuisine_east_asia = Column(Boolean, default=False)
     fusion = Column(Boolean, default=False)  # Manual flag for hard-to-categorize
 
+    # Delta sync: version of the row's last change (SyncService)
+    change_version = Column(BigInteger, nullable=False, server_default="0", index=True)
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     items = relationship("Item", back_populates="vendor", cascade="all, delete-orphan")
+    item_groups = relationship("ItemGroup", viewonly=True)  # Maintained by ItemGroupService
 
     def __repr__(self):
         return f"<Vendor(id={self.id}, name='{self.name}')>"
@@ -0,0 +1,4 @@
+from app.monitoring import metrics, profiling, query_guard
+from app.monitoring.sql import install_sql_hooks
+
+__all__ = ["metrics", "profiling", "query_guard", "install_sql_hooks"]
@@ -0,0 +1,184 @@
+"""
+Request-scoped profiling for the search pipeline.
+
+Code marks pipeline stages with ``profiling.stage("search.fetch")`` and
+records counters with ``profiling.count("search.candidates", n)``. When no
+profile is active for the current request (profiling disabled or request not
+sampled), both calls reduce to a context variable lookup.
+
+Completed profiles are exposed as a ``Server-Timing`` header by
+ProfilingMiddleware and aggregated process-wide in ``aggregator``.
+"""
+import math
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+
+class RequestProfile:
+    """Stage timings, counters and SQL statement counts for one request."""
+
+    __slots__ = ("stages", "counters", "sql_queries", "sql_time")
+
+    def __init__(self):
+        self.stages: List[Tuple[str, float, int]] = []  # (name, duration_ms, sql_queries)
+        self.counters: Dict[str, int] = {}
+        self.sql_queries = 0
+        self.sql_time = 0.0  # seconds
+
+    def server_timing(self) -> str:
+        """Render the profile as a Server-Timing header value."""
+        entries = [
+            f'{name};dur={duration_ms:.2f};desc="{queries} queries"'
+            for name, duration_ms, queries in self.stages
+        ]
+        entries.append(f'db;dur={self.sql_time * 1000:.2f};desc="{self.sql_queries} queries"')
+        entries.extend(f'{name};desc="{value}"' for name, value in self.counters.items())
+        return ", ".join(entries)
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+_NULL_STAGE = nullcontext()
+
+
+def current_profile() -> Optional[RequestProfile]:
+    """Profile of the current request, or None if it is not being profiled."""
+    return _current_profile.get()
+
+
+def start_profile() -> Tuple[RequestProfile, object]:
+    """Activate a new profile for the current context. Returns (profile, reset token)."""
+    profile = RequestProfile()
+    return profile, _current_profile.set(profile)
+
+
+def end_profile(token) -> None:
+    _current_profile.reset(token)
+
+
+class _Stage:
+    """Context manager timing one pipeline stage."""
+
+    __slots__ = ("profile", "name", "start", "start_queries")
+
+    def __init__(self, profile: RequestProfile, name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.start_queries = self.profile.sql_queries
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self.start) * 1000
+        queries = self.profile.sql_queries - self.start_queries
+        self.profile.stages.append((self.name, duration_ms, queries))
+        return False
+
+
+def stage(name: str):
+    """Time a pipeline stage: ``with profiling.stage("search.sort"): ...``"""
+    profile = _current_profile.get()
+    if profile is None:
+        return _NULL_STAGE
+    return _Stage(profile, name)
+
+
+def count(name: str, value: int) -> None:
+    """Record a counter (candidate count, items hydrated, ...) on the current profile."""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.counters[name] = profile.counters.get(name, 0) + value
+
+
+def record_sql(duration: float) -> None:
+    """Record one executed SQL statement (called from the engine event hooks)."""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.sql_queries += 1
+        profile.sql_time += duration
+
+
+class ProfileAggregator:
+    """
+    Process-wide aggregation of completed request profiles.
+
+    Keeps running totals plus a bounded window of recent samples per stage,
+    so percentiles reflect recent traffic at a fixed memory cost.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self._stages: Dict[str, dict] = {}
+            self._counters: Dict[str, dict] = {}
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self.requests += 1
+            for name, duration_ms, queries in profile.stages:
+                entry = self._stages.get(name)
+                if entry is None:
+                    entry = self._stages[name] = {
+                        "count": 0, "total_ms": 0.0, "max_ms": 0.0, "sql_queries": 0,
+                        "samples": deque(maxlen=self.window)
+                    }
+                entry["count"] += 1
+                entry["total_ms"] += duration_ms
+                entry["max_ms"] = max(entry["max_ms"], duration_ms)
+                entry["sql_queries"] += queries
+                entry["samples"].append(duration_ms)
+
+            for name, value in profile.counters.items():
+                entry = self._counters.get(name)
+                if entry is None:
+                    entry = self._counters[name] = {"count": 0, "total": 0, "max": 0}
+                entry["count"] += 1
+                entry["total"] += value
+                entry["max"] = max(entry["max"], value)
+
+    def summary(self) -> dict:
+        """Aggregated stage timings and counters as a JSON-serializable dict."""
+        with self._lock:
+            stages = {}
+            for name, entry in self._stages.items():
+                samples = sorted(entry["samples"])
+                stages[name] = {
+                    "count": entry["count"],
+                    "mean_ms": round(entry["total_ms"] / entry["count"], 3),
+                    "p50_ms": round(_percentile(samples, 50), 3),
+                    "p95_ms": round(_percentile(samples, 95), 3),
+                    "p99_ms": round(_percentile(samples, 99), 3),
+                    "max_ms": round(entry["max_ms"], 3),
+                    "mean_sql_queries": round(entry["sql_queries"] / entry["count"], 2),
+                }
+
+            counters = {
+                name: {
+                    "count": entry["count"],
+                    "mean": round(entry["total"] / entry["count"], 2),
+                    "max": entry["max"],
+                }
+                for name, entry in self._counters.items()
+            }
+
+            return {"requests": self.requests, "stages": stages, "counters": counters}
+
+
+def _percentile(sorted_samples: List[float], percent: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = max(math.ceil(len(sorted_samples) * percent / 100) - 1, 0)
+    return sorted_samples[index]
+
+
+aggregator = ProfileAggregator()
@@ -0,0 +1,204 @@
+"""
+Per-request SQL statement tracking for slow-query and N+1 detection.
+
+Every statement executed while a QueryLog is active is normalized to a
+template (parameters and IN-lists collapsed) and counted. The first few
+occurrences of each template also record the application call site that
+issued them, so a flagged request can be traced back to the lazy load or
+loop that caused it.
+"""
+import logging
+import re
+import sys
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Call sites recorded per template (first occurrences only, to bound overhead)
+MAX_CALL_SITES = 3
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\(\s*(?:\?|%\([^)]*\)s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%\([^)]*\)s|:\w+|\$\d+))+\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+
+_APP_DIR = __file__.rsplit("/monitoring/", 1)[0]
+_IGNORED_DIRS = (f"{_APP_DIR}/monitoring/", f"{_APP_DIR}/middleware/")
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a request exceeds its SQL statement or time budget."""
+
+
+class _TemplateStats:
+    __slots__ = ("count", "duration", "call_sites")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.call_sites: List[str] = []
+
+
+class QueryLog:
+    """Statements executed during one request (or one ``query_budget`` block)."""
+
+    def __init__(self):
+        self.statements = 0
+        self.duration = 0.0  # seconds
+        self.templates: Dict[str, _TemplateStats] = {}
+
+    def record(self, statement: str, duration: float) -> None:
+        self.statements += 1
+        self.duration += duration
+
+        template = normalize_statement(statement)
+        stats = self.templates.get(template)
+        if stats is None:
+            stats = self.templates[template] = _TemplateStats()
+        stats.count += 1
+        stats.duration += duration
+        if len(stats.call_sites) < MAX_CALL_SITES:
+            call_site = _find_call_site()
+            if call_site not in stats.call_sites:
+                stats.call_sites.append(call_site)
+
+    def repeated_templates(self, threshold: int) -> List[str]:
+        """Templates executed at least threshold times (likely N+1 patterns)."""
+        return [t for t, stats in self.templates.items() if stats.count >= threshold]
+
+    def report(self, limit: int = 10) -> str:
+        """Human-readable breakdown of the most frequent statement templates."""
+        lines = [f"{self.statements} statements, {self.duration * 1000:.1f} ms total"]
+        ranked = sorted(self.templates.items(), key=lambda entry: entry[1].count, reverse=True)
+        for template, stats in ranked[:limit]:
+            lines.append(f"  {stats.count}x {stats.duration * 1000:.1f} ms  {template[:200]}")
+            for call_site in stats.call_sites:
+                lines.append(f"      at {call_site}")
+        return "\n".join(lines)
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Collapse a SQL statement to a template for grouping.
+
+    Examples:
+        >>> normalize_statement("SELECT * FROM items WHERE items.vendor_id IN (?, ?, ?)")
+        'SELECT * FROM items WHERE items.vendor_id IN (?)'
+
+        >>> normalize_statement("SELECT 1 LIMIT 10 OFFSET 20")
+        'SELECT ? LIMIT ? OFFSET ?'
+    """
+    template = _WHITESPACE.sub(" ", statement).strip()
+    template = _STRING.sub("?", template)
+    template = _IN_LIST.sub("(?)", template)
+    return _NUMBER.sub("?", template)
+
+
+def _find_call_site() -> str:
+    """
+    Innermost application frame outside the monitoring code.
+
+    Falls back to the innermost frame outside SQLAlchemy (e.g. a script or
+    test calling the ORM directly).
+    """
+    fallback = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR):
+            if not filename.startswith(_IGNORED_DIRS):
+                return f"{filename[len(_APP_DIR) - 3:]}:{frame.f_lineno} in {frame.f_code.co_name}"
+        elif fallback is None and "/sqlalchemy/" not in filename:
+            fallback = f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return fallback or "<unknown>"
+
+
+_current_log: ContextVar[Optional[QueryLog]] = ContextVar("query_log", default=None)
+
+
+def start_log() -> tuple:
+    """Activate a new QueryLog for the current context. Returns (log, reset token)."""
+    log = QueryLog()
+    return log, _current_log.set(log)
+
+
+def end_log(token) -> None:
+    _current_log.reset(token)
+
+
+def record_sql(statement: str, duration: float) -> None:
+    """Record one executed SQL statement (called from the engine event hooks)."""
+    log = _current_log.get()
+    if log is not None:
+        log.record(statement, duration)
+
+
+def check_budget(
+    log: QueryLog,
+    label: str,
+    max_statements: int,
+    max_duration_ms: float,
+    repeat_threshold: int,
+    strict: bool = False
+) -> bool:
+    """
+    Log a warning if log exceeds its budget. Returns True if it was within budget.
+
+    In strict mode a QueryBudgetExceeded is raised instead, so test runs fail
+    on query-count regressions.
+    """
+    problems = []
+    if log.statements > max_statements:
+        problems.append(f"{log.statements} statements (limit {max_statements})")
+    if log.duration * 1000 > max_duration_ms:
+        problems.append(f"{log.duration * 1000:.1f} ms in SQL (limit {max_duration_ms:.0f} ms)")
+    repeated = log.repeated_templates(repeat_threshold)
+    if repeated:
+        problems.append(f"{len(repeated)} statement(s) repeated {repeat_threshold}+ times (possible N+1)")
+
+    if not problems:
+        return True
+
+    message = f"Query budget exceeded for {label}: {'; '.join(problems)}\n{log.report()}"
+    if strict:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+    return False
+
+
+class query_budget:
+    """
+    Context manager asserting a SQL budget for a block of code.
+
+    Example:
+        with query_budget(max_statements=3):
+            VendorService.search_vendors(db, request)
+    """
+
+    def __init__(
+        self,
+        max_statements: int,
+        max_duration_ms: float = float("inf"),
+        repeat_threshold: int = sys.maxsize,
+        strict: bool = True
+    ):
+        self.max_statements = max_statements
+        self.max_duration_ms = max_duration_ms
+        self.repeat_threshold = repeat_threshold
+        self.strict = strict
+        self.log: Optional[QueryLog] = None
+
+    def __enter__(self) -> QueryLog:
+        self.log, self._token = start_log()
+        return self.log
+
+    def __exit__(self, exc_type, exc, tb):
+        end_log(self._token)
+        if exc_type is None:
+            check_budget(
+                self.log, "query_budget block", self.max_statements,
+                self.max_duration_ms, self.repeat_threshold, self.strict
+            )
+        return False
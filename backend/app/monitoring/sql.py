@@ -0,0 +1,33 @@
+"""
+SQLAlchemy engine event hooks feeding the monitoring collectors.
+
+A single pair of before/after cursor listeners is installed per engine; each
+executed statement is counted in the process-wide metrics and reported to the
+request profile and query guard log (if active).
+"""
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.monitoring import metrics, profiling, query_guard
+
+
+def install_sql_hooks(engine: Engine) -> None:
+    """Attach statement timing listeners to engine (idempotent)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    metrics.record_sql(statement, duration)
+    profiling.record_sql(duration)
+    query_guard.record_sql(statement, duration)
@@ -1,6 +1,7 @@
 from app.schemas.vendor import (
     VendorBase,
     VendorCreate,
+    VendorImport,
     VendorResponse,
     VendorSearchRequest,
     VendorSearchResponse,
@@ -9,6 +10,7 @@ from app.schemas.vendor import (
 from app.schemas.item import (
     ItemBase,
     ItemCreate,
+    ItemImport,
     ItemResponse,
     ItemVoteRequest,
     ItemVoteResponse,
@@ -18,12 +20,14 @@ from app.schemas.item import (
 __all__ = [
     "VendorBase",
     "VendorCreate",
+    "VendorImport",
     "VendorResponse",
     "VendorSearchRequest",
     "VendorSearchResponse",
     "VendorDetailResponse",
     "ItemBase",
     "ItemCreate",
+    "ItemImport",
     "ItemResponse",
     "ItemVoteRequest",
     "ItemVoteResponse",
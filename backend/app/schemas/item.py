@@ -68,6 +68,11 @@ class ItemCreate(ItemBase):
     dietary_flags: DietaryFlags
 
 
+class ItemImport(ItemBase):
+    """Item nested in a vendor import record (vendor id assigned on insert)."""
+    dietary_flags: DietaryFlags = Field(default_factory=DietaryFlags)
+
+
 class ItemResponse(ItemBase):
     """Item response schema."""
     id: int
@@ -76,6 +81,7 @@ class ItemResponse(ItemBase):
     rating: ItemRating
     matches_user1: Optional[bool] = None
     matches_user2: Optional[bool] = None
+    matches_users: Optional[List[bool]] = None
     created_at: datetime
 
     class Config:
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List
+
+
+class SyncDeletion(BaseModel):
+    """A deleted vendor or item (a deleted vendor's items are implied)."""
+    type: str  # "vendor" or "item"
+    id: int
+    vendor_id: int
+    version: int
+
+
+class SyncResponse(BaseModel):
+    """
+    One page of catalog changes. Apply deleted before vendors and items: a
+    vendor that moved into the area is deleted at its old version first.
+    """
+    version: int  # Catalog version the page was read at
+    next_since: int  # since for the next page (and the next sync once has_more is false)
+    has_more: bool
+    reset: bool  # The catalog was replaced: drop the local copy and sync again from 0
+    vendors: List[Dict[str, Any]]  # Changed vendor rows (all columns, change_version included)
+    items: List[Dict[str, Any]]  # Changed item rows
+    deleted: List[SyncDeletion]
@@ -0,0 +1,24 @@
+import math
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class SyntheticConfig(BaseModel):
+    """Parameters for one synthetic dataset (see app/synthetic.py)."""
+    vendors: int = Field(default=1000, ge=1)
+    cities: List[str] = ["bozeman"]
+    spread_miles: Optional[float] = None  # Default: 10 miles per 100 vendors per city, scaled by sqrt
+    items_distribution: str = "template"
+    items_mean: float = Field(default=7.0, gt=0)
+    items_min: int = Field(default=1, ge=1)
+    items_max: int = Field(default=200, ge=1)
+    flag_noise: float = Field(default=0.0, ge=0.0, le=1.0)  # Probability of flipping each flag
+    correlations: bool = True
+    votes: str = "seed"
+    seed: int = 42
+
+    def city_spread(self) -> float:
+        if self.spread_miles is not None:
+            return self.spread_miles
+        per_city = self.vendors / len(self.cities)
+        return 10.0 * math.sqrt(max(per_city, 1) / 100)
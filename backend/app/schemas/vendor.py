@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional, Dict
 from datetime import datetime
 from enum import Enum
+from app.schemas.item import ItemImport
 
 
 class DeliveryOptions(BaseModel):
@@ -29,10 +30,11 @@ class VendorRating(BaseModel):
 
 
 class ItemCounts(BaseModel):
-    """Item counts for dual-user mode."""
+    """Item counts per user (user1/user2_matches: the first two users of a group search)."""
     user1_matches: int
     user2_matches: int
     total_relevant: int
+    user_matches: List[int] = Field(default_factory=list, description="Matching items per user, in request order")
 
 
 class VendorBase(BaseModel):
@@ -63,6 +65,18 @@ class VendorCreate(VendorBase):
     tripadvisor: bool = False
 
 
+class VendorImport(VendorCreate):
+    """Vendor record for bulk import, optionally with its menu."""
+    cuisine_usa: bool = False
+    cuisine_europe: bool = False
+    cuisine_north_africa_middle_east: bool = False
+    cuisine_mexico_south_america: bool = False
+    cuisine_sub_saharan_africa: bool = False
+    cuisine_east_asia: bool = False
+    fusion: bool = False
+    items: List[ItemImport] = []
+
+
 class VendorResponse(VendorBase):
     """Basic vendor response (used in search results)."""
     id: int
@@ -100,8 +114,29 @@ class SortDirection(str, Enum):
     DESC = "desc"
 
 
+# Most users a group search accepts
+MAX_GROUP_SIZE = 8
+MAX_BATCH_SIZE = 10
+
+
+class UserFilters(BaseModel):
+    """One diner's dietary preferences and price limit."""
+    preferences: List[str] = Field(default_factory=list, description="Dietary preferences (all required per item)")
+    max_price: Optional[float] = Field(None, description="Maximum item price")
+
+    @property
+    def active(self) -> bool:
+        """Whether this user filters at all (unknown preferences count)."""
+        return bool(self.preferences) or self.max_price is not None
+
+
 class VendorSearchRequest(BaseModel):
     """Request schema for vendor search endpoint."""
+    users: List[UserFilters] = Field(
+        default_factory=list,
+        max_length=MAX_GROUP_SIZE,
+        description="Group search: one entry per diner, each needing a matching item (instead of user1_*/user2_*)"
+    )
     user1_preferences: List[str] = Field(default_factory=list, description="Dietary preferences for user 1")
     user2_preferences: List[str] = Field(default_factory=list, description="Dietary preferences for user 2")
     user1_max_price: Optional[float] = Field(None, description="Maximum price filter for user 1")
@@ -117,6 +152,28 @@ class VendorSearchRequest(BaseModel):
         default_factory=list,
         description="Restaurant-level filters: delivery, takeout, open, fusion, usa, europe, north_africa_middle_east, mexico_south_america, sub_saharan_africa, east_asia"
     )
+    facets: bool = Field(
+        False,
+        description="Also count, for each preference, how many results would still match with it added to each user's preferences"
+    )
+
+    @model_validator(mode="after")
+    def _one_user_form(self) -> "VendorSearchRequest":
+        if self.users and (
+            self.user1_preferences or self.user2_preferences
+            or self.user1_max_price is not None or self.user2_max_price is not None
+        ):
+            raise ValueError("Use either users or the user1_*/user2_* fields, not both")
+        return self
+
+    def user_filters(self) -> List[UserFilters]:
+        """The users of the search: users, or user 1 and user 2 of the two-user form."""
+        if self.users:
+            return self.users
+        return [
+            UserFilters(preferences=self.user1_preferences, max_price=self.user1_max_price),
+            UserFilters(preferences=self.user2_preferences, max_price=self.user2_max_price),
+        ]
 
 
 class PaginationMeta(BaseModel):
@@ -127,9 +184,30 @@ class PaginationMeta(BaseModel):
     total_pages: int
 
 
+class PreferenceFacets(BaseModel):
+    """Per user, preference -> number of results that would still match with it added."""
+    user1: Dict[str, int]
+    user2: Dict[str, int] = Field(default_factory=dict, description="Empty for a one-user group search")
+    users: List[Dict[str, int]] = Field(default_factory=list, description="Every user's counts, in request order")
+
+
 class VendorSearchResponse(BaseModel):
     """Response schema for vendor search endpoint."""
     vendors: List[VendorResponse]
     pagination: PaginationMeta
     user1_display: str = Field(default="", description="Formatted display text for user 1 filters")
     user2_display: str = Field(default="", description="Formatted display text for user 2 filters")
+    user_displays: List[str] = Field(default_factory=list, description="Formatted display text per user")
+    facets: Optional[PreferenceFacets] = Field(default=None, description="Preference facet counts (facets=true)")
+
+
+class VendorSearchBatchRequest(BaseModel):
+    """Request schema for the batch search endpoint."""
+    searches: List[VendorSearchRequest] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_SIZE, description="Searches to run, e.g. one search under several sorts"
+    )
+
+
+class VendorSearchBatchResponse(BaseModel):
+    """Response schema for the batch search endpoint."""
+    results: List[VendorSearchResponse] = Field(description="One search response per search, in request order")
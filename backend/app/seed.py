@@ -4,9 +4,9 @@ Creates realistic restaurants with diverse cuisines and menu items.
 """
 import random
 import math
-from app.database import SessionLocal, engine, Base
-from app.models.vendor import Vendor
-from app.models.item import Item
+from app import bulk_load
+from app.database import engine, Base
+from app.schemas.item import DietaryFlags
 
 
 # Realistic restaurant data by cuisine type
@@ -302,164 +302,172 @@ STREETS = [
 ]
 
 
-def seed_database():
-    """Seed the database with realistic restaurant data."""
-    print("Dropping existing tables...")
-    Base.metadata.drop_all(bind=engine)
-    print("Creating database tables with new schema...")
-    Base.metadata.create_all(bind=engine)
+# Bozeman, MT location: (45.6770, -111.0429)
+BOZEMAN_LAT = 45.6770
+BOZEMAN_LNG = -111.0429
+BOZEMAN_ZIPS = [59715, 59718, 59771, 59772]
 
-    db = SessionLocal()
+DEFAULT_HOURS = '{"monday": "11:00-22:00", "tuesday": "11:00-22:00", "wednesday": "11:00-22:00", "thursday": "11:00-23:00", "friday": "11:00-23:30", "saturday": "10:00-23:30", "sunday": "10:00-21:00"}'
 
-    try:
-        print("Seeding database with realistic restaurant data...")
+# Item flags that default to True when a template item doesn't mention them
+ITEM_FLAG_DEFAULTS = {
+    "no_peanuts": True,  # Default to no peanuts
+    "no_treenuts": True,  # Default to no tree nuts
+    "no_soy": True,  # Default to no soy
+    "no_sesame": True,  # Default to no sesame
+    "no_msg": True,  # Default to no MSG
+}
+
+
+def classify_cuisine(cuisine_type: str) -> dict:
+    """Map a template cuisine name to the vendor cuisine filter flags."""
+    cuisine_usa = False
+    cuisine_europe = False
+    cuisine_north_africa_middle_east = False
+    cuisine_mexico_south_america = False
+    cuisine_sub_saharan_africa = False
+    cuisine_east_asia = False
+    fusion_flag = False
+
+    if cuisine_type in ["American Breakfast", "American BBQ", "Smoothies/Juice", "Southern/Soul Food", "Seafood"]:
+        cuisine_usa = True
+    elif cuisine_type in ["Italian", "French Cafe"]:
+        cuisine_europe = True
+    elif cuisine_type in ["Mediterranean", "Indian"]:
+        cuisine_north_africa_middle_east = True
+    elif cuisine_type in ["Mexican", "Mexican Street Food"]:
+        cuisine_mexico_south_america = True
+    elif cuisine_type in ["Japanese", "Chinese", "Vietnamese", "Thai", "Hawaiian Poke"]:
+        cuisine_east_asia = True
+    elif cuisine_type in ["Vegan", "Farm Fresh", "Keto/Low-Carb", "Jewish Deli"]:
+        fusion_flag = True
+        # Some fusion restaurants also have a primary cuisine
+        if cuisine_type in ["Southern/Soul Food", "Seafood"]:
+            cuisine_usa = True
+        elif cuisine_type == "Jewish Deli":
+            cuisine_europe = True
+
+    return {
+        "cuisine_usa": cuisine_usa,
+        "cuisine_europe": cuisine_europe,
+        "cuisine_north_africa_middle_east": cuisine_north_africa_middle_east,
+        "cuisine_mexico_south_america": cuisine_mexico_south_america,
+        "cuisine_sub_saharan_africa": cuisine_sub_saharan_africa,
+        "cuisine_east_asia": cuisine_east_asia,
+        "fusion": fusion_flag,
+    }
 
-        # Bozeman, MT location: (45.6770, -111.0429)
-        bozeman_zips = [59715, 59718, 59771, 59772]
 
-        for i, restaurant in enumerate(RESTAURANTS, start=1):
-            # Distribute restaurants within 10-mile radius
-            if i <= 7:
-                distance_factor = random.uniform(0, 0.042)  # 0-3 miles
-            elif i <= 14:
-                distance_factor = random.uniform(0.042, 0.084)  # 3-6 miles
-            else:
-                distance_factor = random.uniform(0.084, 0.126)  # 6-9 miles
+def build_vendor_fields(
+    restaurant: dict,
+    index: int,
+    lat: float,
+    lng: float,
+    city: str = "Bozeman, MT",
+    zipcodes: list = BOZEMAN_ZIPS,
+    area_code: int = 406,
+    rng=random
+) -> dict:
+    """
+    Build Vendor column values for a restaurant template.
 
-            angle = random.uniform(0, 2 * math.pi)
-            lat_offset = distance_factor * random.choice([-1, 1]) * abs(math.cos(angle))
-            lng_offset = distance_factor * random.choice([-1, 1]) * abs(math.sin(angle))
+    Args:
+        restaurant: Template from RESTAURANTS (name, cuisine, tags)
+        index: 1-based position of the vendor, drives region and zipcode
+        lat, lng: Vendor location
+        rng: Random source (pass a seeded random.Random for reproducible data)
+    """
+    return {
+        "name": restaurant["name"],
+        "lat": lat,
+        "lng": lng,
+        "address": f"{rng.randint(100, 9999)} {rng.choice(STREETS)}, {city}",
+        "zipcode": zipcodes[index % len(zipcodes)],
+        "phone": f"{area_code}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}",
+        "website": f"https://www.{restaurant['name'].lower().replace(' ', '').replace('&', 'and')}.com",
+        "hours": DEFAULT_HOURS,
+        "seo_tags": restaurant["tags"],
+        "region": index,
+        "custom_by_nature": (index % 3 == 0),
+        "delivery": rng.choice([True, False]),
+        "takeout": True,
+        "grubhub": rng.choice([True, False]),
+        "doordash": rng.choice([True, False]),
+        "ubereats": rng.choice([True, False]),
+        "postmates": rng.choice([True, False]),
+        "yelp": True,
+        "google_reviews": True,
+        "tripadvisor": rng.choice([True, False]),
+        # Classify cuisine type for filter flags
+        **classify_cuisine(restaurant.get("cuisine", "")),
+    }
 
-            # Classify cuisine type for filter flags
-            cuisine_type = restaurant.get("cuisine", "")
-            cuisine_usa = False
-            cuisine_europe = False
-            cuisine_north_africa_middle_east = False
-            cuisine_mexico_south_america = False
-            cuisine_sub_saharan_africa = False
-            cuisine_east_asia = False
-            fusion_flag = False
 
-            if cuisine_type in ["American Breakfast", "American BBQ", "Smoothies/Juice", "Southern/Soul Food", "Seafood"]:
-                cuisine_usa = True
-            elif cuisine_type in ["Italian", "French Cafe"]:
-                cuisine_europe = True
-            elif cuisine_type in ["Mediterranean", "Indian"]:
-                cuisine_north_africa_middle_east = True
-            elif cuisine_type in ["Mexican", "Mexican Street Food"]:
-                cuisine_mexico_south_america = True
-            elif cuisine_type in ["Japanese", "Chinese", "Vietnamese", "Thai", "Hawaiian Poke"]:
-                cuisine_east_asia = True
-            elif cuisine_type in ["Vegan", "Farm Fresh", "Keto/Low-Carb", "Jewish Deli"]:
-                fusion_flag = True
-                # Some fusion restaurants also have a primary cuisine
-                if cuisine_type in ["Southern/Soul Food", "Seafood"]:
-                    cuisine_usa = True
-                elif cuisine_type == "Jewish Deli":
-                    cuisine_europe = True
+def build_item_fields(item_data: dict, rng=random) -> dict:
+    """
+    Build Item column values (except vendor_id) for a template item.
 
-            # Create vendor
-            vendor = Vendor(
-                name=restaurant["name"],
-                lat=45.6770 + lat_offset,
-                lng=-111.0429 + lng_offset,
-                address=f"{random.randint(100, 9999)} {random.choice(STREETS)}, Bozeman, MT",
-                zipcode=bozeman_zips[i % len(bozeman_zips)],
-                phone=f"406-{random.randint(200, 999)}-{random.randint(1000, 9999)}",
-                website=f"https://www.{restaurant['name'].lower().replace(' ', '').replace('&', 'and')}.com",
-                hours='{"monday": "11:00-22:00", "tuesday": "11:00-22:00", "wednesday": "11:00-22:00", "thursday": "11:00-23:00", "friday": "11:00-23:30", "saturday": "10:00-23:30", "sunday": "10:00-21:00"}',
-                seo_tags=restaurant["tags"],
-                region=i,
-                custom_by_nature=(i % 3 == 0),
-                delivery=random.choice([True, False]),
-                takeout=True,
-                grubhub=random.choice([True, False]),
-                doordash=random.choice([True, False]),
-                ubereats=random.choice([True, False]),
-                postmates=random.choice([True, False]),
-                yelp=True,
-                google_reviews=True,
-                tripadvisor=random.choice([True, False]),
-                cuisine_usa=cuisine_usa,
-                cuisine_europe=cuisine_europe,
-                cuisine_north_africa_middle_east=cuisine_north_africa_middle_east,
-                cuisine_mexico_south_america=cuisine_mexico_south_america,
-                cuisine_sub_saharan_africa=cuisine_sub_saharan_africa,
-                cuisine_east_asia=cuisine_east_asia,
-                fusion=fusion_flag
-            )
+    Dietary flags come from the template, falling back to ITEM_FLAG_DEFAULTS.
+    Ratings are generated with 50-100% approval.
+    """
+    # Generate realistic ratings
+    total_votes = rng.randint(10, 100)
+    upvotes = rng.randint(int(total_votes * 0.5), total_votes)  # 50-100% approval
 
-            db.add(vendor)
-            db.flush()
+    fields = {
+        "name": item_data["name"],
+        "price": item_data["price"],
+        "pictures": "",
+        "upvotes": upvotes,
+        "total_votes": total_votes,
+    }
+    # Dietary preferences, meat types, allergens, nutritional, classification
+    for flag in DietaryFlags.model_fields:
+        fields[flag] = item_data.get(flag, ITEM_FLAG_DEFAULTS.get(flag, False))
 
-            # Create menu items for this vendor
-            for item_data in restaurant["items"]:
-                # Generate realistic ratings
-                total_votes = random.randint(10, 100)
-                upvotes = random.randint(int(total_votes * 0.5), total_votes)  # 50-100% approval
+    return fields
 
-                item = Item(
-                    vendor_id=vendor.id,
-                    name=item_data["name"],
-                    price=item_data["price"],
-                    pictures="",
-                    # Dietary preferences from item data
-                    vegetarian=item_data.get("vegetarian", False),
-                    pescetarian=item_data.get("pescetarian", False),
-                    vegan=item_data.get("vegan", False),
-                    keto=item_data.get("keto", False),
-                    organic=item_data.get("organic", False),
-                    gmo_free=item_data.get("gmo_free", False),
-                    locally_sourced=item_data.get("locally_sourced", False),
-                    raw=item_data.get("raw", False),
-                    kosher=item_data.get("kosher", False),
-                    halal=item_data.get("halal", False),
-                    # Meat types
-                    beef=item_data.get("beef", False),
-                    chicken=item_data.get("chicken", False),
-                    pork=item_data.get("pork", False),
-                    seafood=item_data.get("seafood", False),
-                    no_pork_products=item_data.get("no_pork_products", False),
-                    no_red_meat=item_data.get("no_red_meat", False),
-                    # Allergens
-                    no_milk=item_data.get("no_milk", False),
-                    no_eggs=item_data.get("no_eggs", False),
-                    no_fish=item_data.get("no_fish", False),
-                    no_shellfish=item_data.get("no_shellfish", False),
-                    no_peanuts=item_data.get("no_peanuts", True),  # Default to no peanuts
-                    no_treenuts=item_data.get("no_treenuts", True),  # Default to no tree nuts
-                    gluten_free=item_data.get("gluten_free", False),
-                    no_soy=item_data.get("no_soy", True),  # Default to no soy
-                    no_sesame=item_data.get("no_sesame", True),  # Default to no sesame
-                    no_msg=item_data.get("no_msg", True),  # Default to no MSG
-                    no_alliums=item_data.get("no_alliums", False),
-                    # Nutritional
-                    low_sugar=item_data.get("low_sugar", False),
-                    high_protein=item_data.get("high_protein", False),
-                    low_carb=item_data.get("low_carb", False),
-                    # Classification
-                    entree=item_data.get("entree", False),
-                    sweet=item_data.get("sweet", False),
-                    # Rating
-                    upvotes=upvotes,
-                    total_votes=total_votes
-                )
 
-                db.add(item)
+def build_seed_rows(rng=random) -> list:
+    """(vendor_fields, [item_fields, ...]) for every restaurant in RESTAURANTS."""
+    rows = []
+    for i, restaurant in enumerate(RESTAURANTS, start=1):
+        # Distribute restaurants within 10-mile radius
+        if i <= 7:
+            distance_factor = rng.uniform(0, 0.042)  # 0-3 miles
+        elif i <= 14:
+            distance_factor = rng.uniform(0.042, 0.084)  # 3-6 miles
+        else:
+            distance_factor = rng.uniform(0.084, 0.126)  # 6-9 miles
 
-            if i % 5 == 0:
-                print(f"Created {i} restaurants...")
+        angle = rng.uniform(0, 2 * math.pi)
+        lat_offset = distance_factor * rng.choice([-1, 1]) * abs(math.cos(angle))
+        lng_offset = distance_factor * rng.choice([-1, 1]) * abs(math.sin(angle))
 
-        db.commit()
-        print(f"✅ Successfully seeded database with {len(RESTAURANTS)} diverse restaurants!")
-        print(f"   Total items: {sum(len(r['items']) for r in RESTAURANTS)}")
+        vendor = build_vendor_fields(
+            restaurant, i, BOZEMAN_LAT + lat_offset, BOZEMAN_LNG + lng_offset, rng=rng
+        )
+        items = [build_item_fields(item_data, rng=rng) for item_data in restaurant["items"]]
+        rows.append((vendor, items))
+    return rows
+
+
+def seed_database(method: str = "auto"):
+    """Seed the database with realistic restaurant data."""
+    print("Dropping existing tables...")
+    Base.metadata.drop_all(bind=engine)
+    print("Creating database tables with new schema...")
+    Base.metadata.create_all(bind=engine)
+
+    try:
+        print("Seeding database with realistic restaurant data...")
+        stats = bulk_load.load(engine, build_seed_rows(), method)
+        print(f"✅ Successfully seeded database with {stats.vendors} diverse restaurants!")
+        print(f"   Total items: {stats.items} ({stats.summary()})")
 
     except Exception as e:
         print(f"❌ Error seeding database: {e}")
-        db.rollback()
         raise
-    finally:
-        db.close()
 
 
 if __name__ == "__main__":
@@ -1,3 +1,4 @@
 from app.services.vendor_service import VendorService
+from app.services.sync_service import SyncService  # Registers the ORM change stamping hook
 
-__all__ = ["VendorService"]
+__all__ = ["VendorService", "SyncService"]
@@ -0,0 +1,816 @@
+"""
+In-memory columnar search engine (SEARCH_ENGINE=columnar).
+
+Vendors and items are loaded into NumPy arrays: per item a uint32 mask of
+the dietary flags, the price, the vote counts and the index of its vendor;
+per vendor lat/lng and a mask of the vendor filter flags. A search evaluates
+VendorService.search_vendors semantics (SQL prefilter, per-user matching,
+relevant-item union, rating, distance, sort, page) with array operations,
+and builds response models for the requested page only.
+
+Snapshots are immutable. Changes build a new snapshot that replaces the
+current one in a single assignment, so a search never sees a partial update:
+- ORM commits touching vendors or items (e.g. votes) queue those vendors; a
+  background thread re-reads everything queued since its last pass and
+  splices it in, so commits never wait for the snapshot
+- imports re-read the appended vendors and items
+- catalog swaps (reseeds) reload everything
+- writes made through other worker processes are picked up by a background
+  reload once the snapshot is COLUMNAR_MAX_AGE_SECONDS old
+
+Requests the engine cannot evaluate exactly -- text searches containing LIKE
+wildcards or non-ASCII characters -- return None and go through SQL.
+"""
+import logging
+import math
+import queue
+import string
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.item import Item
+from app.models.vendor import Vendor
+from app.monitoring import metrics, profiling
+from app.schemas.vendor import (
+    DeliveryOptions, ItemCounts, PreferenceFacets, VendorRating, VendorResponse, VendorSearchRequest
+)
+from app.services.distance_service import DistanceService
+from app.services.filter_service import FilterService
+from app.services.item_group_service import changed_vendor_ids
+from app.services.search_executor import VENDOR_FIELDS, VendorSnapshot
+from app.services.sync_service import SyncService
+from app.services.vendor_service import VendorService
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, searches fall back to SQL
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Bit i of an item's flag mask is FLAG_FIELDS[i]
+FLAG_FIELDS = tuple(dict.fromkeys(FilterService.PREFERENCE_FIELD_MAP.values()))
+assert len(FLAG_FIELDS) <= 32, "dietary flags no longer fit a uint32 mask"
+
+# Bit i of a vendor's filter mask is VENDOR_FILTER_COLUMNS[i]
+VENDOR_FILTER_COLUMNS = tuple(dict.fromkeys(VendorService.VENDOR_FILTER_FIELDS.values()))
+
+ITEM_COLUMNS = ("id", "vendor_id", "name", "price", "upvotes", "total_votes", *FLAG_FIELDS)
+_VENDOR_COLUMNS = (*VENDOR_FIELDS, *VENDOR_FILTER_COLUMNS)
+
+# Distances are prefiltered in floating point with this slack (miles), then
+# recomputed exactly for the survivors with DistanceService
+_DISTANCE_SLACK = 1e-6
+
+# SQLite's LIKE folds ASCII case only
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+_LIKE_SPECIAL = set("%_\\")
+
+_snapshot: Optional["CatalogSnapshot"] = None
+_engine = None
+_lock = threading.RLock()
+_load_lock = threading.RLock()  # One full read of the catalog at a time
+_reloading = False
+_pending_vendor_ids: Set[int] = set()
+_refresh_queue: "queue.Queue" = queue.Queue()  # (engine, vendor_ids, versions) of ORM commits
+_refresher: Optional[threading.Thread] = None
+_hooks_installed = False
+
+
+def _fold(text: Optional[str]) -> Optional[str]:
+    return text.translate(_ASCII_LOWER) if text is not None else None
+
+
+def _bitmask(rows: list, start: int, dtype):
+    """Per row, bit i set if boolean column start + i is true (NULL counts as false)."""
+    if not rows:
+        return np.zeros(0, dtype=dtype)
+    values = np.array([tuple(row)[start:] for row in rows], dtype=object) == True  # noqa: E712
+    bits = np.arange(values.shape[1], dtype=dtype)
+    return (values.astype(dtype) << bits).sum(axis=1, dtype=dtype)
+
+
+def _objects(values: list):
+    """1-D object array of values (np.array would unpack tuples into a second dimension)."""
+    array = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        array[i] = value
+    return array
+
+
+class CatalogSnapshot:
+    """Immutable column arrays of the catalog, vendors ordered by id."""
+
+    def __init__(self, vendor_ids, vendor_lat, vendor_lng, vendor_filters, vendors, vendor_text,
+                 item_ids, item_vendor, item_flags, item_price, item_upvotes, item_total_votes, item_names,
+                 loaded_at: Optional[float] = None, catalog_version: int = 0,
+                 vendor_versions: Optional[Dict[int, int]] = None):
+        self.vendor_ids = vendor_ids
+        self.vendor_lat = vendor_lat
+        self.vendor_lng = vendor_lng
+        self.vendor_filters = vendor_filters
+        self.vendors = vendors  # VendorSnapshot objects with the response fields (groups and items left empty)
+        self.vendor_text = vendor_text  # Case-folded (name, address, seo_tags) tuples
+        self.item_ids = item_ids
+        self.item_vendor = item_vendor  # Vendor position of each item
+        self.item_flags = item_flags
+        self.item_price = item_price  # NaN for NULL prices
+        self.item_upvotes = item_upvotes
+        self.item_total_votes = item_total_votes
+        self.item_names = item_names  # Case-folded strings
+        # Time of the full read this snapshot derives from (incremental refreshes keep it)
+        self.loaded_at = time.monotonic() if loaded_at is None else loaded_at
+        # Catalog version (SyncService) every change up to which is in the snapshot: that of
+        # the full read, advanced by refreshes that follow on from it (refresh_vendors)
+        self.catalog_version = catalog_version
+        # Catalog version of the partial read each refreshed vendor was last taken from
+        self.vendor_versions = vendor_versions or {}
+
+    @property
+    def vendor_count(self) -> int:
+        return len(self.vendor_ids)
+
+    @property
+    def item_count(self) -> int:
+        return len(self.item_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the NumPy arrays (not counting the Python-level vendor rows and names)."""
+        return sum(array.nbytes for array in (
+            self.vendor_ids, self.vendor_lat, self.vendor_lng, self.vendor_filters, self.item_ids,
+            self.item_vendor, self.item_flags, self.item_price, self.item_upvotes, self.item_total_votes,
+        ))
+
+    @staticmethod
+    def from_rows(vendor_rows, item_rows, catalog_version: int = 0) -> "CatalogSnapshot":
+        """Build a snapshot from vendor rows (_VENDOR_COLUMNS) and item rows (ITEM_COLUMNS)."""
+        vendor_rows = list(vendor_rows)
+        vendor_ids = np.array([row.id for row in vendor_rows], dtype=np.int64)
+
+        # Items of vendors missing from vendor_rows (written in between the two reads) are dropped
+        order = np.argsort(vendor_ids, kind="stable")
+        sorted_ids = vendor_ids[order]
+        item_rows = list(item_rows)
+        item_vendor_ids = np.array([row.vendor_id for row in item_rows], dtype=np.int64)
+        found = np.searchsorted(sorted_ids, item_vendor_ids)
+        found = np.minimum(found, max(len(sorted_ids) - 1, 0))
+        known = sorted_ids[found] == item_vendor_ids if len(sorted_ids) else np.zeros(len(item_rows), dtype=bool)
+        item_rows = [row for row, keep in zip(item_rows, known) if keep]
+        item_vendor = order[found[known]] if len(sorted_ids) else np.zeros(0, dtype=np.int64)
+
+        return CatalogSnapshot(
+            vendor_ids=vendor_ids,
+            vendor_lat=np.array([row.lat for row in vendor_rows], dtype=np.float64),
+            vendor_lng=np.array([row.lng for row in vendor_rows], dtype=np.float64),
+            vendor_filters=_bitmask(vendor_rows, len(VENDOR_FIELDS), np.uint16),
+            vendors=_objects([VendorSnapshot(*tuple(row)[:len(VENDOR_FIELDS)], (), ()) for row in vendor_rows]),
+            vendor_text=_objects([(_fold(row.name), _fold(row.address), _fold(row.seo_tags)) for row in vendor_rows]),
+            item_ids=np.array([row.id for row in item_rows], dtype=np.int64),
+            item_vendor=item_vendor.astype(np.int64),
+            item_flags=_bitmask(item_rows, ITEM_COLUMNS.index(FLAG_FIELDS[0]), np.uint32),
+            item_price=np.array([row.price for row in item_rows], dtype=np.float64),
+            item_upvotes=np.array([row.upvotes for row in item_rows], dtype=np.int64),
+            item_total_votes=np.array([row.total_votes for row in item_rows], dtype=np.int64),
+            item_names=_objects([_fold(row.name) for row in item_rows]),
+            catalog_version=catalog_version,
+        )._sorted()
+
+    def version_of(self, vendor_id: int) -> int:
+        """Catalog version of the read this snapshot's copy of vendor_id comes from."""
+        return max(self.catalog_version, self.vendor_versions.get(vendor_id, 0))
+
+    def replace_vendors(self, vendor_ids: Iterable[int], fresh: "CatalogSnapshot",
+                        catalog_version: Optional[int] = None) -> "CatalogSnapshot":
+        """
+        A new snapshot with vendor_ids (and their items) replaced by the vendors
+        in fresh (all among vendor_ids), recorded as read at
+        fresh.catalog_version. catalog_version sets the new snapshot's
+        (default: unchanged).
+
+        Both snapshots are sorted and share no vendor, so fresh rows are
+        spliced in at their searchsorted positions: one copy of each array,
+        no re-sort.
+        """
+        vendor_ids = set(vendor_ids)
+        kept = self._without(vendor_ids)
+        vendor_versions = {**self.vendor_versions, **dict.fromkeys(vendor_ids, fresh.catalog_version)}
+
+        # New vendor positions: each shifts by the vendors of the other snapshot ordered before it
+        vendor_at = np.searchsorted(kept.vendor_ids, fresh.vendor_ids)
+        kept_item_vendor = kept.item_vendor + np.searchsorted(fresh.vendor_ids, kept.vendor_ids)[kept.item_vendor]
+        fresh_item_vendor = fresh.item_vendor + vendor_at[fresh.item_vendor]
+        item_at = np.searchsorted(kept_item_vendor, fresh_item_vendor)
+
+        def splice(name, at):
+            return np.insert(getattr(kept, name), at, getattr(fresh, name))
+
+        return CatalogSnapshot(
+            vendor_ids=splice("vendor_ids", vendor_at),
+            vendor_lat=splice("vendor_lat", vendor_at),
+            vendor_lng=splice("vendor_lng", vendor_at),
+            vendor_filters=splice("vendor_filters", vendor_at),
+            vendors=splice("vendors", vendor_at),
+            vendor_text=splice("vendor_text", vendor_at),
+            item_ids=splice("item_ids", item_at),
+            item_vendor=np.insert(kept_item_vendor, item_at, fresh_item_vendor),
+            item_flags=splice("item_flags", item_at),
+            item_price=splice("item_price", item_at),
+            item_upvotes=splice("item_upvotes", item_at),
+            item_total_votes=splice("item_total_votes", item_at),
+            item_names=splice("item_names", item_at),
+            loaded_at=self.loaded_at,
+            catalog_version=self.catalog_version if catalog_version is None else catalog_version,
+            vendor_versions=vendor_versions,
+        )
+
+    def _without(self, vendor_ids: Set[int]) -> "CatalogSnapshot":
+        """This snapshot without vendor_ids and their items (order kept)."""
+        if not vendor_ids:
+            return self
+        keep = ~np.isin(self.vendor_ids, np.fromiter(vendor_ids, dtype=np.int64))
+        kept_positions = np.flatnonzero(keep)
+        position_map = np.cumsum(keep) - 1  # old vendor position -> position among kept vendors
+        items = np.flatnonzero(keep[self.item_vendor])
+        return CatalogSnapshot(
+            vendor_ids=self.vendor_ids[kept_positions],
+            vendor_lat=self.vendor_lat[kept_positions],
+            vendor_lng=self.vendor_lng[kept_positions],
+            vendor_filters=self.vendor_filters[kept_positions],
+            vendors=self.vendors[kept_positions],
+            vendor_text=self.vendor_text[kept_positions],
+            item_ids=self.item_ids[items],
+            item_vendor=position_map[self.item_vendor[items]],
+            item_flags=self.item_flags[items],
+            item_price=self.item_price[items],
+            item_upvotes=self.item_upvotes[items],
+            item_total_votes=self.item_total_votes[items],
+            item_names=self.item_names[items],
+            loaded_at=self.loaded_at,
+            catalog_version=self.catalog_version,
+            vendor_versions=self.vendor_versions,
+        )
+
+    def _sorted(self) -> "CatalogSnapshot":
+        """Vendors by id (the candidate order of a search), items by (vendor, id)."""
+        vendor_order = np.argsort(self.vendor_ids, kind="stable")
+        rank = np.empty_like(vendor_order)
+        rank[vendor_order] = np.arange(len(vendor_order))
+        item_vendor = rank[self.item_vendor]
+        item_order = np.lexsort((self.item_ids, item_vendor))
+        return CatalogSnapshot(
+            vendor_ids=self.vendor_ids[vendor_order],
+            vendor_lat=self.vendor_lat[vendor_order],
+            vendor_lng=self.vendor_lng[vendor_order],
+            vendor_filters=self.vendor_filters[vendor_order],
+            vendors=self.vendors[vendor_order],
+            vendor_text=self.vendor_text[vendor_order],
+            item_ids=self.item_ids[item_order],
+            item_vendor=item_vendor[item_order],
+            item_flags=self.item_flags[item_order],
+            item_price=self.item_price[item_order],
+            item_upvotes=self.item_upvotes[item_order],
+            item_total_votes=self.item_total_votes[item_order],
+            item_names=self.item_names[item_order],
+            loaded_at=self.loaded_at,
+            catalog_version=self.catalog_version,
+            vendor_versions=self.vendor_versions,
+        )
+
+    # Search
+
+    def rank(self, request: VendorSearchRequest) -> Optional["RankedVendors"]:
+        """
+        Matching vendors of a search in result order, or None if the request
+        needs SQL (see module docstring).
+        """
+        query = request.search_query.strip() if request.search_query and request.search_query.strip() else None
+        if query is not None and (not query.isascii() or _LIKE_SPECIAL & set(query)):
+            return None
+
+        candidates, preferred = self._sql_candidates(request, query)
+
+        users = request.user_filters()
+        vendor_count = self.vendor_count
+        candidate_items = candidates[self.item_vendor]
+
+        # One row of per-vendor match counts per user (zeros for users without filters)
+        user_counts = np.zeros((len(users), vendor_count), dtype=np.int64)
+        relevant = None
+        matched = candidates  # Before the preference filter (facet searches widen it, see facets)
+        for index, user in enumerate(users):
+            if not user.active:
+                continue
+            matches = self._python_match(user.preferences, user.max_price) & candidate_items
+            user_counts[index] = np.bincount(self.item_vendor[matches], minlength=vendor_count)
+            relevant = matches if relevant is None else relevant | matches
+            matched = matched & (user_counts[index] > 0)
+        if relevant is None:
+            relevant = candidate_items
+
+        relevant_vendor = self.item_vendor[relevant]
+        relevant_counts = np.bincount(relevant_vendor, minlength=vendor_count)
+
+        # Vote sums stay exact in float64 up to 2**53
+        upvotes = np.bincount(relevant_vendor, weights=self.item_upvotes[relevant], minlength=vendor_count)
+        total_votes = np.bincount(relevant_vendor, weights=self.item_total_votes[relevant], minlength=vendor_count)
+
+        positions = np.flatnonzero(matched if request.facets else matched & preferred)
+        distances = None
+        if request.lat is not None and request.lng is not None:
+            positions, distances = self._within_distance(positions, request.lat, request.lng)
+        facet_positions = positions
+        if request.facets:
+            results = preferred[positions]
+            positions = positions[results]
+            distances = distances[results] if distances is not None else None
+
+        upvotes = upvotes[positions].astype(np.int64)
+        total_votes = total_votes[positions].astype(np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentage = np.where(total_votes > 0, np.minimum(upvotes / total_votes, 1.0), 0.0)
+
+        return RankedVendors(
+            self, request, positions, distances, upvotes, total_votes, percentage,
+            user_counts[:, positions], relevant_counts[positions], facet_positions,
+        ).sorted()
+
+    def _sql_candidates(self, request: VendorSearchRequest, query: Optional[str]):
+        """
+        Vendors the SQL query of VendorService._fetch_candidates would return,
+        and those among all vendors passing the preference filter: together,
+        those of VendorService._fetch_filtered_vendors.
+        """
+        candidates = np.ones(self.vendor_count, dtype=bool)
+
+        if request.lat is not None and request.lng is not None:
+            lat_delta, lng_delta = DistanceService.get_bounding_box_deltas(request.lat)
+            candidates &= (self.vendor_lat >= request.lat - lat_delta) & (self.vendor_lat <= request.lat + lat_delta)
+            candidates &= (self.vendor_lng >= request.lng - lng_delta) & (self.vendor_lng <= request.lng + lng_delta)
+
+        required = 0
+        for name in request.vendor_filters or []:
+            column = VendorService.VENDOR_FILTER_FIELDS.get(name.lower().strip())
+            if column is not None:
+                required |= 1 << VENDOR_FILTER_COLUMNS.index(column)
+        if required:
+            candidates &= (self.vendor_filters & np.uint16(required)) == required
+
+        users = request.user_filters()
+        filters = [self._sql_match(user.preferences, user.max_price) for user in users]
+        preferred = np.ones(self.vendor_count, dtype=bool)
+        if query is not None or any(user.active for user in users):
+            # Inner join with items: a vendor needs one item row passing both the
+            # text filter and one user's preference filter
+            rows = self._text_rows(query) if query is not None else np.ones(self.item_count, dtype=bool)
+            if query is not None:
+                candidates &= np.bincount(self.item_vendor[rows], minlength=self.vendor_count) > 0
+            active = [f for f in filters if f is not None]
+            if active:
+                rows &= np.logical_or.reduce(active)
+            preferred = np.bincount(self.item_vendor[rows], minlength=self.vendor_count) > 0
+
+        if request.vendor_filters and "open" in [f.lower().strip() for f in request.vendor_filters]:
+            positions = np.flatnonzero(candidates)
+            open_ids = set(VendorService.filter_open_vendors([self.vendors[i] for i in positions]))
+            candidates[positions] = [self.vendors[i].id in open_ids for i in positions]
+
+        return candidates, preferred
+
+    def _text_rows(self, query: str):
+        """Items whose vendor fields or name contain query (the text filter on the vendor/item join)."""
+        folded = _fold(query)
+        vendor_hits = np.fromiter(
+            (any(field is not None and folded in field for field in fields)
+             for fields in self.vendor_text.tolist()),
+            dtype=bool, count=self.vendor_count
+        )
+        item_hits = np.fromiter(
+            (folded in name for name in self.item_names.tolist()), dtype=bool, count=self.item_count
+        )
+        return vendor_hits[self.item_vendor] | item_hits
+
+    def _required_flags(self, preferences: List[str]) -> int:
+        required = 0
+        for pref in preferences:
+            field_name = FilterService.PREFERENCE_FIELD_MAP.get(pref.lower())
+            if field_name is not None:
+                required |= 1 << FLAG_FIELDS.index(field_name)
+        return required
+
+    def _sql_match(self, preferences: List[str], max_price: Optional[float]):
+        """FilterService.build_preference_filter per item (NULL prices fail a max price), None if no filter."""
+        required = self._required_flags(preferences)
+        if not required and max_price is None:
+            return None
+        matches = (self.item_flags & np.uint32(required)) == required
+        if max_price is not None:
+            matches &= self.item_price <= max_price
+        return matches
+
+    def _python_match(self, preferences: List[str], max_price: Optional[float]):
+        """FilterService.item_matches_preferences per item (NULL prices pass a max price)."""
+        required = self._required_flags(preferences)
+        matches = (self.item_flags & np.uint32(required)) == required
+        if max_price is not None:
+            matches &= ~(self.item_price > max_price)
+        return matches
+
+    def facets(self, request: VendorSearchRequest, positions) -> PreferenceFacets:
+        """
+        FacetCounter counts over the vendors at positions: those matching
+        every user, in range, before the preference filter
+        (RankedVendors.facet_positions; ItemGroupService.facet_flags semantics).
+        """
+        in_results = np.zeros(self.vendor_count, dtype=bool)
+        in_results[positions] = True
+        result_items = in_results[self.item_vendor]
+        query = request.search_query.strip() if request.search_query else None
+        prefilter_items = result_items & self._text_rows(query) if query else result_items
+        matching_flags = []
+        prefiltered_flags = []
+        passes_filter = []
+        for user in request.user_filters():
+            matching = self._python_match(user.preferences, user.max_price)
+            sql = self._sql_match(user.preferences, user.max_price)
+            passes_filter.append(
+                np.zeros(self.vendor_count, dtype=bool) if sql is None
+                else np.bincount(self.item_vendor[sql & prefilter_items], minlength=self.vendor_count) > 0
+            )
+            # Without a filter of its own every row passes for this user
+            prefiltered = matching if sql is None else sql
+            matching_flags.append(self._flag_union(matching & result_items))
+            prefiltered_flags.append(self._flag_union(prefiltered & prefilter_items))
+
+        # Vendors where another user's filter passes a prefilter row, per user
+        passing_users = np.sum(passes_filter, axis=0)
+        bits = np.arange(len(FLAG_FIELDS), dtype=np.uint32)
+        counts = []
+        for user in range(len(passes_filter)):
+            others_pass = passing_users - passes_filter[user] > 0
+            flags = np.where(others_pass, matching_flags[user], prefiltered_flags[user])[positions]
+            bit_counts = ((flags[:, None] >> bits) & 1).sum(axis=0)
+            counts.append({
+                preference: int(bit_counts[FLAG_FIELDS.index(field_name)])
+                for preference, field_name in FilterService.PREFERENCE_FIELD_MAP.items()
+            })
+        return PreferenceFacets(user1=counts[0], user2=counts[1] if len(counts) > 1 else {}, users=counts)
+
+    def _flag_union(self, items):
+        """Per vendor, the OR of the flag masks of the selected items."""
+        flags = np.zeros(self.vendor_count, dtype=np.uint32)
+        np.bitwise_or.at(flags, self.item_vendor[items], self.item_flags[items])
+        return flags
+
+    def _within_distance(self, positions, lat: float, lng: float):
+        """Positions within MAX_DISTANCE_MILES and their distances (as DistanceService computes them)."""
+        lat1 = math.radians(lat)
+        lat2 = np.radians(self.vendor_lat[positions])
+        delta_lat = np.radians(self.vendor_lat[positions] - lat)
+        delta_lng = np.radians(self.vendor_lng[positions] - lng)
+        a = np.sin(delta_lat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(delta_lng / 2) ** 2
+        approximate = DistanceService.EARTH_RADIUS_MILES * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        positions = positions[approximate <= settings.MAX_DISTANCE_MILES + _DISTANCE_SLACK]
+
+        distances = np.array([
+            DistanceService.calculate_distance(lat, lng, self.vendor_lat[i], self.vendor_lng[i]) for i in positions
+        ], dtype=np.float64)
+        within = distances <= settings.MAX_DISTANCE_MILES
+        return positions[within], distances[within]
+
+
+class RankedVendors:
+    """Matching vendors of one search and their computed fields, in result order."""
+
+    def __init__(self, snapshot: CatalogSnapshot, request: VendorSearchRequest, positions, distances,
+                 upvotes, total_votes, percentage, user_counts, relevant_counts, facet_positions=None):
+        self.snapshot = snapshot
+        self.request = request
+        self.positions = positions
+        self.distances = distances
+        self.upvotes = upvotes
+        self.total_votes = total_votes
+        self.percentage = percentage
+        self.user_counts = user_counts  # Users x results
+        self.relevant_counts = relevant_counts
+        # Vendors counted in facets (requests with facets): the results before the preference filter
+        self.facet_positions = facet_positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def sort_key(self):
+        """Sort values as VendorService._sort_value computes them (before negation)."""
+        if self.request.sort_by == "rating":
+            return self.percentage
+        if self.request.sort_by == "distance" and self.request.lat is not None:
+            return self.distances if self.distances is not None else np.full(len(self), np.inf)
+        return self.relevant_counts
+
+    def sorted(self) -> "RankedVendors":
+        # Stable like sorted(); negating keeps equal keys in candidate order for descending sorts
+        key = self.sort_key()
+        order = np.argsort(-key if self.request.sort_direction == "desc" else key, kind="stable")
+        return RankedVendors(
+            self.snapshot, self.request, self.positions[order],
+            self.distances[order] if self.distances is not None else None,
+            self.upvotes[order], self.total_votes[order], self.percentage[order],
+            self.user_counts[:, order], self.relevant_counts[order], self.facet_positions,
+        )
+
+    def responses(self, start: int = 0, stop: Optional[int] = None) -> List[VendorResponse]:
+        """VendorResponse models for results start..stop."""
+        responses = []
+        for i in range(*slice(start, stop).indices(len(self))):
+            vendor = self.snapshot.vendors[self.positions[i]]
+            user_counts = self.user_counts[:, i].tolist()
+            responses.append(VendorResponse(
+                id=vendor.id,
+                name=vendor.name,
+                lat=vendor.lat,
+                lng=vendor.lng,
+                address=vendor.address,
+                zipcode=vendor.zipcode,
+                phone=vendor.phone,
+                website=vendor.website,
+                hours=vendor.hours,
+                seo_tags=vendor.seo_tags,
+                region=vendor.region,
+                custom_by_nature=vendor.custom_by_nature,
+                distance_miles=float(self.distances[i]) if self.distances is not None else None,
+                rating=VendorRating(
+                    upvotes=int(self.upvotes[i]),
+                    total_votes=int(self.total_votes[i]),
+                    percentage=float(self.percentage[i])
+                ),
+                item_counts=ItemCounts(
+                    user1_matches=int(user_counts[0]),
+                    user2_matches=int(user_counts[1]) if len(user_counts) > 1 else 0,
+                    user_matches=user_counts,
+                    total_relevant=int(self.relevant_counts[i])
+                ),
+                delivery_options=DeliveryOptions(
+                    delivery=vendor.delivery,
+                    takeout=vendor.takeout,
+                    grubhub=vendor.grubhub,
+                    doordash=vendor.doordash,
+                    ubereats=vendor.ubereats,
+                    postmates=vendor.postmates
+                )
+            ))
+        return responses
+
+
+class ColumnarSearch:
+    """Loads, refreshes and searches the in-memory catalog snapshot."""
+
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    @staticmethod
+    def snapshot() -> Optional[CatalogSnapshot]:
+        return _snapshot
+
+    @staticmethod
+    def search_vendors(
+        db: Session, request: VendorSearchRequest
+    ) -> Optional[Tuple[List[VendorResponse], int, Optional[PreferenceFacets]]]:
+        """
+        VendorService.search_vendors over the snapshot, or None if this
+        request (or this install, without numpy) has to go through SQL.
+        """
+        if not ColumnarSearch.available():
+            return None
+        snapshot = ColumnarSearch.current(db.get_bind())
+        max_age = settings.COLUMNAR_MAX_AGE_SECONDS
+        if max_age and time.monotonic() - snapshot.loaded_at > max_age:
+            ColumnarSearch.reload_in_background()
+
+        with profiling.stage("search.columnar"):
+            ranked = snapshot.rank(request)
+            if ranked is None:
+                return None
+            start = (request.page - 1) * request.page_size
+            responses = ranked.responses(start, start + request.page_size)
+            facets = snapshot.facets(request, ranked.facet_positions) if request.facets else None
+
+        if profiling.current_profile() is not None:
+            profiling.count("search.candidates", snapshot.vendor_count)
+            profiling.count("search.matched", len(ranked))
+        return responses, len(ranked), facets
+
+    @staticmethod
+    def covers(version: int) -> bool:
+        """
+        Whether searches reflect every change up to catalog version (see
+        SyncService.area_version). Changes made through other worker
+        processes after the last full read are only seen by the next one.
+        """
+        snapshot = _snapshot
+        return snapshot is None or snapshot.catalog_version >= version
+
+    @staticmethod
+    def current(engine) -> CatalogSnapshot:
+        """The current snapshot, loading it first if needed."""
+        snapshot = _snapshot
+        if snapshot is None:
+            with _load_lock:
+                snapshot = _snapshot or ColumnarSearch.load(engine)
+        return snapshot
+
+    @staticmethod
+    def load(engine) -> CatalogSnapshot:
+        """Read the whole catalog into a new snapshot and make it current."""
+        global _snapshot, _engine, _reloading, _pending_vendor_ids
+        _install_hooks()
+        with _load_lock:
+            with _lock:
+                _engine = engine
+                _reloading = True
+            start = time.perf_counter()
+            try:
+                snapshot = ColumnarSearch._read(engine)
+            except Exception:
+                with _lock:
+                    _reloading = False
+                raise
+            with _lock:
+                _snapshot = snapshot
+                _reloading = False
+                pending, _pending_vendor_ids = _pending_vendor_ids, set()
+        logger.info(
+            "Loaded columnar catalog: %d vendors, %d items, %.1f MiB of arrays in %.2fs",
+            snapshot.vendor_count, snapshot.item_count, snapshot.nbytes / 2**20, time.perf_counter() - start
+        )
+        if pending:
+            # Commits that landed while the catalog was being read
+            ColumnarSearch.refresh_vendors(engine, pending)
+        return _snapshot
+
+    @staticmethod
+    def reload_in_background() -> None:
+        """Start a full reload unless one is running; searches keep using the current snapshot."""
+        global _reloading
+        with _lock:
+            if _reloading or _engine is None:
+                return
+            _reloading = True
+            engine = _engine
+        threading.Thread(target=ColumnarSearch._reload, args=(engine,), name="columnar-reload", daemon=True).start()
+
+    @staticmethod
+    def _reload(engine) -> None:
+        try:
+            ColumnarSearch.load(engine)
+        except Exception:
+            logger.exception("Columnar catalog reload failed")
+
+    @staticmethod
+    def refresh_vendors(engine, vendor_ids: Iterable[int], versions: Iterable[Tuple[int, int]] = ()) -> None:
+        """
+        Re-read vendor_ids and their items (vendors that no longer exist are dropped).
+
+        Reads run outside the lock, so concurrent refreshes can finish out of
+        order: vendors whose current copy comes from a later read are left
+        alone. versions, the (first, last) change versions of the commits
+        being picked up, advance the snapshot's catalog_version as far as
+        they follow on from it (no other process wrote in between).
+        """
+        global _snapshot
+        vendor_ids = set(vendor_ids)
+        if not vendor_ids or _snapshot is None:
+            return
+        fresh = ColumnarSearch._read(engine, vendor_ids)
+        with _lock:
+            if _reloading:
+                _pending_vendor_ids.update(vendor_ids)
+            snapshot = _snapshot
+            stale = {vendor_id for vendor_id in vendor_ids if snapshot.version_of(vendor_id) > fresh.catalog_version}
+            catalog_version = snapshot.catalog_version
+            for first, last in sorted(versions):
+                if first <= catalog_version + 1:
+                    catalog_version = max(catalog_version, last)
+            _snapshot = snapshot.replace_vendors(vendor_ids - stale, fresh._without(stale), catalog_version)
+
+    @staticmethod
+    def refresh_in_background(engine, vendor_ids: Iterable[int], versions: Optional[Tuple[int, int]] = None) -> None:
+        """Queue refresh_vendors for the refresher thread (started on first use)."""
+        global _refresher
+        _refresh_queue.put((engine, set(vendor_ids), versions))
+        with _lock:
+            if _refresher is None:
+                _refresher = threading.Thread(target=ColumnarSearch._refresh_queued, name="columnar-refresh", daemon=True)
+                _refresher.start()
+
+    @staticmethod
+    def wait_for_refresh() -> None:
+        """Block until every queued refresh has been applied."""
+        _refresh_queue.join()
+
+    @staticmethod
+    def _refresh_queued() -> None:
+        while True:
+            batch = [_refresh_queue.get()]
+            while True:
+                try:
+                    batch.append(_refresh_queue.get_nowait())
+                except queue.Empty:
+                    break
+            # One read (and one new snapshot) per engine for all commits queued since the last pass
+            pending: Dict[object, Tuple[Set[int], List[Tuple[int, int]]]] = {}
+            for engine, vendor_ids, versions in batch:
+                engine_vendor_ids, engine_versions = pending.setdefault(engine, (set(), []))
+                engine_vendor_ids.update(vendor_ids)
+                if versions is not None:
+                    engine_versions.append(versions)
+            for engine, (vendor_ids, versions) in pending.items():
+                try:
+                    ColumnarSearch.refresh_vendors(engine, vendor_ids, versions)
+                except Exception:
+                    # The commits succeeded; a stale snapshot is fixed by the next reload
+                    logger.exception("Columnar catalog refresh failed")
+                    ColumnarSearch.reload_in_background()
+            for _ in batch:
+                _refresh_queue.task_done()
+
+    @staticmethod
+    def refresh_appended(engine) -> None:
+        """Pick up vendors and items inserted outside the ORM since the snapshot was read (imports)."""
+        snapshot = _snapshot
+        if snapshot is None:
+            return
+        max_vendor_id = int(snapshot.vendor_ids.max()) if snapshot.vendor_count else 0
+        max_item_id = int(snapshot.item_ids.max()) if snapshot.item_count else 0
+        with engine.connect() as conn:
+            vendor_ids = set(conn.execute(select(Vendor.id).where(Vendor.id > max_vendor_id)).scalars())
+            vendor_ids |= set(conn.execute(select(Item.vendor_id).where(Item.id > max_item_id).distinct()).scalars())
+        ColumnarSearch.refresh_vendors(engine, vendor_ids)
+
+    @staticmethod
+    def _read(engine, vendor_ids: Optional[Set[int]] = None) -> CatalogSnapshot:
+        vendors = Vendor.__table__
+        items = Item.__table__
+        vendor_query = select(*(vendors.c[name] for name in _VENDOR_COLUMNS)).order_by(vendors.c.id)
+        item_query = select(*(items.c[name] for name in ITEM_COLUMNS)).order_by(items.c.vendor_id, items.c.id)
+        if vendor_ids is not None:
+            vendor_query = vendor_query.where(vendors.c.id.in_(vendor_ids))
+            item_query = item_query.where(items.c.vendor_id.in_(vendor_ids))
+
+        with engine.connect() as conn:
+            # Read first, in its own transaction: rows read below (a later
+            # snapshot) include every change up to it
+            with conn.begin():
+                catalog_version = SyncService.state(conn).version
+            if conn.dialect.name == "postgresql":
+                # One consistent view of both tables
+                conn = conn.execution_options(isolation_level="REPEATABLE READ")
+            with conn.begin():
+                vendor_rows = conn.execute(vendor_query).all()
+                item_rows = conn.execute(item_query).all()
+        return CatalogSnapshot.from_rows(vendor_rows, item_rows, catalog_version)
+
+
+def _install_hooks() -> None:
+    """Refresh the snapshot after ORM commits that touch vendors or items."""
+    global _hooks_installed
+    with _lock:
+        if _hooks_installed:
+            return
+        _hooks_installed = True
+
+    @event.listens_for(Session, "after_flush")
+    def after_flush(session, flush_context):
+        changed = changed_vendor_ids(session)
+        if changed:
+            session.info.setdefault("columnar_vendor_ids", set()).update(changed)
+
+    @event.listens_for(Session, "after_commit")
+    def after_commit(session):
+        vendor_ids = session.info.pop("columnar_vendor_ids", None)
+        if vendor_ids and _snapshot is not None:
+            ColumnarSearch.refresh_in_background(session.get_bind(), vendor_ids, SyncService.reserved_range(session))
+
+    @event.listens_for(Session, "after_rollback")
+    def after_rollback(session):
+        session.info.pop("columnar_vendor_ids", None)
+
+    metrics.registry.register_collector(
+        "columnar_catalog", "gauge", "Rows in the columnar search snapshot and its age in seconds", _collect_catalog
+    )
+
+
+def _collect_catalog():
+    snapshot = _snapshot
+    if snapshot is None:
+        return []
+    return [
+        ("columnar_catalog", {"field": "vendors"}, snapshot.vendor_count),
+        ("columnar_catalog", {"field": "items"}, snapshot.item_count),
+        ("columnar_catalog", {"field": "age_seconds"}, round(time.monotonic() - snapshot.loaded_at, 1)),
+    ]
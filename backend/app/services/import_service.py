@@ -0,0 +1,150 @@
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import Column, MetaData, Table, func, insert, select
+
+from app import bulk_load
+from app.cache import clear_search_results
+from app.config import settings
+from app.database import Base, engine as default_engine
+from app.models.item import Item
+from app.models.vendor import Vendor
+from app.services.item_group_service import ItemGroupService
+from app.services.sync_service import SyncService
+
+STAGING_SUFFIX = "_staging"
+
+
+class ImportService:
+    """Non-destructive catalog refresh: load into staging tables, then swap."""
+
+    @staticmethod
+    def staging_tables(engine) -> Tuple[Table, Table]:
+        """
+        (Re)create empty staging copies of the vendors and items tables.
+
+        Staging tables have the live columns and defaults but no secondary
+        indexes or foreign keys, so bulk loading into them stays fast.
+        """
+        metadata = MetaData()
+        tables = tuple(
+            Table(
+                f"{live.name}{STAGING_SUFFIX}",
+                metadata,
+                *(ImportService._staging_column(column) for column in live.columns)
+            )
+            for live in (Vendor.__table__, Item.__table__)
+        )
+        metadata.drop_all(bind=engine)
+        metadata.create_all(bind=engine)
+        return tables
+
+    @staticmethod
+    def swap(engine, vendor_staging: Table, item_staging: Table) -> None:
+        """
+        Replace the live catalog with the staging contents in one transaction.
+
+        Uses DELETE + INSERT ... SELECT rather than TRUNCATE or table renames,
+        so on PostgreSQL concurrent readers keep seeing the old catalog (MVCC)
+        until the commit instead of waiting on an exclusive lock. Every row
+        gets a new change version, and delta sync clients start over
+        (SyncService.reset).
+        """
+        with engine.begin() as conn:
+            counts = [
+                conn.execute(select(func.count()).select_from(staging)).scalar()
+                for staging in (vendor_staging, item_staging)
+            ]
+            first = SyncService.reset(conn, sum(counts))
+            conn.execute(Item.__table__.delete())
+            conn.execute(Vendor.__table__.delete())
+            for live, staging, count in ((Vendor.__table__, vendor_staging, counts[0]),
+                                         (Item.__table__, item_staging, counts[1])):
+                names = [column.name for column in live.columns]
+                columns = [
+                    SyncService.restamped(conn, staging, first) if name == "change_version" else staging.c[name]
+                    for name in names
+                ]
+                conn.execute(insert(live).from_select(names, select(*columns)))
+                bulk_load.reset_sequence(conn, live)
+                first += count
+            ItemGroupService.rebuild(conn)
+        clear_search_results()
+        if settings.SEARCH_ENGINE == "columnar":
+            from app.services.columnar_search import ColumnarSearch
+
+            if ColumnarSearch.snapshot() is not None:
+                ColumnarSearch.load(engine)
+
+    @staticmethod
+    def reseed(
+        rows: Iterable[bulk_load.Row],
+        method: str = "auto",
+        progress: Optional[Callable[..., None]] = None,
+        engine=None
+    ) -> Dict:
+        """
+        Load rows into staging tables and atomically swap them in.
+
+        The API keeps serving the previous catalog while rows load; only the
+        final swap touches the live tables. (On SQLite, reads wait for the
+        swap transaction to commit; on PostgreSQL they are not blocked.)
+
+        Args:
+            rows: (vendor_fields, [item_fields, ...]) tuples, e.g. from
+                app.seed.build_seed_rows or app.synthetic.generate
+            method: bulk_load method for the staging load
+            progress: Called with keyword progress fields (stage, vendors, items, ...)
+        """
+        engine = engine or default_engine
+        report = progress or (lambda **fields: None)
+        start = time.perf_counter()
+
+        report(stage="preparing")
+        Base.metadata.create_all(bind=engine)
+        vendor_staging, item_staging = ImportService.staging_tables(engine)
+
+        def on_batch(stats: bulk_load.LoadStats):
+            report(
+                stage="loading", vendors=stats.vendors, items=stats.items,
+                rows_per_second=round(stats.rows_per_second)
+            )
+
+        try:
+            report(stage="loading")
+            stats = bulk_load.load(
+                engine, rows, method, progress=on_batch,
+                vendor_table=vendor_staging, item_table=item_staging, commit_per_batch=True
+            )
+
+            report(stage="swapping", vendors=stats.vendors, items=stats.items)
+            swap_start = time.perf_counter()
+            ImportService.swap(engine, vendor_staging, item_staging)
+            swap_seconds = time.perf_counter() - swap_start
+        finally:
+            vendor_staging.metadata.drop_all(bind=engine)
+
+        result = {
+            "vendors": stats.vendors,
+            "items": stats.items,
+            "method": stats.method,
+            "load_seconds": round(stats.seconds, 3),
+            "swap_seconds": round(swap_seconds, 3),
+            "rows_per_second": round(stats.rows_per_second),
+            "total_seconds": round(time.perf_counter() - start, 3),
+        }
+        report(stage="done", **result)
+        return result
+
+    @staticmethod
+    def _staging_column(column: Column) -> Column:
+        default = column.default.arg if column.default is not None and column.default.is_scalar else None
+        server_default = column.server_default.arg if column.server_default is not None else None
+        return Column(
+            column.name,
+            column.type,
+            primary_key=column.primary_key,
+            nullable=column.nullable,
+            default=default,
+            server_default=server_default,
+        )
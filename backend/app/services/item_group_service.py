@@ -0,0 +1,289 @@
+"""
+Per-vendor summaries of items sharing a dietary profile (the item_groups table).
+
+Most menus repeat a few dietary profiles across many items. Search matching
+("does this vendor have an item for user 1 under $X", match counts, rating
+sums) is answered from a vendor's handful of groups instead of every item:
+a group matches a user entirely, not at all, or -- when a max price falls
+between its min and max price -- partially, and only then are that
+vendor's items loaded and checked one by one. Each group (and split item)
+is checked once against all users of a search, whose filters are compiled
+to flag masks up front (compile_users).
+
+Groups are rebuilt from the items table in the transaction that changes
+them: ORM flushes touching items (hooked here), bulk loads, imports and
+catalog swaps (which call rebuild directly). A rebuild locks the vendor
+rows first, so concurrent rebuilds of one vendor take turns instead of
+both inserting its groups.
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import case, delete, event, func, inspect, insert, literal, select, true
+from sqlalchemy.orm import Session
+
+from app.models.item import Item
+from app.models.item_group import FLAG_BITS, ItemGroup
+from app.models.vendor import Vendor
+from app.schemas.vendor import UserFilters
+from app.services.filter_service import FilterService
+
+# How a group matches one user's preferences and max price
+NONE = 0
+ALL = 1
+PARTIAL = 2
+
+
+class UserMask(NamedTuple):
+    """One user's filters compiled for matching."""
+    required: int  # Flag mask an item needs
+    max_price: Optional[float]
+    active: bool  # Has preferences (known or not) or a max price
+
+    @property
+    def has_sql_filter(self) -> bool:
+        """Whether FilterService.build_preference_filter returns a filter for this user."""
+        return bool(self.required) or self.max_price is not None
+
+
+class ItemMatches(NamedTuple):
+    """A vendor's items matching a search: counts per user and the relevant items' votes."""
+    user_matches: Tuple[int, ...]
+    total_relevant: int
+    upvotes: int
+    total_votes: int
+
+
+class ItemGroupService:
+    """Maintains item groups and matches searches against them."""
+
+    @staticmethod
+    def flag_mask(item) -> int:
+        """Dietary flag mask of an item (model or snapshot), as stored in ItemGroup.flags."""
+        mask = 0
+        for bit, flag in enumerate(FLAG_BITS):
+            if getattr(item, flag, False):
+                mask |= 1 << bit
+        return mask
+
+    @staticmethod
+    def required_mask(preferences: List[str]) -> int:
+        """Flag mask an item needs to match preferences (unknown preferences are ignored)."""
+        mask = 0
+        for pref in preferences:
+            field_name = FilterService.PREFERENCE_FIELD_MAP.get(pref.lower())
+            if field_name is not None:
+                mask |= 1 << FLAG_BITS.index(field_name)
+        return mask
+
+    @staticmethod
+    def compile_users(users: Sequence[UserFilters]) -> Tuple[UserMask, ...]:
+        """Users' filters (e.g. VendorSearchRequest.user_filters()) as flag masks."""
+        return tuple(
+            UserMask(ItemGroupService.required_mask(user.preferences), user.max_price, user.active)
+            for user in users
+        )
+
+    @staticmethod
+    def summary_query():
+        """SELECT of the group rows of all items (vendor_id, flags, min/max price, count, vote sums)."""
+        items = Item.__table__
+        mask = sum(
+            (case((items.c[flag] == true(), literal(1 << bit)), else_=literal(0)) for bit, flag in enumerate(FLAG_BITS)),
+            literal(0)
+        )
+        unpriced = case((items.c.price.is_(None), 1), else_=0)
+        return select(
+            items.c.vendor_id,
+            mask.label("flags"),
+            func.min(items.c.price).label("min_price"),
+            func.max(items.c.price).label("max_price"),
+            func.count().label("item_count"),
+            func.coalesce(func.sum(items.c.upvotes), 0).label("upvotes"),
+            func.coalesce(func.sum(items.c.total_votes), 0).label("total_votes"),
+        ).group_by(items.c.vendor_id, mask, unpriced)
+
+    @staticmethod
+    def rebuild(conn, vendor_ids: Optional[Iterable[int]] = None) -> None:
+        """
+        Recompute the groups of vendor_ids (all vendors if None) from their items.
+
+        Locks the vendor rows (SELECT ... FOR UPDATE, in id order) until the
+        transaction ends: under READ COMMITTED, two concurrent rebuilds of
+        one vendor would otherwise each delete the old groups and both insert
+        new ones, duplicating them.
+        """
+        items = Item.__table__
+        groups = ItemGroup.__table__
+        vendors = Vendor.__table__
+        summary = ItemGroupService.summary_query()
+        delete_groups = delete(groups)
+        lock = select(vendors.c.id).order_by(vendors.c.id).with_for_update()
+
+        if vendor_ids is not None:
+            vendor_ids = sorted(set(vendor_ids))
+            if not vendor_ids:
+                return
+            summary = summary.where(items.c.vendor_id.in_(vendor_ids))
+            delete_groups = delete_groups.where(groups.c.vendor_id.in_(vendor_ids))
+            lock = lock.where(vendors.c.id.in_(vendor_ids))
+
+        conn.execute(lock).all()
+        conn.execute(delete_groups)
+        conn.execute(insert(groups).from_select(
+            ["vendor_id", "flags", "min_price", "max_price", "item_count", "upvotes", "total_votes"], summary
+        ))
+
+    @staticmethod
+    def status(group, required: int, max_price: Optional[float]) -> int:
+        """NONE, ALL or PARTIAL: which of the group's items match (FilterService.item_matches_preferences)."""
+        if group.flags & required != required:
+            return NONE
+        if max_price is None or group.min_price is None or group.max_price <= max_price:
+            return ALL
+        if group.min_price > max_price:
+            return NONE
+        return PARTIAL
+
+    @staticmethod
+    def passes_filter(group, user: UserMask) -> bool:
+        """Whether the group has an item passing FilterService.build_preference_filter (NULL prices fail)."""
+        if group.flags & user.required != user.required:
+            return False
+        return user.max_price is None or (group.min_price is not None and group.min_price <= user.max_price)
+
+    @staticmethod
+    def needs_items(groups, users: Sequence[UserMask]) -> bool:
+        """True if a max price splits one of the groups, so matching needs the vendor's items."""
+        for user in users:
+            if user.active and user.max_price is not None:
+                if any(ItemGroupService.status(group, user.required, user.max_price) == PARTIAL for group in groups):
+                    return True
+        return False
+
+    @staticmethod
+    def match(vendor, users: Sequence[UserMask]) -> ItemMatches:
+        """
+        Count a vendor's (model or snapshot) matching items from its groups.
+
+        Same results as matching every item (VendorService semantics): per
+        user, items with all preferences and within the max price; relevant
+        items are the union of the users' matches, or all items when no
+        user has filters. vendor.items is only read for groups split by a
+        max price (see needs_items).
+        """
+        any_active = any(user.active for user in users)
+        counts = [0] * len(users)
+        relevant = upvotes = total_votes = 0
+        split_items = None
+        for group in vendor.item_groups:
+            statuses = [
+                ItemGroupService.status(group, user.required, user.max_price) if user.active else NONE
+                for user in users
+            ]
+
+            if PARTIAL not in statuses:
+                matched = False
+                for index, group_status in enumerate(statuses):
+                    if group_status == ALL:
+                        counts[index] += group.item_count
+                        matched = True
+                if matched or not any_active:
+                    relevant += group.item_count
+                    upvotes += group.upvotes
+                    total_votes += group.total_votes
+                continue
+
+            # Split groups are priced (unpriced items form their own group), and
+            # their items share the group's flags: only prices are left to check
+            if split_items is None:
+                split_items = ItemGroupService._by_group(vendor.items)
+            for item in split_items.get((group.flags, group.min_price is None), ()):
+                matched = False
+                for index, (group_status, user) in enumerate(zip(statuses, users)):
+                    if group_status == ALL or (group_status == PARTIAL and item.price <= user.max_price):
+                        counts[index] += 1
+                        matched = True
+                if matched:
+                    relevant += 1
+                    upvotes += item.upvotes
+                    total_votes += item.total_votes
+
+        return ItemMatches(tuple(counts), relevant, upvotes, total_votes)
+
+    @staticmethod
+    def item_matches(item, users: Sequence[UserMask]) -> List[bool]:
+        """Which users an item matches (FilterService.item_matches_preferences), reading its flags once."""
+        mask = ItemGroupService.flag_mask(item)
+        price = item.price
+        return [
+            mask & user.required == user.required
+            and (user.max_price is None or price is None or price <= user.max_price)
+            for user in users
+        ]
+
+    @staticmethod
+    def facet_flags(vendor, users: Sequence[UserMask], prefilter_groups=None) -> Tuple[int, ...]:
+        """
+        Per user, the flags whose preference, added to the user's preferences,
+        puts a vendor (model or snapshot) matching every user in the results,
+        whether or not it passes the search's own SQL prefilter.
+
+        The vendor needs a matching item with the flag (any group at least
+        partially matching), and must pass the widened SQL prefilter: an
+        item row passing another user's filter, or else one with the flag
+        passing this user's filter (NULL prices fail a max price). Both are
+        unions of group flags, so items are never read. prefilter_groups are
+        the groups of the rows the prefilter sees, if not all of the
+        vendor's items (text searches, see VendorService._text_groups).
+        """
+        matching = [0] * len(users)
+        for group in vendor.item_groups:
+            for index, user in enumerate(users):
+                if ItemGroupService.status(group, user.required, user.max_price) != NONE:
+                    matching[index] |= group.flags
+
+        prefiltered = [0] * len(users)
+        passes_filter = [False] * len(users)
+        for group in vendor.item_groups if prefilter_groups is None else prefilter_groups:
+            for index, user in enumerate(users):
+                if ItemGroupService.passes_filter(group, user):
+                    prefiltered[index] |= group.flags
+                    passes_filter[index] = passes_filter[index] or user.has_sql_filter
+
+        passing_users = sum(passes_filter)
+        return tuple(
+            matching[index] if passing_users - passes_filter[index] else prefiltered[index]
+            for index in range(len(users))
+        )
+
+    @staticmethod
+    def _by_group(items) -> Dict[Tuple[int, bool], list]:
+        by_group = {}
+        for item in items:
+            by_group.setdefault((ItemGroupService.flag_mask(item), item.price is None), []).append(item)
+        return by_group
+
+
+def changed_vendor_ids(session: Session, vendor_rows: bool = True) -> Set[int]:
+    """
+    Vendors whose items (and, with vendor_rows, whose own row) are new,
+    changed or deleted in session (call before the flush completes).
+    """
+    vendor_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Vendor):
+            if vendor_rows:
+                vendor_ids.add(obj.id)
+        elif isinstance(obj, Item):
+            vendor_ids.add(obj.vendor_id)
+            vendor_ids.update(inspect(obj).attrs.vendor_id.history.deleted or ())
+    vendor_ids.discard(None)
+    return vendor_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _rebuild_after_flush(session, flush_context):
+    """Keep groups in step with ORM item writes, in the same transaction (vendor rows hold no group data)."""
+    vendor_ids = changed_vendor_ids(session, vendor_rows=False)
+    if vendor_ids:
+        ItemGroupService.rebuild(session.connection(), vendor_ids)
@@ -0,0 +1,162 @@
+"""
+Execution modes for the CPU-bound part of a search (SEARCH_EXECUTOR).
+
+- ``thread`` (default): the whole search (query and post-processing) runs
+  in the thread pool, so the event loop keeps serving health checks and
+  cheap requests while a heavy search runs -- what admission control
+  relies on to keep their latency bounded
+- ``inline``: the search runs in the request handler, on the event loop
+- ``process``: as ``thread``, and candidate sets of at least
+  SEARCH_PARALLEL_MIN_VENDORS vendors are split into chunks that are
+  matched, rated and sorted in a process pool, then merged
+
+Worker processes cannot receive ORM objects, so candidates are copied into
+picklable snapshots first: named tuples with the attributes the matching and
+rating code reads (item groups, plus any items loaded for item-level
+matching). Named tuples rather than pydantic models, since building and
+pickling them is cheap enough for tens of thousands of items.
+"""
+import logging
+import math
+import threading
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from operator import itemgetter
+from typing import TYPE_CHECKING, Callable, List, NamedTuple, Optional
+
+from app import deadlines
+from app.config import settings
+from app.services.filter_service import FilterService
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+EXECUTORS = (INLINE, THREAD, PROCESS)
+
+ITEM_GROUP_FIELDS = ("flags", "min_price", "max_price", "item_count", "upvotes", "total_votes")
+
+ITEM_FIELDS = ("id", "price", "upvotes", "total_votes", *FilterService.PREFERENCE_FIELD_MAP.values())
+
+VENDOR_FIELDS = (
+    "id", "name", "lat", "lng", "address", "zipcode", "phone", "website", "hours", "seo_tags",
+    "region", "custom_by_nature", "delivery", "takeout", "grubhub", "doordash", "ubereats", "postmates",
+)
+
+ItemGroupSnapshot = NamedTuple("ItemGroupSnapshot", [(name, object) for name in ITEM_GROUP_FIELDS])
+ItemSnapshot = NamedTuple("ItemSnapshot", [(name, object) for name in ITEM_FIELDS])
+VendorSnapshot = NamedTuple(
+    "VendorSnapshot", [(name, object) for name in VENDOR_FIELDS] + [("item_groups", tuple), ("items", tuple)]
+)
+
+# Loaded column values are read from the instance __dict__, skipping the ORM
+# attribute descriptors (several times faster for tens of thousands of items)
+_item_group_values = itemgetter(*ITEM_GROUP_FIELDS)
+_item_values = itemgetter(*ITEM_FIELDS)
+_vendor_values = itemgetter(*VENDOR_FIELDS)
+
+# Created on first use: multiprocessing stays off the startup path
+_pool: Optional["ProcessPoolExecutor"] = None
+_pool_lock = threading.Lock()
+
+
+class SearchExecutor:
+    """Where and how the search post-processing stage runs."""
+
+    @staticmethod
+    def mode() -> str:
+        if settings.SEARCH_EXECUTOR not in EXECUTORS:
+            raise ValueError(
+                f"Unknown SEARCH_EXECUTOR '{settings.SEARCH_EXECUTOR}' (choose from {', '.join(EXECUTORS)})"
+            )
+        return settings.SEARCH_EXECUTOR
+
+    @staticmethod
+    def runs_off_loop() -> bool:
+        """True if request handlers should hand the search to the thread pool."""
+        return SearchExecutor.mode() != INLINE
+
+    @staticmethod
+    def should_parallelize(candidate_count: int) -> bool:
+        return SearchExecutor.mode() == PROCESS and candidate_count >= settings.SEARCH_PARALLEL_MIN_VENDORS
+
+    @staticmethod
+    def snapshot(vendors) -> List[VendorSnapshot]:
+        """Picklable copies of vendors (ORM objects), their item groups and their loaded items."""
+        return [
+            VendorSnapshot(
+                *_vendor_values(vendor.__dict__),
+                tuple(ItemGroupSnapshot(*_item_group_values(group.__dict__)) for group in vendor.item_groups),
+                tuple(ItemSnapshot(*_item_values(item.__dict__)) for item in vendor.__dict__.get("items", ()))
+            )
+            for vendor in vendors
+        ]
+
+    @staticmethod
+    def map_chunks(function: Callable, snapshots: List[VendorSnapshot], *args) -> List:
+        """
+        Run function(chunk, offset, *args) over chunks of snapshots in the process pool.
+
+        offset is the index of the chunk's first snapshot. Results are
+        returned in chunk order, so merging them preserves the candidate
+        order a serial run would see.
+        """
+        workers = max(settings.SEARCH_EXECUTOR_WORKERS, 1)
+        chunk_size = max(settings.SEARCH_CHUNK_SIZE, math.ceil(len(snapshots) / (workers * 4)))
+        pool = SearchExecutor.pool()
+        futures = [
+            pool.submit(function, snapshots[offset:offset + chunk_size], offset, *args)
+            for offset in range(0, len(snapshots), chunk_size)
+        ]
+        try:
+            return [future.result(timeout=deadlines.remaining()) for future in futures]
+        except FuturesTimeoutError:
+            for future in futures:
+                future.cancel()
+            raise deadlines.DeadlineExceeded("Search pool work ran past the request deadline")
+
+    @staticmethod
+    def pool() -> "ProcessPoolExecutor":
+        """
+        The process pool, created on first use.
+
+        Workers are spawned rather than forked: the API process runs threads
+        (thread pool, background jobs), and forking a threaded process can
+        copy locks in a held state.
+        """
+        global _pool
+        if _pool is None:
+            with _pool_lock:
+                if _pool is None:
+                    import multiprocessing
+                    from concurrent.futures import ProcessPoolExecutor
+
+                    _pool = ProcessPoolExecutor(
+                        max_workers=max(settings.SEARCH_EXECUTOR_WORKERS, 1),
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    logger.info("Started search process pool with %d workers", settings.SEARCH_EXECUTOR_WORKERS)
+        return _pool
+
+    @staticmethod
+    def warm() -> None:
+        """Start the pool workers ahead of the first large search."""
+        if SearchExecutor.mode() == PROCESS:
+            pool = SearchExecutor.pool()
+            for future in [pool.submit(_noop) for _ in range(max(settings.SEARCH_EXECUTOR_WORKERS, 1))]:
+                future.result()
+
+    @staticmethod
+    def shutdown() -> None:
+        global _pool
+        with _pool_lock:
+            if _pool is not None:
+                _pool.shutdown(cancel_futures=True)
+                _pool = None
+
+
+def _noop() -> None:
+    return None
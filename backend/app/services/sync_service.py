@@ -0,0 +1,443 @@
+"""
+Catalog change versions and delta sync (GET /sync).
+
+Every write to vendors and items stamps the changed rows with a new change
+version, and deletions leave a tombstone carrying one. A vendor is also
+restamped when its menu changes, so its version covers its items (menu
+ETags, vendor_version) and the newest version in an area covers every
+search over it (search ETags, area_version). Each changed row gets a
+version of its own, so `since` alone pages through any change set, even a
+bulk load.
+
+Readers only trust versions up to the catalog version (SyncState.version):
+every transaction that took a version up to it has ended, so a read
+started afterwards sees all those changes. Versions come from:
+- PostgreSQL: the catalog_versions sequence, so writers do not wait for
+  each other. Transactions commit out of version order; before taking
+  versions, a writer holds a shared transaction-level advisory lock keyed
+  by the sequence position (below any version it gets), and the catalog
+  version is the lowest such key held, or the last version handed out if
+  there is none.
+- SQLite: the single catalog_state row, incremented by each transaction,
+  which holds the row (and SQLite's database write lock) until it ends,
+  so writers commit in version order.
+
+Rows are stamped by:
+- ORM flushes touching vendors or items, votes included (hooked here)
+- bulk loads and imports into the live tables (bulk_load, importer)
+- catalog swaps (ImportService.swap), which restamp every row and advance
+  reset_version: clients that synced the old catalog start over
+
+Raw SQL writes to vendors or items must stamp their rows (stamp, reserve)
+as well.
+"""
+import heapq
+import json
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, event, func, insert, inspect, literal, select, text, update
+from sqlalchemy.orm import Session
+
+from app.models.catalog_state import CatalogState, catalog_versions
+from app.models.item import Item
+from app.models.tombstone import Tombstone
+from app.models.vendor import Vendor
+from app.services.distance_service import DistanceService
+
+# Rows fetched per cursor round trip while reading changes
+FETCH_SIZE = 500
+
+# Changes per yielded NDJSON chunk
+NDJSON_CHUNK_SIZE = 200
+
+VENDOR = "vendor"
+ITEM = "item"
+DELETED = "deleted"
+
+# Session.info key: change versions reserved by the session's current transaction (see reserved_range)
+RESERVED_VERSIONS = "sync_reserved_versions"
+
+# PostgreSQL: hold a shared advisory lock keyed below the versions about to be
+# taken (taken once, before the first nextval), then take count versions
+_CLAIM = text("""
+WITH claim AS MATERIALIZED (
+    SELECT pg_advisory_xact_lock_shared(last_value - 1) IS NULL AS held, is_called FROM catalog_versions
+)
+SELECT nextval('catalog_versions') AS version, claim.is_called FROM claim, generate_series(1, :count)
+""")
+
+# PostgreSQL: last version handed out, then (read after it) the lowest claim
+# still held, and the reset version
+_STATE = text("""
+WITH allocated AS MATERIALIZED (
+    SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END AS version FROM catalog_versions
+)
+SELECT allocated.version,
+       (SELECT min(((locks.classid::bigint << 32) | locks.objid::bigint))
+        FROM pg_locks AS locks
+        WHERE locks.locktype = 'advisory' AND locks.objsubid = 1 AND allocated.version IS NOT NULL
+          AND locks.database = (SELECT oid FROM pg_database WHERE datname = current_database())) AS claimed,
+       (SELECT reset_version FROM catalog_state WHERE id = 1) AS reset_version
+FROM allocated
+""")
+
+
+class SyncState(NamedTuple):
+    """
+    version: every change up to it is committed (the catalog version).
+    reset_version: the last version of a replaced catalog.
+    allocated: the last version handed out (above version while writers
+    that took lower ones are still running).
+    """
+    version: int
+    reset_version: int
+    allocated: int
+
+
+class SyncArea(NamedTuple):
+    """Circle a sync is limited to (vendor locations; items by their vendor's)."""
+    lat: float
+    lng: float
+    radius_miles: float
+
+
+class Change(NamedTuple):
+    """A changed vendor or item (data: its columns) or a deletion (data: type, id, vendor_id)."""
+    version: int
+    kind: str  # VENDOR, ITEM or DELETED
+    data: dict
+
+
+class SyncService:
+    """Maintains change versions and reads changes for delta sync."""
+
+    @staticmethod
+    def reserve(conn, count: int) -> List[int]:
+        """
+        Take count new change versions, in ascending order. On SQLite they
+        are consecutive and catalog_state stays locked until the transaction
+        ends; on PostgreSQL other transactions can take versions meanwhile.
+        """
+        if conn.dialect.name == "postgresql":
+            rows = conn.execute(_CLAIM, {"count": count}).all()
+            if not rows[0].is_called:
+                # New catalog (sequence just created): start past earlier catalogs' versions
+                initial = SyncService.initial_version()
+                conn.execute(
+                    text("SELECT setval('catalog_versions', greatest(:initial, last_value)) FROM catalog_versions"),
+                    {"initial": initial}
+                )
+                SyncService._set_reset_version(conn, initial)
+                rows = conn.execute(_CLAIM, {"count": count}).all()
+            return sorted(row.version for row in rows)
+
+        state = CatalogState.__table__
+        last = conn.execute(
+            update(state).where(state.c.id == 1).values(version=state.c.version + count).returning(state.c.version)
+        ).scalar()
+        if last is None:
+            # New catalog (tables just created, e.g. by a reseed)
+            initial = SyncService.initial_version()
+            last = initial + count
+            conn.execute(insert(state).values(id=1, version=last, reset_version=initial))
+        return list(range(last - count + 1, last + 1))
+
+    @staticmethod
+    def reserved_range(session) -> Optional[Tuple[int, int]]:
+        """(first, last) change versions taken in session's transaction, if they are consecutive."""
+        versions = session.info.get(RESERVED_VERSIONS)
+        if not versions or versions[-1] - versions[0] + 1 != len(versions):
+            return None
+        return versions[0], versions[-1]
+
+    @staticmethod
+    def initial_version() -> int:
+        """
+        Version a new catalog starts after: the current time in microseconds,
+        so it is above every version an earlier catalog in the same database
+        handed out, and clients holding one start over.
+        """
+        return time.time_ns() // 1000
+
+    @staticmethod
+    def stamp(conn, rows: List[dict]) -> None:
+        """Set change_version on vendor or item rows about to be inserted with Core."""
+        if not rows:
+            return
+        for row, version in zip(rows, SyncService.reserve(conn, len(rows))):
+            row["change_version"] = version
+
+    @staticmethod
+    def restamp_vendors(conn, vendor_ids) -> None:
+        """Give vendor_ids new change versions (their menus changed through Core writes)."""
+        vendor_ids = sorted(set(vendor_ids))
+        if not vendor_ids:
+            return
+        versions = SyncService.reserve(conn, len(vendor_ids))
+        vendors = Vendor.__table__
+        conn.execute(
+            update(vendors).where(vendors.c.id == bindparam("vendor")).values(change_version=bindparam("version")),
+            [{"vendor": vendor_id, "version": version} for vendor_id, version in zip(vendor_ids, versions)]
+        )
+
+    @staticmethod
+    def reset(conn, count: int) -> int:
+        """
+        Start a new catalog generation (catalog swap): reserve count versions
+        for its rows (SQLite; PostgreSQL takes them per row, see restamped)
+        and return the first. Tombstones of the old catalog are dropped,
+        since clients that synced it start over.
+        """
+        mark = SyncService.reserve(conn, 1 if conn.dialect.name == "postgresql" else count + 1)[0]
+        SyncService._set_reset_version(conn, mark)
+        conn.execute(delete(Tombstone.__table__))
+        return mark + 1
+
+    @staticmethod
+    def restamped(conn, table, first: int):
+        """Column expression giving table's rows new versions from first (for INSERT ... SELECT after reset)."""
+        if conn.dialect.name == "postgresql":
+            return catalog_versions.next_value()
+        return literal(first - 1) + func.row_number().over(order_by=table.c.id)
+
+    @staticmethod
+    def _set_reset_version(conn, version: int) -> None:
+        state = CatalogState.__table__
+        if not conn.execute(update(state).where(state.c.id == 1).values(reset_version=version)).rowcount:
+            conn.execute(insert(state).values(id=1, version=version, reset_version=version))
+
+    @staticmethod
+    def stream(since: int, limit: int, area: Optional[SyncArea] = None, engine=None) -> Iterator[bytes]:
+        """
+        A sync page as NDJSON chunks: a "sync" header line (version, since,
+        reset), one line per change in version order ("vendor", "item" or
+        "deleted", with version and data), and an "end" line (next_since,
+        has_more).
+
+        Opens its own connection (not the request session), since request
+        dependencies are closed before a streaming response body is sent.
+        """
+        if engine is None:
+            from app.database import engine
+
+        with engine.connect() as conn:
+            page = SyncPage(conn, since, limit, area)
+            lines = [_ndjson({"type": "sync", "version": page.state.version, "since": since, "reset": page.reset})]
+            for change in page:
+                lines.append(_ndjson({"type": change.kind, "version": change.version, "data": change.data}))
+                if len(lines) >= NDJSON_CHUNK_SIZE:
+                    yield ("\n".join(lines) + "\n").encode()
+                    lines = []
+            lines.append(_ndjson({"type": "end", "next_since": page.next_since, "has_more": page.has_more}))
+            yield ("\n".join(lines) + "\n").encode()
+
+    @staticmethod
+    def area_version(conn, area: Optional[SyncArea] = None) -> int:
+        """
+        Version of the last change that can affect a search over area's
+        bounding box (the whole catalog if None): a vendor or menu change
+        there, a deletion or move out of it, or a catalog swap. Reads
+        vendors and tombstones only.
+        """
+        state = SyncService.state(conn)
+        if area is None:
+            return state.version
+        versions = [
+            select(func.max(table.c.change_version))
+            .where(*_in_box(table, area), table.c.change_version <= state.version).scalar_subquery()
+            for table in (Vendor.__table__, Tombstone.__table__)
+        ]
+        return max([version or 0 for version in conn.execute(select(*versions)).one()] + [state.reset_version])
+
+    @staticmethod
+    def vendor_version(conn, vendor_id: int) -> Optional[int]:
+        """Change version of a vendor and its menu, or None if it does not exist."""
+        vendors = Vendor.__table__
+        return conn.execute(select(vendors.c.change_version).where(vendors.c.id == vendor_id)).scalar()
+
+    @staticmethod
+    def state(conn) -> SyncState:
+        """
+        The catalog version and counters. On PostgreSQL, reads started after
+        this returns (e.g. the next statement under READ COMMITTED) see every
+        change up to version.
+        """
+        if conn.dialect.name == "postgresql":
+            allocated, claimed, reset_version = conn.execute(_STATE).one()
+            version = allocated if claimed is None else min(allocated, claimed)
+            return SyncState(version, reset_version or 0, allocated)
+        state = CatalogState.__table__
+        row = conn.execute(select(state.c.version, state.c.reset_version).where(state.c.id == 1)).first()
+        return SyncState(row.version, row.reset_version, row.version) if row is not None else SyncState(0, 0, 0)
+
+
+class SyncPage:
+    """
+    Up to limit changes after version since, in version order, as of the
+    catalog version current when the page is opened.
+
+    Iterate the page for its changes; afterwards next_since is the since of
+    the next page and has_more tells whether to request it. limit counts
+    rows read, including rows outside the area, so a page can hold fewer
+    changes than limit and still have more. A reset page (the client synced
+    a catalog that has since been replaced) holds no changes: the client
+    drops its copy and syncs again from 0.
+    """
+
+    def __init__(self, conn, since: int, limit: int, area: Optional[SyncArea] = None):
+        self.conn = conn
+        self.since = since
+        self.limit = limit
+        self.area = area
+        self.state = SyncService.state(conn)
+        # A since above the catalog version but handed out already was the catalog
+        # version of an earlier page (it can drop back while a writer claims versions)
+        self.reset = since > self.state.allocated or 0 < since < self.state.reset_version
+        self.next_since = 0 if self.reset else since
+        self.has_more = False
+
+    def __iter__(self) -> Iterator[Change]:
+        if self.reset:
+            return
+        read = 0
+        rows = heapq.merge(self._vendors(), self._items(), self._deletions(), key=lambda change: change[0])
+        for version, kind, data, lat, lng in islice(rows, self.limit):
+            read += 1
+            self.next_since = version
+            if self.area is None or DistanceService.is_within_distance(
+                self.area.lat, self.area.lng, lat, lng, self.area.radius_miles
+            ):
+                yield Change(version, kind, data)
+        if read == self.limit:
+            self.has_more = True
+        else:
+            self.next_since = max(self.since, self.state.version)
+
+    def _vendors(self):
+        vendors = Vendor.__table__
+        query = self._changed(select(vendors), vendors, vendors)
+        for row in self._stream(query):
+            data = dict(row._mapping)
+            yield data["change_version"], VENDOR, data, data["lat"], data["lng"]
+
+    def _items(self):
+        items = Item.__table__
+        vendors = Vendor.__table__
+        query = self._changed(
+            select(items, vendors.c.lat.label("vendor_lat"), vendors.c.lng.label("vendor_lng"))
+            .join(vendors, vendors.c.id == items.c.vendor_id),
+            items, vendors
+        )
+        for row in self._stream(query):
+            data = dict(row._mapping)
+            lat, lng = data.pop("vendor_lat"), data.pop("vendor_lng")
+            yield data["change_version"], ITEM, data, lat, lng
+
+    def _deletions(self):
+        tombstones = Tombstone.__table__
+        query = self._changed(select(tombstones), tombstones, tombstones)
+        for row in self._stream(query):
+            data = {"type": row.kind, "id": row.row_id, "vendor_id": row.vendor_id}
+            yield row.change_version, DELETED, data, row.lat, row.lng
+
+    def _changed(self, query, table, located):
+        """Rows of table changed after since (up to the page's version), in the area's bounding box."""
+        query = query.where(table.c.change_version > self.since, table.c.change_version <= self.state.version)
+        if self.area is not None:
+            query = query.where(*_in_box(located, self.area))
+        return query.order_by(table.c.change_version).limit(self.limit)
+
+    def _stream(self, query):
+        for partition in self.conn.execution_options(yield_per=FETCH_SIZE).execute(query).partitions():
+            yield from partition
+
+
+def _in_box(table, area: SyncArea):
+    """Conditions for table's lat/lng lying in area's bounding box."""
+    lat_delta, lng_delta = DistanceService.get_bounding_box_deltas(area.lat, area.radius_miles)
+    return (
+        table.c.lat.between(area.lat - lat_delta, area.lat + lat_delta),
+        table.c.lng.between(area.lng - lng_delta, area.lng + lng_delta),
+    )
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _ndjson(record: dict) -> str:
+    return json.dumps(record, default=_json_default, separators=(",", ":"))
+
+
+def _tombstone(kind: str, row_id: int, vendor, lat=None, lng=None) -> Tombstone:
+    return Tombstone(
+        kind=kind, row_id=row_id, vendor_id=vendor.id,
+        lat=vendor.lat if lat is None else lat, lng=vendor.lng if lng is None else lng
+    )
+
+
+def _previous(obj, attribute: str):
+    """Value of attribute before this flush's change (the current value if unchanged)."""
+    history = inspect(obj).attrs[attribute].history
+    return history.deleted[0] if history.deleted else getattr(obj, attribute)
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_flush(session, flush_context, instances):
+    """Stamp vendors and items written through the ORM and record deletions, in the same transaction."""
+    tombstones = []
+    stamped = [obj for obj in session.new if isinstance(obj, (Vendor, Item))]
+    menus = [obj for obj in stamped if isinstance(obj, Item)]  # Changed items, whose vendors are restamped
+    for obj in session.dirty:
+        if not isinstance(obj, (Vendor, Item)) or not session.is_modified(obj, include_collections=False):
+            continue
+        stamped.append(obj)
+        if isinstance(obj, Vendor):
+            old_lat, old_lng = _previous(obj, "lat"), _previous(obj, "lng")
+            if (old_lat, old_lng) != (obj.lat, obj.lng):
+                # Clients of the old area drop it; those of the new one need its menu
+                tombstones.append(_tombstone(VENDOR, obj.id, obj, old_lat, old_lng))
+                stamped.extend(obj.items)
+        else:
+            menus.append(obj)
+            old_vendor_id = _previous(obj, "vendor_id")
+            if old_vendor_id != obj.vendor_id:
+                old_vendor = session.get(Vendor, old_vendor_id)
+                if old_vendor is not None:
+                    tombstones.append(_tombstone(ITEM, obj.id, old_vendor))
+                    stamped.append(old_vendor)
+
+    deleted_vendor_ids = {obj.id for obj in session.deleted if isinstance(obj, Vendor)}
+    for obj in session.deleted:
+        if isinstance(obj, Vendor):
+            tombstones.append(_tombstone(VENDOR, obj.id, obj))
+        elif isinstance(obj, Item) and obj.vendor_id not in deleted_vendor_ids:
+            vendor = session.get(Vendor, obj.vendor_id)
+            if vendor is not None:
+                tombstones.append(_tombstone(ITEM, obj.id, vendor))
+                stamped.append(vendor)
+
+    for item in menus:
+        vendor = item.vendor if item.vendor_id is None else session.get(Vendor, item.vendor_id)
+        if vendor is not None and vendor.id not in deleted_vendor_ids:
+            stamped.append(vendor)
+
+    # Tombstones first: a move's tombstone precedes the vendor's new version
+    rows = tombstones + list(dict.fromkeys(stamped))
+    if not rows:
+        return
+    versions = SyncService.reserve(session.connection(), len(rows))
+    session.info.setdefault(RESERVED_VERSIONS, []).extend(versions)
+    for row, version in zip(rows, versions):
+        row.change_version = version
+    session.add_all(tombstones)
+
+
+@event.listens_for(Session, "after_begin")
+def _reset_reserved(session, transaction, connection):
+    session.info.pop(RESERVED_VERSIONS, None)
@@ -1,70 +1,306 @@
-from typing import List, Optional, Tuple
+import heapq
+from itertools import islice
+from typing import Dict, List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy import or_, and_
 from app.models.vendor import Vendor
 from app.models.item import Item
-from app.schemas.vendor import VendorSearchRequest, VendorResponse, VendorRating, ItemCounts, DeliveryOptions
+from app.schemas.vendor import (
+    VendorSearchRequest, VendorResponse, VendorRating, ItemCounts, DeliveryOptions, PreferenceFacets, UserFilters
+)
+from app import deadlines
 from app.config import settings
 from app.services.distance_service import DistanceService
+from app.services.facet_service import FacetCounter
 from app.services.filter_service import FilterService
+from app.services.item_group_service import ItemGroupService, ItemMatches, UserMask
+from app.services.search_executor import ItemGroupSnapshot, SearchExecutor
+from app.monitoring import profiling
+
+# Vendors per query when loading items for item-level matching
+ITEM_LOAD_CHUNK = 500
+
+# (sort value, vendor id, candidate index) of a matching vendor. Entries sort
+# ascending (sort values are negated for descending sorts), with equal sort
+# values in vendor id order.
+SortEntry = Tuple[float, int, int]
 
 
 class VendorService:
     """Business logic for vendor search and filtering."""
 
+    # Map vendor filter names to Vendor model fields ("open" is checked against hours)
+    VENDOR_FILTER_FIELDS = {
+        "delivery": "delivery",
+        "takeout": "takeout",
+        "fusion": "fusion",
+        "usa": "cuisine_usa",
+        "europe": "cuisine_europe",
+        "north_africa_middle_east": "cuisine_north_africa_middle_east",
+        "mexico_south_america": "cuisine_mexico_south_america",
+        "sub_saharan_africa": "cuisine_sub_saharan_africa",
+        "east_asia": "cuisine_east_asia",
+    }
+
     @staticmethod
     def search_vendors(
         db: Session,
         request: VendorSearchRequest
-    ) -> Tuple[List[VendorResponse], int]:
+    ) -> Tuple[List[VendorResponse], int, Optional[PreferenceFacets]]:
         """
         Search vendors based on dietary preferences with filtering, sorting, and pagination.
 
         Returns:
-            Tuple of (vendor_responses, total_count)
+            Tuple of (vendor_responses, total_count, facets); facets is None
+            unless request.facets is set
         """
+        if settings.SEARCH_ENGINE == "columnar":
+            # Imported on first use: keeps numpy off the startup path of the SQL engine
+            from app.services.columnar_search import ColumnarSearch
+
+            result = ColumnarSearch.search_vendors(db, request)
+            if result is not None:
+                return result
+
+        return VendorService._search_sql(db, request)
+
+    @staticmethod
+    def search_batch(
+        db: Session,
+        requests: Sequence[VendorSearchRequest]
+    ) -> List[Tuple[List[VendorResponse], int, Optional[PreferenceFacets]]]:
+        """
+        Run several searches, in request order (results as search_vendors returns them).
+
+        Searches sharing a location, vendor filters and search query (e.g. the
+        same search with another sort or other preferences) fetch their
+        candidates and load items once: the shared query leaves out the
+        preference filter, which each search then applies to the candidates'
+        item groups (_passes_preference_filter).
+        """
+        results: List[Optional[Tuple[List[VendorResponse], int, Optional[PreferenceFacets]]]] = [None] * len(requests)
+        if settings.SEARCH_ENGINE == "columnar":
+            from app.services.columnar_search import ColumnarSearch
+
+            for index, request in enumerate(requests):
+                results[index] = ColumnarSearch.search_vendors(db, request)
+
+        batches: Dict[tuple, List[int]] = {}
+        for index, request in enumerate(requests):
+            if results[index] is None:
+                batches.setdefault(VendorService._candidate_key(request), []).append(index)
+
+        for indexes in batches.values():
+            if len(indexes) == 1:
+                results[indexes[0]] = VendorService._search_sql(db, requests[indexes[0]])
+                continue
+
+            batch = [requests[index] for index in indexes]
+            batch_users = [ItemGroupService.compile_users(request.user_filters()) for request in batch]
+            with profiling.stage("search.fetch"):
+                vendors = VendorService._fetch_candidates(db, batch[0], [u for users in batch_users for u in users])
+                # Text searches prefilter on the items matching the text
+                text_groups = VendorService._text_groups(db, batch[0])
+            deadlines.check()
+
+            for index, request, users in zip(indexes, batch, batch_users):
+                if request.facets:
+                    candidates = vendors  # _sort_entries applies the preference filter
+                else:
+                    candidates = [v for v in vendors if VendorService._passes_preference_filter(v, users, text_groups)]
+                results[index] = VendorService._rank_candidates(request, candidates, text_groups)
+        return results
+
+    @staticmethod
+    def _search_sql(
+        db: Session,
+        request: VendorSearchRequest
+    ) -> Tuple[List[VendorResponse], int, Optional[PreferenceFacets]]:
+        """search_vendors on the SQL engine."""
         # Fetch vendors with SQL filters applied
-        vendors = VendorService._fetch_filtered_vendors(db, request)
+        with profiling.stage("search.fetch"):
+            vendors = VendorService._fetch_search_vendors(db, request)
+        deadlines.check()
 
-        # Process vendors into response objects
-        vendor_responses = VendorService._process_vendors(vendors, request)
+        text_groups = VendorService._text_groups(db, request) if request.facets else None
+        return VendorService._rank_candidates(request, vendors, text_groups)
 
-        # Sort results
-        sorted_vendors = VendorService._sort_vendors(vendor_responses, request)
+    @staticmethod
+    def _rank_candidates(
+        request: VendorSearchRequest,
+        vendors: List[Vendor],
+        text_groups: Optional[Dict[int, List[ItemGroupSnapshot]]] = None
+    ) -> Tuple[List[VendorResponse], int, Optional[PreferenceFacets]]:
+        """
+        Match, rank and paginate the candidates of a search (search_vendors
+        results, or _fetch_candidates results for facets, see _sort_entries);
+        text_groups as _text_groups returns them, for facets.
+        """
+        users = ItemGroupService.compile_users(request.user_filters())
+        facets = FacetCounter(len(users), text_groups) if request.facets else None
+        if SearchExecutor.should_parallelize(len(vendors)):
+            ranked, total_count = VendorService._rank_in_pool(vendors, request, facets)
+        else:
+            # Match vendors and compute their sort values (and facet flags)
+            with profiling.stage("search.process"):
+                entries = VendorService._sort_entries(vendors, request, facets=facets)
+
+            # Select the results up to the end of the requested page
+            with profiling.stage("search.sort"):
+                ranked = VendorService._top_entries(entries, VendorService._result_limit(request))
+            total_count = len(entries)
+        deadlines.check()
+
+        # Build responses for the requested page only
+        with profiling.stage("search.paginate"):
+            page = VendorService._paginate_results(ranked, request)
+            paginated_vendors = [
+                VendorService._process_single_vendor(vendors[index], request, users) for *_, index in page
+            ]
+
+        if profiling.current_profile() is not None:
+            profiling.count("search.candidates", len(vendors))
+            profiling.count("search.groups_hydrated", sum(len(v.item_groups) for v in vendors))
+            profiling.count("search.items_hydrated", sum(len(v.__dict__.get("items", ())) for v in vendors))
+            profiling.count("search.matched", total_count)
+
+        return paginated_vendors, total_count, facets.facets() if facets is not None else None
+
+    @staticmethod
+    def _rank_in_pool(
+        vendors: List[Vendor],
+        request: VendorSearchRequest,
+        facets: Optional[FacetCounter] = None
+    ) -> Tuple[List[SortEntry], int]:
+        """
+        Match and rank chunks of the candidates in the search process pool.
 
-        # Paginate
-        paginated_vendors = VendorService._paginate_results(sorted_vendors, request)
+        Workers send back their match count, facet counts (if requested) and
+        only their first results up to the end of the requested page, as sort
+        entries. Returns the merged first results and the total match count;
+        chunk facet counts are added to facets.
+        """
+        limit = VendorService._result_limit(request)
+        with profiling.stage("search.process"):
+            chunks = SearchExecutor.map_chunks(
+                _rank_chunk, SearchExecutor.snapshot(vendors), request, limit,
+                facets.prefilter_groups if facets is not None else None
+            )
+
+        with profiling.stage("search.sort"):
+            ranked = list(islice(heapq.merge(*(entries for _, entries, _ in chunks)), limit))
+
+        if facets is not None:
+            for _, _, chunk_facets in chunks:
+                facets.update(chunk_facets)
+        return ranked, sum(count for count, _, _ in chunks)
 
-        return paginated_vendors, len(sorted_vendors)
+    @staticmethod
+    def _fetch_search_vendors(db: Session, request: VendorSearchRequest) -> List[Vendor]:
+        """
+        The vendors _rank_candidates ranks for a search. Facet searches widen
+        the preference filter (see FacetCounter), so with facets it is left
+        out here and applied by _sort_entries.
+        """
+        if request.facets:
+            return VendorService._fetch_candidates(db, request, ItemGroupService.compile_users(request.user_filters()))
+        return VendorService._fetch_filtered_vendors(db, request)
 
     @staticmethod
     def _fetch_filtered_vendors(db: Session, request: VendorSearchRequest) -> List[Vendor]:
         """
         Build and execute SQL query with all filters applied.
-        Returns list of Vendor models with items eagerly loaded.
+        Returns list of Vendor models with item groups eagerly loaded, and
+        items for the vendors whose groups a max price splits.
         """
-        # Build base query with eager loading
-        query = db.query(Vendor).options(selectinload(Vendor.items))
+        # Build base query with eager loading, distance and vendor-level filters
+        query = VendorService._candidate_query(db, request)
+
+        # Apply search query and preference filters
+        query = VendorService._apply_search_and_preference_filters(query, request)
+
+        # Execute query and apply "open" filter
+        vendors = VendorService._apply_open_filter(query.all(), request)
+
+        VendorService._load_split_items(db, vendors, ItemGroupService.compile_users(request.user_filters()))
+
+        return vendors
+
+    @staticmethod
+    def _fetch_candidates(db: Session, request: VendorSearchRequest, users: Sequence[UserMask]) -> List[Vendor]:
+        """
+        Vendors passing a search's SQL filters except the preference filter,
+        shared by the searches of a batch with the same _candidate_key.
+        Items are loaded for the vendors whose groups a max price of any of
+        users splits.
+        """
+        query = VendorService._candidate_query(db, request)
+        if request.search_query and request.search_query.strip():
+            query = query.join(Item).filter(VendorService._search_filter(request)).distinct()
+        vendors = VendorService._apply_open_filter(query.all(), request)
+        VendorService._load_split_items(db, vendors, users)
+        return vendors
+
+    @staticmethod
+    def _candidate_key(request: VendorSearchRequest) -> tuple:
+        """The request fields _fetch_candidates depends on, normalized as the filters read them."""
+        location = (request.lat, request.lng) if request.lat is not None and request.lng is not None else None
+        vendor_filters = tuple(sorted({f.lower().strip() for f in request.vendor_filters}))
+        search_query = request.search_query.strip() if request.search_query and request.search_query.strip() else None
+        return location, vendor_filters, search_query
+
+    @staticmethod
+    def _passes_preference_filter(
+        vendor,
+        users: Sequence[UserMask],
+        text_groups: Optional[Dict[int, List[ItemGroupSnapshot]]] = None
+    ) -> bool:
+        """
+        Whether a candidate passes the preference filter of
+        _apply_search_and_preference_filters, read from its item groups:
+        an item row (a text-matching one, for text searches) passing one
+        user's filter, or any item row if no user has a SQL filter.
+        """
+        if not any(user.active for user in users):
+            return True
+        groups = vendor.item_groups if text_groups is None else text_groups.get(vendor.id, ())
+        filtered = [user for user in users if user.has_sql_filter]
+        if not filtered:
+            return bool(groups)
+        return any(ItemGroupService.passes_filter(group, user) for group in groups for user in filtered)
+
+    @staticmethod
+    def _candidate_query(db: Session, request: VendorSearchRequest):
+        """Vendor query with item groups eagerly loaded and the distance and vendor-level filters applied."""
+        query = db.query(Vendor).options(selectinload(Vendor.item_groups))
 
         # Apply distance filter (bounding box)
         query = VendorService._apply_distance_filter(query, request)
 
         # Apply vendor-level filters (delivery, cuisine, etc.)
-        query = VendorService._apply_vendor_filters(query, request)
+        return VendorService._apply_vendor_filters(query, request)
 
-        # Apply search query and preference filters
-        query = VendorService._apply_search_and_preference_filters(query, request)
-
-        # Execute query
-        vendors = query.all()
-
-        # Apply "open" filter (post-query, requires time-based logic)
+    @staticmethod
+    def _apply_open_filter(vendors: List[Vendor], request: VendorSearchRequest) -> List[Vendor]:
+        """Apply "open" filter (post-query, requires time-based logic)."""
         if request.vendor_filters and "open" in [f.lower().strip() for f in request.vendor_filters]:
             open_vendor_ids = VendorService.filter_open_vendors(vendors)
             vendors = [v for v in vendors if v.id in open_vendor_ids]
-
         return vendors
 
+    @staticmethod
+    def _load_split_items(db: Session, vendors: List[Vendor], users: Sequence[UserMask]) -> None:
+        """Load items of the vendors that need item-level matching (ItemGroupService.needs_items)."""
+        vendors = [v for v in vendors if ItemGroupService.needs_items(v.item_groups, users)]
+        for start in range(0, len(vendors), ITEM_LOAD_CHUNK):
+            chunk = vendors[start:start + ITEM_LOAD_CHUNK]
+            items_by_vendor = {v.id: [] for v in chunk}
+            for item in db.query(Item).filter(Item.vendor_id.in_(items_by_vendor)).order_by(Item.id):
+                items_by_vendor[item.vendor_id].append(item)
+            for vendor in chunk:
+                set_committed_value(vendor, "items", items_by_vendor[vendor.id])
+
     @staticmethod
     def _apply_distance_filter(query, request: VendorSearchRequest):
         """Apply distance bounding box filter to query."""
@@ -87,26 +323,9 @@ class VendorService:
         filter_conditions = []
 
         for filter_name in request.vendor_filters:
-            filter_lower = filter_name.lower().strip()
-
-            if filter_lower == "delivery":
-                filter_conditions.append(Vendor.delivery == True)
-            elif filter_lower == "takeout":
-                filter_conditions.append(Vendor.takeout == True)
-            elif filter_lower == "fusion":
-                filter_conditions.append(Vendor.fusion == True)
-            elif filter_lower == "usa":
-                filter_conditions.append(Vendor.cuisine_usa == True)
-            elif filter_lower == "europe":
-                filter_conditions.append(Vendor.cuisine_europe == True)
-            elif filter_lower == "north_africa_middle_east":
-                filter_conditions.append(Vendor.cuisine_north_africa_middle_east == True)
-            elif filter_lower == "mexico_south_america":
-                filter_conditions.append(Vendor.cuisine_mexico_south_america == True)
-            elif filter_lower == "sub_saharan_africa":
-                filter_conditions.append(Vendor.cuisine_sub_saharan_africa == True)
-            elif filter_lower == "east_asia":
-                filter_conditions.append(Vendor.cuisine_east_asia == True)
+            field_name = VendorService.VENDOR_FILTER_FIELDS.get(filter_name.lower().strip())
+            if field_name is not None:
+                filter_conditions.append(getattr(Vendor, field_name) == True)
             # Note: "open" filter handled post-query in _fetch_filtered_vendors
 
         # Apply all vendor filters with AND logic
@@ -121,45 +340,30 @@ class VendorService:
         Apply text search and preference filters.
         Joins Item table if needed and applies filters with correct logic.
         """
-        user1_prefs = request.user1_preferences
-        user2_prefs = request.user2_preferences
-        is_user1_active = len(user1_prefs) > 0
-        is_user2_active = len(user2_prefs) > 0
-        user1_has_price = request.user1_max_price is not None
-        user2_has_price = request.user2_max_price is not None
+        users = request.user_filters()
         has_search_query = bool(request.search_query and request.search_query.strip())
 
         # Determine if we need to join with Item table
-        needs_preference_filter = is_user1_active or is_user2_active or user1_has_price or user2_has_price
+        needs_preference_filter = any(user.active for user in users)
         needs_item_join = has_search_query or needs_preference_filter
 
         if not needs_item_join:
             return query
 
         # Build text search filter (vendor fields OR item names)
-        search_filter = None
-        if has_search_query:
-            search_pattern = f"%{request.search_query.strip()}%"
-            search_filter = or_(
-                Vendor.name.ilike(search_pattern),
-                Vendor.address.ilike(search_pattern),
-                Vendor.seo_tags.ilike(search_pattern),
-                Item.name.ilike(search_pattern)
-            )
+        search_filter = VendorService._search_filter(request) if has_search_query else None
 
         # Build preference filter
         preference_filter = None
         if needs_preference_filter:
-            user1_filter = FilterService.build_preference_filter(user1_prefs, request.user1_max_price)
-            user2_filter = FilterService.build_preference_filter(user2_prefs, request.user2_max_price)
+            user_filters = [
+                f for f in (FilterService.build_preference_filter(user.preferences, user.max_price) for user in users)
+                if f is not None
+            ]
 
-            # Combine with OR: vendor must have items matching user1 OR user2
-            if user1_filter is not None and user2_filter is not None:
-                preference_filter = or_(user1_filter, user2_filter)
-            elif user1_filter is not None:
-                preference_filter = user1_filter
-            else:
-                preference_filter = user2_filter
+            # Combine with OR: vendor must have items matching at least one user
+            if user_filters:
+                preference_filter = or_(*user_filters)
 
         # Join with items and apply filters
         query = query.join(Item)
@@ -175,52 +379,107 @@ class VendorService:
         return query
 
     @staticmethod
-    def _process_vendors(vendors: List[Vendor], request: VendorSearchRequest) -> List[VendorResponse]:
+    def _search_filter(request: VendorSearchRequest):
+        """Text search filter on the vendor/item join: vendor fields or the item name contain the query."""
+        search_pattern = f"%{request.search_query.strip()}%"
+        return or_(
+            Vendor.name.ilike(search_pattern),
+            Vendor.address.ilike(search_pattern),
+            Vendor.seo_tags.ilike(search_pattern),
+            Item.name.ilike(search_pattern)
+        )
+
+    @staticmethod
+    def _text_groups(db: Session, request: VendorSearchRequest) -> Optional[Dict[int, List[ItemGroupSnapshot]]]:
         """
-        Process vendors into VendorResponse objects.
-        Filters items, calculates ratings, and builds response objects.
+        Groups of the items a text search's prefilter sees, by vendor id (None
+        without a search query): one grouped query, for facet counts.
         """
-        processed_vendors = []
+        if not (request.search_query and request.search_query.strip()):
+            return None
+        query = ItemGroupService.summary_query().join(Vendor, Vendor.id == Item.vendor_id).where(
+            VendorService._search_filter(request)
+        )
+        groups = {}
+        for vendor_id, *fields in db.execute(query):
+            groups.setdefault(vendor_id, []).append(ItemGroupSnapshot(*fields))
+        return groups
 
-        for vendor in vendors:
-            vendor_response = VendorService._process_single_vendor(vendor, request)
-            if vendor_response:  # None if vendor doesn't meet criteria
-                processed_vendors.append(vendor_response)
+    @staticmethod
+    def _sort_entries(
+        vendors,
+        request: VendorSearchRequest,
+        offset: int = 0,
+        facets: Optional[FacetCounter] = None
+    ) -> List[SortEntry]:
+        """
+        Sort entries of the vendors that meet the search criteria; offset is the index of vendors[0].
 
-        return processed_vendors
+        With facets, vendors are candidates without the preference filter
+        (_fetch_candidates): every matched vendor is counted in facets, and
+        only those passing the filter are results.
+        """
+        users = ItemGroupService.compile_users(request.user_filters())
+        entries = []
+        for index, vendor in enumerate(vendors, start=offset):
+            evaluated = VendorService._evaluate_vendor(vendor, request, users)
+            if evaluated is None:
+                continue
+            if facets is not None:
+                facets.add(vendor, users)
+                if not VendorService._passes_preference_filter(vendor, users, facets.prefilter_groups):
+                    continue
+            matches, distance_miles = evaluated
+            entries.append((VendorService._sort_value(matches, distance_miles, request), vendor.id, index))
+        return entries
 
     @staticmethod
-    def _process_single_vendor(vendor: Vendor, request: VendorSearchRequest) -> Optional[VendorResponse]:
+    def _top_entries(entries: List[SortEntry], limit: int) -> List[SortEntry]:
+        """The first limit entries in result order, without sorting the rest."""
+        if limit >= len(entries):
+            return sorted(entries)
+        return heapq.nsmallest(limit, entries)
+
+    @staticmethod
+    def _result_limit(request: VendorSearchRequest) -> int:
+        """Number of ranked results needed to serve the requested page."""
+        return request.page * request.page_size
+
+    @staticmethod
+    def _process_single_vendor(
+        vendor: Vendor,
+        request: VendorSearchRequest,
+        users: Optional[Sequence[UserMask]] = None
+    ) -> Optional[VendorResponse]:
         """
         Process a single vendor into a VendorResponse.
-        Returns None if vendor doesn't meet dual-user criteria.
+        Returns None if vendor doesn't meet the search criteria.
         """
-        # Filter items for each user
-        user1_matching_items, user2_matching_items = VendorService._filter_vendor_items(vendor, request)
-
-        # Check dual-user criteria
-        if not VendorService._meets_dual_user_criteria(user1_matching_items, user2_matching_items, request):
+        users = users if users is not None else ItemGroupService.compile_users(request.user_filters())
+        evaluated = VendorService._evaluate_vendor(vendor, request, users)
+        if evaluated is None:
             return None
+        matches, distance_miles = evaluated
+        rating = VendorService._calculate_rating(matches)
+        return VendorService._build_vendor_response(vendor, rating, distance_miles, matches)
 
-        # Determine relevant items for rating calculation
-        relevant_items = VendorService._get_relevant_items(
-            user1_matching_items, user2_matching_items, vendor.items, request
-        )
-
-        # Skip vendor if no relevant items (when filters are active)
-        user1_prefs = request.user1_preferences
-        user2_prefs = request.user2_preferences
-        is_user1_active = len(user1_prefs) > 0
-        is_user2_active = len(user2_prefs) > 0
-        user1_has_price = request.user1_max_price is not None
-        user2_has_price = request.user2_max_price is not None
+    @staticmethod
+    def _evaluate_vendor(
+        vendor: Vendor,
+        request: VendorSearchRequest,
+        users: Sequence[UserMask]
+    ) -> Optional[Tuple[ItemMatches, Optional[float]]]:
+        """
+        Match a vendor's items and compute its distance.
+        Returns (item matches, distance) or None if vendor doesn't serve every user.
+        """
+        # Count matching items from the vendor's item groups
+        matches = ItemGroupService.match(vendor, users)
 
-        if (is_user1_active or is_user2_active or user1_has_price or user2_has_price) and len(relevant_items) == 0:
+        # Every user with filters needs a matching item
+        if not VendorService._serves_every_user(matches, users):
             return None
 
-        # Calculate rating
-        rating = VendorService._calculate_rating(relevant_items)
-
         # Calculate distance
         distance_miles = VendorService._calculate_distance(vendor, request)
 
@@ -231,117 +490,29 @@ class VendorService:
             ):
                 return None
 
-        # Build response object
-        return VendorService._build_vendor_response(
-            vendor, rating, distance_miles, user1_matching_items, user2_matching_items, relevant_items
-        )
+        return matches, distance_miles
 
     @staticmethod
-    def _filter_vendor_items(vendor: Vendor, request: VendorSearchRequest) -> Tuple[List[Item], List[Item]]:
+    def _serves_every_user(matches: ItemMatches, users: Sequence[UserMask]) -> bool:
         """
-        Filter vendor's items for each user based on preferences and price.
-        Returns tuple of (user1_matching_items, user2_matching_items).
+        Check if vendor has a matching item for every user with filters.
+        Users without filters are served by any vendor.
         """
-        user1_prefs = request.user1_preferences
-        user2_prefs = request.user2_preferences
-        is_user1_active = len(user1_prefs) > 0
-        is_user2_active = len(user2_prefs) > 0
-        user1_has_price = request.user1_max_price is not None
-        user2_has_price = request.user2_max_price is not None
-
-        user1_matching_items = []
-        user2_matching_items = []
-
-        for item in vendor.items:
-            if (is_user1_active or user1_has_price) and FilterService.item_matches_preferences(
-                item, user1_prefs, request.user1_max_price
-            ):
-                user1_matching_items.append(item)
-
-            if (is_user2_active or user2_has_price) and FilterService.item_matches_preferences(
-                item, user2_prefs, request.user2_max_price
-            ):
-                user2_matching_items.append(item)
-
-        return user1_matching_items, user2_matching_items
-
-    @staticmethod
-    def _meets_dual_user_criteria(
-        user1_items: List[Item],
-        user2_items: List[Item],
-        request: VendorSearchRequest
-    ) -> bool:
-        """
-        Check if vendor meets dual-user criteria.
-        When both users have filters, vendor must have items for BOTH users.
-        """
-        user1_prefs = request.user1_preferences
-        user2_prefs = request.user2_preferences
-        is_user1_active = len(user1_prefs) > 0
-        is_user2_active = len(user2_prefs) > 0
-        user1_has_price = request.user1_max_price is not None
-        user2_has_price = request.user2_max_price is not None
-
-        # When both users have filters, vendor must have items for BOTH users
-        if (is_user1_active or user1_has_price) and (is_user2_active or user2_has_price):
-            if len(user1_items) == 0 or len(user2_items) == 0:
-                return False
-
-        return True
-
-    @staticmethod
-    def _get_relevant_items(
-        user1_items: List[Item],
-        user2_items: List[Item],
-        all_items: List[Item],
-        request: VendorSearchRequest
-    ) -> List[Item]:
-        """
-        Determine which items are relevant for rating calculation.
-
-        Logic:
-        - Both users active: Union of both users' items (distinct)
-        - User 1 only: User 1's items
-        - User 2 only: User 2's items
-        - No users: All items
-        """
-        user1_prefs = request.user1_preferences
-        user2_prefs = request.user2_preferences
-        is_user1_active = len(user1_prefs) > 0
-        is_user2_active = len(user2_prefs) > 0
-        user1_has_price = request.user1_max_price is not None
-        user2_has_price = request.user2_max_price is not None
-
-        if (is_user1_active or user1_has_price) and (is_user2_active or user2_has_price):
-            # Combine both users' matching items (distinct by ID)
-            seen_ids = set()
-            relevant_items = []
-            for item in user1_items + user2_items:
-                if item.id not in seen_ids:
-                    seen_ids.add(item.id)
-                    relevant_items.append(item)
-            return relevant_items
-        elif is_user1_active or user1_has_price:
-            return user1_items
-        elif is_user2_active or user2_has_price:
-            return user2_items
-        else:
-            # No preferences or price filters selected, all items are relevant
-            return all_items
+        return all(count > 0 for count, user in zip(matches.user_matches, users) if user.active)
 
     @staticmethod
-    def _calculate_rating(items: List[Item]) -> VendorRating:
-        """Calculate context-aware rating from relevant items."""
-        total_upvotes = sum(item.upvotes for item in items)
-        total_votes = sum(item.total_votes for item in items)
-        rating_percentage = min(total_upvotes / total_votes, 1.0) if total_votes > 0 else 0.0
-
+    def _calculate_rating(matches: ItemMatches) -> VendorRating:
+        """Calculate context-aware rating from the relevant items' votes."""
         return VendorRating(
-            upvotes=total_upvotes,
-            total_votes=total_votes,
-            percentage=rating_percentage
+            upvotes=matches.upvotes,
+            total_votes=matches.total_votes,
+            percentage=VendorService._rating_percentage(matches)
         )
 
+    @staticmethod
+    def _rating_percentage(matches: ItemMatches) -> float:
+        return min(matches.upvotes / matches.total_votes, 1.0) if matches.total_votes > 0 else 0.0
+
     @staticmethod
     def _calculate_distance(vendor: Vendor, request: VendorSearchRequest) -> Optional[float]:
         """Calculate exact distance if user location provided."""
@@ -356,9 +527,7 @@ class VendorService:
         vendor: Vendor,
         rating: VendorRating,
         distance_miles: Optional[float],
-        user1_items: List[Item],
-        user2_items: List[Item],
-        relevant_items: List[Item]
+        matches: ItemMatches
     ) -> VendorResponse:
         """Build VendorResponse object from vendor and calculated data."""
         return VendorResponse(
@@ -377,9 +546,10 @@ class VendorService:
             distance_miles=distance_miles,
             rating=rating,
             item_counts=ItemCounts(
-                user1_matches=len(user1_items),
-                user2_matches=len(user2_items),
-                total_relevant=len(relevant_items)
+                user1_matches=matches.user_matches[0] if len(matches.user_matches) > 0 else 0,
+                user2_matches=matches.user_matches[1] if len(matches.user_matches) > 1 else 0,
+                total_relevant=matches.total_relevant,
+                user_matches=list(matches.user_matches)
             ),
             delivery_options=DeliveryOptions(
                 delivery=vendor.delivery,
@@ -392,24 +562,23 @@ class VendorService:
         )
 
     @staticmethod
-    def _sort_vendors(vendors: List[VendorResponse], request: VendorSearchRequest) -> List[VendorResponse]:
-        """Sort vendors by specified column and direction."""
+    def _sort_value(matches: ItemMatches, distance_miles: Optional[float], request: VendorSearchRequest) -> float:
+        """
+        Value of the requested sort column, negated for descending sorts, so
+        that entries always sort ascending.
+        """
         # Enum values can be compared directly (inherits from str)
         if request.sort_by == "rating":
-            sort_key = lambda v: v.rating.percentage
+            value = VendorService._rating_percentage(matches)
         elif request.sort_by == "distance" and request.lat is not None:
-            sort_key = lambda v: v.distance_miles if v.distance_miles is not None else float('inf')
+            value = distance_miles if distance_miles is not None else float('inf')
         else:  # "item_count" (default)
-            sort_key = lambda v: v.item_counts.total_relevant
+            value = matches.total_relevant
 
-        reverse = request.sort_direction == "desc"
-        return sorted(vendors, key=sort_key, reverse=reverse)
+        return -value if request.sort_direction == "desc" else value
 
     @staticmethod
-    def _paginate_results(
-        vendors: List[VendorResponse],
-        request: VendorSearchRequest
-    ) -> List[VendorResponse]:
+    def _paginate_results(vendors: List, request: VendorSearchRequest) -> List:
         """Paginate sorted vendor results."""
         start_index = (request.page - 1) * request.page_size
         end_index = start_index + request.page_size
@@ -424,46 +593,33 @@ class VendorService:
     def get_vendor_items(
         db: Session,
         vendor_id: int,
-        user1_preferences: Optional[List[str]] = None,
-        user2_preferences: Optional[List[str]] = None,
-        user1_max_price: Optional[float] = None,
-        user2_max_price: Optional[float] = None
+        users: Sequence[UserFilters] = ()
     ) -> List[Item]:
         """
-        Get all items for a vendor, optionally filtered by preferences and price.
+        Get all items for a vendor, optionally filtered by the users' preferences and prices.
+        Filtered items carry matches_users (and matches_user1/2 for the first two users).
         """
         items = db.query(Item).filter(Item.vendor_id == vendor_id).all()
 
-        # Check if any filters are active for each user
-        user1_active = bool(user1_preferences or user1_max_price is not None)
-        user2_active = bool(user2_preferences or user2_max_price is not None)
-
         # If no filters at all, return all items
-        if not user1_active and not user2_active:
+        if not any(user.active for user in users):
             return items
 
-        # Filter items based on preferences and price
+        # Only check matching for active users; each item's flags are read once
+        masks = ItemGroupService.compile_users(users)
         filtered_items = []
         for item in items:
-            # Only check matching for active users
-            matches_user1 = False
-            matches_user2 = False
-
-            if user1_active:
-                matches_user1 = FilterService.item_matches_preferences(
-                    item, user1_preferences or [], user1_max_price
-                )
-
-            if user2_active:
-                matches_user2 = FilterService.item_matches_preferences(
-                    item, user2_preferences or [], user2_max_price
-                )
+            matches = [
+                user.active and matched
+                for user, matched in zip(masks, ItemGroupService.item_matches(item, masks))
+            ]
 
             # Include item if it matches at least one ACTIVE user's filters
-            if matches_user1 or matches_user2:
+            if any(matches):
                 # Attach metadata for client
-                item.matches_user1 = matches_user1
-                item.matches_user2 = matches_user2
+                item.matches_users = matches
+                item.matches_user1 = matches[0] if len(matches) > 0 else None
+                item.matches_user2 = matches[1] if len(matches) > 1 else None
                 filtered_items.append(item)
 
         return filtered_items
@@ -502,3 +658,17 @@ class VendorService:
                     continue
 
         return open_vendor_ids
+
+
+def _rank_chunk(
+    vendors, offset: int, request: VendorSearchRequest, limit: int, prefilter_groups: Optional[Dict[int, List]]
+) -> Tuple[int, List[SortEntry], Optional[FacetCounter]]:
+    """
+    Match count, first limit sort entries and facet counts (if requested) of
+    one chunk of snapshots (runs in a search pool worker).
+    """
+    facets = FacetCounter(len(request.user_filters()), prefilter_groups) if request.facets else None
+    entries = VendorService._sort_entries(vendors, request, offset, facets)
+    if facets is not None:
+        facets.prefilter_groups = None  # Only the counts go back
+    return len(entries), VendorService._top_entries(entries, limit), facets
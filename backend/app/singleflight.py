@@ -0,0 +1,88 @@
+"""
+Single-flight request coalescing.
+
+Concurrent requests for the same key (an identical search, the same menu
+with the same filters) await one computation instead of each running it:
+the first request starts the computation as a task, requests arriving while
+it runs await that task, and the key is released as soon as it finishes.
+Nothing is kept afterwards; reuse across time is the response caches' job
+(app/cache.py).
+
+The computation runs as its own task, so a waiting request that is
+cancelled (client gone, deadline) does not cancel it for the others. It
+must therefore not use a request's database session: the session is closed
+when the request that opened it ends.
+
+Flights are per process and per event loop (each worker coalesces its own
+requests).
+"""
+import asyncio
+from functools import partial
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from app.config import settings
+from app.monitoring import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """A named group of coalesced computations, keyed by the canonical request."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        """Result of compute(), shared with concurrent callers using the same key."""
+        if not settings.REQUEST_COALESCING_ENABLED:
+            return await compute()
+
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._calls[key] = task
+            task.add_done_callback(partial(self._finished, key))
+            role = "leader"
+        else:
+            role = "coalesced"
+        metrics.coalesced_requests.labels(self.name, role).inc()
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved, even if every waiter was cancelled
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+search = SingleFlight("search")
+vendor_items = SingleFlight("vendor_items")
+
+FLIGHTS: Dict[str, SingleFlight] = {flight.name: flight for flight in (search, vendor_items)}
+
+
+def _collect_ratio():
+    samples = []
+    for name in FLIGHTS:
+        leaders = metrics.coalesced_requests.labels(name, "leader").value
+        coalesced = metrics.coalesced_requests.labels(name, "coalesced").value
+        total = leaders + coalesced
+        samples.append(("coalesced_request_ratio", {"flight": name}, coalesced / total if total else 0.0))
+    return samples
+
+
+def _collect_in_flight():
+    return [("coalesced_computations_in_flight", {"flight": name}, len(flight)) for name, flight in FLIGHTS.items()]
+
+
+metrics.registry.register_collector(
+    "coalesced_request_ratio", "gauge", "Share of single-flight requests served by another request's computation",
+    _collect_ratio
+)
+metrics.registry.register_collector(
+    "coalesced_computations_in_flight", "gauge", "Single-flight computations currently running", _collect_in_flight
+)
@@ -0,0 +1,117 @@
+"""
+Application startup checks and cache warming (run from the lifespan hook).
+
+Schema management belongs to Alembic (``alembic upgrade head``); at startup
+the app only verifies that the schema is usable, instead of running
+``create_all`` on every import and worker start.
+"""
+import logging
+import os
+import time
+
+from sqlalchemy import inspect
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_MODES = ("verify", "create", "skip")
+
+SEARCH_ENGINES = ("sql", "columnar")
+
+REQUIRED_TABLES = ("vendors", "items", "item_groups", "catalog_state", "tombstones")
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SchemaNotReady(RuntimeError):
+    """Raised at startup when required tables are missing."""
+
+
+def migration_heads() -> tuple:
+    """Head revision(s) of the Alembic migration scripts, () if there are none."""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(os.path.join(_BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(_BACKEND_DIR, "alembic"))
+    return tuple(ScriptDirectory.from_config(config).get_heads())
+
+
+def verify_schema(engine) -> None:
+    """
+    Check that the required tables exist and the schema is at the migration head.
+
+    Missing tables raise SchemaNotReady (so a misconfigured deploy fails fast);
+    a revision mismatch is logged, since rolling deploys briefly run old code
+    against a newer schema and vice versa.
+    """
+    from alembic.runtime.migration import MigrationContext
+
+    with engine.connect() as conn:
+        missing = [table for table in REQUIRED_TABLES if not inspect(conn).has_table(table)]
+        if missing:
+            raise SchemaNotReady(
+                f"Missing tables: {', '.join(missing)}. Run `alembic upgrade head` "
+                "(or set SCHEMA_STARTUP_MODE=create for local development)."
+            )
+        current = set(MigrationContext.configure(conn).get_current_heads())
+
+    heads = set(migration_heads())
+    if heads and current != heads:
+        logger.warning(
+            "Database schema revision %s does not match migration head %s; run `alembic upgrade head`",
+            ", ".join(sorted(current)) or "(unversioned)", ", ".join(sorted(heads))
+        )
+
+
+def prepare_schema(engine, mode: str) -> None:
+    """Apply SCHEMA_STARTUP_MODE: verify (default), create (create_all) or skip."""
+    if mode not in SCHEMA_MODES:
+        raise ValueError(f"Unknown SCHEMA_STARTUP_MODE '{mode}' (choose from {', '.join(SCHEMA_MODES)})")
+    if mode == "create":
+        from app.database import Base
+        import app.models  # noqa: F401 - register the models on Base.metadata
+        from app.services.item_group_service import ItemGroupService
+
+        had_groups = inspect(engine).has_table("item_groups")
+        Base.metadata.create_all(bind=engine)
+        if not had_groups:
+            # Tables created before item groups existed: derive them from the items
+            with engine.begin() as conn:
+                ItemGroupService.rebuild(conn)
+    elif mode == "verify":
+        verify_schema(engine)
+
+
+def warm_caches(engine) -> None:
+    """Open a pooled connection, build the precompressed config payloads and start the search pool."""
+    from app.api.v1 import config
+    from app.services.search_executor import SearchExecutor
+
+    with engine.connect():
+        pass
+    config.warm_payloads()
+    SearchExecutor.warm()
+
+
+def prepare_search_engine(engine, name: str) -> None:
+    """Load the in-memory catalog for SEARCH_ENGINE=columnar (falls back to SQL without numpy)."""
+    if name not in SEARCH_ENGINES:
+        raise ValueError(f"Unknown SEARCH_ENGINE '{name}' (choose from {', '.join(SEARCH_ENGINES)})")
+    if name == "columnar":
+        from app.services.columnar_search import ColumnarSearch
+
+        if ColumnarSearch.available():
+            ColumnarSearch.load(engine)
+        else:
+            logger.warning("SEARCH_ENGINE=columnar needs numpy (pip install numpy); searching with SQL")
+
+
+def run_startup(engine) -> None:
+    start = time.perf_counter()
+    prepare_schema(engine, settings.SCHEMA_STARTUP_MODE)
+    prepare_search_engine(engine, settings.SEARCH_ENGINE)
+    if settings.STARTUP_WARM_CACHES:
+        warm_caches(engine)
+    logger.info("Startup completed in %.1f ms", (time.perf_counter() - start) * 1000)
@@ -0,0 +1,265 @@
+"""
+Synthetic data generator for load testing.
+
+Builds vendors and menus at arbitrary scale from the seed restaurant
+templates (app/seed.py). Vendor count, city centers, geographic spread,
+items per vendor, flag noise/correlations and vote distributions are
+configurable; output is deterministic for a given seed.
+
+Rows are generated lazily, so millions of items can be bulk loaded straight
+into the database (app/bulk_load.py) or written to a JSONL file (one vendor
+per line, items nested) that can be loaded again later.
+
+Usage (from the backend directory):
+    python -m app.synthetic --vendors 5000 --items-mean 40
+    python -m app.synthetic --vendors 50000 --city bozeman --city missoula --output data.jsonl
+    python -m app.synthetic --input data.jsonl --method copy
+"""
+import argparse
+import json
+import math
+import random
+import time
+from typing import Iterator, List, Tuple
+
+from app import bulk_load
+from app.schemas.item import DietaryFlags
+from app.schemas.synthetic import SyntheticConfig
+from app.seed import (
+    BOZEMAN_LAT,
+    BOZEMAN_LNG,
+    BOZEMAN_ZIPS,
+    RESTAURANTS,
+    build_item_fields,
+    build_vendor_fields,
+)
+
+# name: (lat, lng, city label, zipcodes, area code)
+CITIES = {
+    "bozeman": (BOZEMAN_LAT, BOZEMAN_LNG, "Bozeman, MT", BOZEMAN_ZIPS, 406),
+    "missoula": (46.8721, -113.9940, "Missoula, MT", [59801, 59802, 59803, 59808], 406),
+    "billings": (45.7833, -108.5007, "Billings, MT", [59101, 59102, 59105, 59106], 406),
+    "denver": (39.7392, -104.9903, "Denver, CO", [80202, 80203, 80205, 80211], 303),
+    "seattle": (47.6062, -122.3321, "Seattle, WA", [98101, 98103, 98109, 98122], 206),
+}
+
+ITEM_DISTRIBUTIONS = ("template", "uniform", "poisson", "lognormal")
+VOTE_DISTRIBUTIONS = ("seed", "beta", "sparse")
+
+# Portion/variant suffixes used when a menu is larger than its template
+VARIANTS = ["", " (Large)", " (Small)", " Special", " Combo", " Deluxe", " Lite", " Family Size"]
+
+# Flag implications applied (in order) to every generated item, so randomly
+# perturbed flags stay internally consistent. Each rule is
+# (flag, flags set True, flags set False) when flag is True.
+FLAG_CORRELATIONS = [
+    ("vegan", ("vegetarian", "no_milk", "no_eggs", "no_fish", "no_shellfish", "no_pork_products", "no_red_meat"),
+     ()),
+    ("vegetarian", ("no_fish", "no_shellfish", "no_pork_products", "no_red_meat"),
+     ("beef", "chicken", "pork", "seafood")),
+    ("keto", ("low_carb",), ()),
+    ("beef", (), ("no_red_meat", "vegetarian", "vegan", "pescetarian")),
+    ("pork", (), ("no_pork_products", "no_red_meat", "vegetarian", "vegan", "pescetarian", "kosher", "halal")),
+    ("chicken", (), ("vegetarian", "vegan", "pescetarian")),
+    ("seafood", (), ("no_shellfish", "vegetarian", "vegan")),
+]
+
+
+def apply_correlations(fields: dict) -> dict:
+    """Make dietary flags consistent with FLAG_CORRELATIONS (in place)."""
+    for flag, implied_true, implied_false in FLAG_CORRELATIONS:
+        if fields.get(flag):
+            for name in implied_true:
+                fields[name] = True
+            for name in implied_false:
+                fields[name] = False
+    return fields
+
+
+def _random_location(rng: random.Random, lat: float, lng: float, spread_miles: float) -> Tuple[float, float]:
+    """Uniform point in a disc of spread_miles around (lat, lng)."""
+    distance = spread_miles * math.sqrt(rng.random())
+    angle = rng.uniform(0, 2 * math.pi)
+    return (
+        lat + distance * math.cos(angle) / 69.0,
+        lng + distance * math.sin(angle) / (69.0 * math.cos(math.radians(lat))),
+    )
+
+
+def _menu_size(rng: random.Random, config: SyntheticConfig, template_size: int) -> int:
+    if config.items_distribution == "template":
+        size = rng.randint(min(4, template_size), template_size)
+    elif config.items_distribution == "uniform":
+        size = rng.randint(1, max(1, round(2 * config.items_mean - 1)))
+    elif config.items_distribution == "poisson":
+        # Knuth's method; switch to a normal approximation for large means
+        if config.items_mean > 30:
+            size = round(rng.gauss(config.items_mean, math.sqrt(config.items_mean)))
+        else:
+            limit, size, product = math.exp(-config.items_mean), 0, rng.random()
+            while product > limit:
+                size += 1
+                product *= rng.random()
+    else:  # lognormal: long tail of very large menus
+        sigma = 0.75
+        size = round(rng.lognormvariate(math.log(config.items_mean) - sigma ** 2 / 2, sigma))
+    return min(max(size, config.items_min), config.items_max)
+
+
+def _votes(rng: random.Random, config: SyntheticConfig) -> Tuple[int, int]:
+    """(upvotes, total_votes) for one item."""
+    if config.votes == "beta":
+        # Most items well liked, some polarizing
+        total = int(rng.lognormvariate(3.5, 1.0))
+        return round(total * rng.betavariate(8, 2)), total
+    if config.votes == "sparse":
+        # New catalog: most items unrated
+        if rng.random() < 0.7:
+            return 0, 0
+        total = rng.randint(1, 20)
+        return rng.randint(0, total), total
+    raise ValueError(f"Unknown vote distribution '{config.votes}'")
+
+
+def _build_menu(rng: random.Random, config: SyntheticConfig, template: dict) -> List[dict]:
+    template_items = template["items"]
+    size = _menu_size(rng, config, len(template_items))
+
+    if size <= len(template_items):
+        chosen = [(item, "") for item in rng.sample(template_items, size)]
+    else:
+        chosen = [(template_items[i % len(template_items)], VARIANTS[(i // len(template_items)) % len(VARIANTS)])
+                  for i in range(size)]
+
+    menu = []
+    for position, (item_data, variant) in enumerate(chosen):
+        name = f"{item_data['name']}{variant}"
+        if position >= len(template_items) * len(VARIANTS):
+            name = f"{name} #{position}"
+        fields = build_item_fields(
+            {**item_data, "name": name, "price": round(item_data["price"] * rng.uniform(0.8, 1.2), 2)},
+            rng=rng
+        )
+        if config.flag_noise:
+            for flag in DietaryFlags.model_fields:
+                if rng.random() < config.flag_noise:
+                    fields[flag] = not fields[flag]
+        if config.correlations:
+            apply_correlations(fields)
+        if config.votes != "seed":  # "seed" keeps the votes drawn by build_item_fields
+            fields["upvotes"], fields["total_votes"] = _votes(rng, config)
+        menu.append(fields)
+    return menu
+
+
+def generate(config: SyntheticConfig) -> Iterator[Tuple[dict, List[dict]]]:
+    """
+    Yield (vendor_fields, [item_fields, ...]) for config.vendors vendors.
+
+    Vendors are distributed round-robin across the configured cities.
+    Deterministic for a given config.
+    """
+    for city in config.cities:
+        if city not in CITIES:
+            raise ValueError(f"Unknown city '{city}' (choose from {', '.join(CITIES)})")
+    if config.items_distribution not in ITEM_DISTRIBUTIONS:
+        raise ValueError(f"Unknown items distribution '{config.items_distribution}'")
+    if config.votes not in VOTE_DISTRIBUTIONS:
+        raise ValueError(f"Unknown vote distribution '{config.votes}'")
+
+    rng = random.Random(config.seed)
+    spread = config.city_spread()
+
+    for i in range(1, config.vendors + 1):
+        lat, lng, label, zipcodes, area_code = CITIES[config.cities[(i - 1) % len(config.cities)]]
+        template = rng.choice(RESTAURANTS)
+        vendor_lat, vendor_lng = _random_location(rng, lat, lng, spread)
+        restaurant = {**template, "name": f"{template['name']} #{i}"}
+        vendor = build_vendor_fields(
+            restaurant, i, vendor_lat, vendor_lng,
+            city=label, zipcodes=zipcodes, area_code=area_code, rng=rng
+        )
+        yield vendor, _build_menu(rng, config, template)
+
+
+def write_jsonl(rows: Iterator[Tuple[dict, List[dict]]], path: str) -> Tuple[int, int]:
+    """Write generated rows as JSONL (one vendor per line with nested items)."""
+    vendors = items = 0
+    with open(path, "w") as f:
+        for vendor, menu in rows:
+            f.write(json.dumps({**vendor, "items": menu}, separators=(",", ":")))
+            f.write("\n")
+            vendors += 1
+            items += len(menu)
+    return vendors, items
+
+
+def read_jsonl(path: str) -> Iterator[Tuple[dict, List[dict]]]:
+    """Read rows written by write_jsonl."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield record, record.pop("items", [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic vendors and menu items")
+    parser.add_argument("--vendors", type=int, default=1000, help="Number of vendors")
+    parser.add_argument("--city", action="append", choices=list(CITIES), help="City center (repeatable)")
+    parser.add_argument("--spread-miles", type=float, help="Radius around each city center")
+    parser.add_argument("--items-distribution", choices=ITEM_DISTRIBUTIONS, default="template")
+    parser.add_argument("--items-mean", type=float, default=7.0, help="Mean items per vendor")
+    parser.add_argument("--items-min", type=int, default=1)
+    parser.add_argument("--items-max", type=int, default=200)
+    parser.add_argument("--flag-noise", type=float, default=0.0, help="Probability of flipping each item flag")
+    parser.add_argument("--no-correlations", action="store_true", help="Don't enforce flag implications")
+    parser.add_argument("--votes", choices=VOTE_DISTRIBUTIONS, default="seed", help="Vote distribution")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", help="Write JSONL to this file instead of the database")
+    parser.add_argument("--input", help="Load a JSONL file written by --output into the database")
+    parser.add_argument("--method", choices=bulk_load.METHODS, default="auto", help="Database load method")
+    parser.add_argument("--batch-size", type=int, default=bulk_load.DEFAULT_BATCH_SIZE, help="Vendors per batch")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.input:
+        rows = read_jsonl(args.input)
+    else:
+        config = SyntheticConfig(
+            vendors=args.vendors,
+            cities=args.city or ["bozeman"],
+            spread_miles=args.spread_miles,
+            items_distribution=args.items_distribution,
+            items_mean=args.items_mean,
+            items_min=args.items_min,
+            items_max=args.items_max,
+            flag_noise=args.flag_noise,
+            correlations=not args.no_correlations,
+            votes=args.votes,
+            seed=args.seed,
+        )
+        rows = generate(config)
+
+    if args.output:
+        vendors, items = write_jsonl(rows, args.output)
+        print(f"Wrote {vendors} vendors / {items} items to {args.output}")
+    else:
+        from app.database import Base, engine
+
+        print("Recreating tables...")
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+
+        def progress(stats):
+            if stats.vendors % (args.batch_size * 10) == 0:
+                print(f"  {stats.summary()}")
+
+        stats = bulk_load.load(engine, rows, args.method, args.batch_size, progress)
+        print(f"✅ Loaded {stats.summary()}")
+
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
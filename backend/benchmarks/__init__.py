@@ -0,0 +1 @@
+"""Performance benchmarks for the Dietprefs backend (run from the backend directory)."""
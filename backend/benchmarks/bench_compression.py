@@ -0,0 +1,136 @@
+"""
+Compression level benchmark.
+
+Measures latency, CPU cost and compression ratio for each gzip level (and
+brotli quality, if brotli is installed) on representative API payloads:
+a full search results page, a vendor menu, and the static config payloads.
+
+Usage:
+    python -m benchmarks.bench_compression [--repeat 200]
+"""
+import argparse
+import math
+import statistics
+import time
+from datetime import datetime, timezone
+
+from app.api.v1.config import build_app_config, build_preferences_config
+from app.middleware.compression import BROTLI, GZIP, available_encodings, compress_payload
+from app.schemas.item import DietaryFlags, ItemRating, ItemResponse
+from app.schemas.vendor import (
+    DeliveryOptions,
+    ItemCounts,
+    PaginationMeta,
+    VendorRating,
+    VendorResponse,
+    VendorSearchResponse,
+)
+from app.seed import RESTAURANTS
+
+LEVELS = {
+    GZIP: range(1, 10),
+    BROTLI: range(0, 12),
+}
+
+
+def build_search_payload(page_size: int = 100) -> bytes:
+    """A search results page built from the seed restaurants."""
+    vendors = []
+    for i in range(page_size):
+        restaurant = RESTAURANTS[i % len(RESTAURANTS)]
+        vendors.append(VendorResponse(
+            id=i + 1,
+            name=restaurant["name"],
+            lat=45.6770 + i * 0.001,
+            lng=-111.0429 - i * 0.001,
+            address=f"{100 + i} Main Street, Bozeman, MT",
+            zipcode=59715,
+            phone="406-555-0100",
+            website="https://www.example.com",
+            hours='{"monday": "11:00-22:00", "tuesday": "11:00-22:00"}',
+            seo_tags=restaurant["tags"],
+            region=i,
+            distance_miles=round(i * 0.07, 2),
+            rating=VendorRating(upvotes=420, total_votes=512, percentage=420 / 512),
+            item_counts=ItemCounts(user1_matches=4, user2_matches=3, total_relevant=5),
+            delivery_options=DeliveryOptions(delivery=True, takeout=True),
+        ))
+    response = VendorSearchResponse(
+        vendors=vendors,
+        pagination=PaginationMeta(page=1, page_size=page_size, total_results=page_size, total_pages=1),
+        user1_display="vegetarian, gluten-free, under $15",
+        user2_display="keto",
+    )
+    return response.model_dump_json().encode()
+
+
+def build_menu_payload() -> bytes:
+    """A vendor menu (items endpoint) built from the first seed restaurant."""
+    now = datetime.now(timezone.utc)
+    items = [
+        ItemResponse(
+            id=i + 1,
+            vendor_id=1,
+            name=item["name"],
+            price=item["price"],
+            pictures="",
+            dietary_flags=DietaryFlags(**{k: v for k, v in item.items() if isinstance(v, bool)}),
+            rating=ItemRating(upvotes=40, total_votes=50, percentage=0.8),
+            matches_user1=True,
+            matches_user2=False,
+            created_at=now,
+        )
+        for i, item in enumerate(RESTAURANTS[0]["items"])
+    ]
+    return ("[" + ",".join(item.model_dump_json() for item in items) + "]").encode()
+
+
+def measure(body: bytes, encoding: str, level: int, repeat: int) -> dict:
+    """Compress body repeatedly and collect wall-clock and CPU timings."""
+    wall_times = []
+    cpu_times = []
+    compressed = b""
+    for _ in range(repeat):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        compressed = compress_payload(body, encoding, level)
+        cpu_times.append(time.process_time() - cpu_start)
+        wall_times.append(time.perf_counter() - wall_start)
+
+    wall_times.sort()
+    return {
+        "p50_ms": statistics.median(wall_times) * 1000,
+        "p99_ms": wall_times[math.ceil(len(wall_times) * 0.99) - 1] * 1000,
+        "cpu_ms": sum(cpu_times) / len(cpu_times) * 1000,
+        "size": len(compressed),
+        "ratio": len(body) / len(compressed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response compression levels")
+    parser.add_argument("--repeat", type=int, default=200, help="Iterations per level")
+    args = parser.parse_args()
+
+    payloads = {
+        "search (100 vendors)": build_search_payload(100),
+        "search (10 vendors)": build_search_payload(10),
+        "menu": build_menu_payload(),
+        "config": build_app_config().model_dump_json().encode(),
+        "preferences": build_preferences_config().model_dump_json().encode(),
+    }
+
+    for name, body in payloads.items():
+        print(f"\n{name}: {len(body)} bytes uncompressed")
+        print(f"  {'encoding':<8} {'level':>5} {'p50 ms':>8} {'p99 ms':>8} {'cpu ms':>8} {'bytes':>8} {'ratio':>6}")
+        for encoding in available_encodings():
+            for level in LEVELS[encoding]:
+                result = measure(body, encoding, level, args.repeat)
+                print(
+                    f"  {encoding:<8} {level:>5} {result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f} "
+                    f"{result['cpu_ms']:>8.3f} {result['size']:>8} {result['ratio']:>6.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Event loop responsiveness under heavy searches.
+
+Starts uvicorn (one process) for each SEARCH_EXECUTOR mode, keeps wide
+searches (no location, every vendor is a candidate) running from a few
+client threads, and meanwhile polls /health. Reports /health latency and
+search throughput per mode: with ``inline`` a health check waits for the
+running search to finish, with ``thread``/``process`` it should not.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_event_loop --size 10k
+    python -m benchmarks.bench_event_loop --size 10k --mode inline --mode thread --seconds 20
+"""
+import argparse
+import json
+import math
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.datasets import SIZES, build_dataset, default_database_url
+
+HEALTH_INTERVAL = 0.05
+STARTUP_TIMEOUT = 60.0
+
+WIDE_SEARCH = {"user1_preferences": [], "sort_by": "rating", "sort_direction": "desc", "page_size": 20}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(env: dict) -> tuple:
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    while time.perf_counter() - start < STARTUP_TIMEOUT:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited during startup:\n{process.stderr.read().decode()}")
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=1):
+                return process, base_url
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError(f"{base_url} did not start within {STARTUP_TIMEOUT:.0f}s")
+
+
+def run_mode(env: dict, clients: int, seconds: float) -> dict:
+    process, base_url = _start_server(env)
+    stop = threading.Event()
+    searches = []
+    body = json.dumps(WIDE_SEARCH).encode()
+
+    def search_client():
+        while not stop.is_set():
+            request = urllib.request.Request(
+                f"{base_url}/api/v1/vendors/search", data=body, headers={"Content-Type": "application/json"}
+            )
+            start = time.perf_counter()
+            with urllib.request.urlopen(request, timeout=300) as response:
+                response.read()
+            searches.append(time.perf_counter() - start)
+
+    try:
+        threads = [threading.Thread(target=search_client, daemon=True) for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.5)  # let the searches start
+
+        health = []
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            with urllib.request.urlopen(f"{base_url}/health", timeout=300) as response:
+                response.read()
+            health.append((time.perf_counter() - start) * 1000)
+            time.sleep(HEALTH_INTERVAL)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        process.terminate()
+        process.wait()
+
+    health.sort()
+    return {
+        "health_p50_ms": statistics.median(health),
+        "health_p99_ms": health[math.ceil(len(health) * 0.99) - 1],
+        "health_max_ms": health[-1],
+        "searches": len(searches),
+        "search_p50_s": statistics.median(searches) if searches else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure /health latency while heavy searches run")
+    parser.add_argument("--size", choices=SIZES, default="10k", help="Dataset size")
+    parser.add_argument("--mode", action="append", choices=["inline", "thread", "process"],
+                        help="SEARCH_EXECUTOR to measure (repeatable, default: all)")
+    parser.add_argument("--clients", type=int, default=2, help="Concurrent search clients")
+    parser.add_argument("--seconds", type=float, default=15.0, help="Measurement time per mode")
+    parser.add_argument("--database-url", help="Database (default: the benchmark SQLite file for --size)")
+    args = parser.parse_args()
+
+    database_url = args.database_url or default_database_url(args.size)
+    if not args.database_url:
+        os.makedirs("benchmarks/data", exist_ok=True)
+        os.environ["DATABASE_URL"] = database_url
+        from sqlalchemy import create_engine
+        build_dataset(create_engine(database_url), SIZES[args.size])
+
+    base_env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "ENVIRONMENT": "benchmark",
+        "SCHEMA_STARTUP_MODE": "skip",
+        "STARTUP_WARM_CACHES": "true",
+        "PYTHONPATH": os.getcwd(),
+    }
+
+    print(f"/health latency with {args.clients} clients running wide searches ({args.size} vendors, {args.seconds:.0f}s per mode)")
+    print(f"  {'mode':<8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'searches':>9} {'search p50 s':>13}")
+    for mode in args.mode or ["inline", "thread", "process"]:
+        result = run_mode({**base_env, "SEARCH_EXECUTOR": mode}, args.clients, args.seconds)
+        print(
+            f"  {mode:<8} {result['health_p50_ms']:>8.1f} {result['health_p99_ms']:>8.1f} "
+            f"{result['health_max_ms']:>8.1f} {result['searches']:>9} {result['search_p50_s']:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Import-time profile and startup budget check for the API process.
+
+Imports app.main in fresh interpreters with ``python -X importtime``,
+prints the slowest modules (cumulative and self time) and the self time
+per top-level package, then enforces two budgets:
+
+- app.main must import within --budget-ms (median over --runs)
+- rarely used modules (LAZY_MODULES) must not be imported at startup;
+  they load on first use from the endpoints/CLIs that need them
+
+Exits 1 when a budget is exceeded, so it can gate CI.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --runs 10 --budget-ms 1200 --top 40
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+# Import budget for app.main in milliseconds (median); override with --budget-ms
+DEFAULT_BUDGET_MS = float(os.environ.get("IMPORT_BUDGET_MS", 1500))
+
+# Modules that must stay off the startup path
+LAZY_MODULES = (
+    "app.seed",
+    "app.synthetic",
+    "app.bulk_load",
+    "app.importer",
+    "app.exporter",
+    "app.services.import_service",
+    "app.services.columnar_search",
+    "alembic",
+    "numpy",
+    "multiprocessing",  # the SEARCH_EXECUTOR=process pool, started on first use
+    "concurrent.futures.process",
+)
+
+
+def _env() -> dict:
+    return {**os.environ, "PYTHONPATH": os.getcwd()}
+
+
+def profile_once() -> dict:
+    """{module: (self_us, cumulative_us)} for one fresh import of app.main."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=_env(), capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def imported_lazy_modules() -> list:
+    """LAZY_MODULES (or their submodules) present after importing app.main."""
+    code = (
+        "import sys, app.main; "
+        f"lazy = {LAZY_MODULES!r}; "
+        "print('\\n'.join(m for m in sys.modules if m in lazy or m.startswith(tuple(l + '.' for l in lazy))))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], env=_env(), capture_output=True, text=True, check=True)
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile app.main import time and enforce a budget")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh imports to measure")
+    parser.add_argument("--top", type=int, default=25, help="Modules to list")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Maximum median import time")
+    args = parser.parse_args()
+
+    runs = [profile_once() for _ in range(args.runs)]
+    totals = [run["app.main"][1] / 1000 for run in runs]
+    median_ms = statistics.median(totals)
+    profile = runs[totals.index(sorted(totals)[len(totals) // 2])]
+
+    print(f"\nSlowest imports (cumulative, run closest to the median):")
+    print(f"  {'cumulative ms':>13} {'self ms':>8}  module")
+    for name, (self_us, cumulative_us) in sorted(profile.items(), key=lambda m: m[1][1], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:>13.1f} {self_us / 1000:>8.1f}  {name}")
+
+    packages = defaultdict(int)
+    for name, (self_us, _) in profile.items():
+        packages[name.split(".")[0]] += self_us
+    print(f"\nSelf time by top-level package:")
+    for package, self_us in sorted(packages.items(), key=lambda p: p[1], reverse=True)[:15]:
+        print(f"  {self_us / 1000:>8.1f} ms  {package}")
+
+    failures = []
+    print(f"\napp.main import: median {median_ms:.1f} ms over {args.runs} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f}); budget {args.budget_ms:.0f} ms")
+    if median_ms > args.budget_ms:
+        failures.append(f"import time {median_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+
+    eager = imported_lazy_modules()
+    if eager:
+        failures.append(f"modules that should load lazily were imported at startup: {', '.join(eager)}")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Within import budget")
+
+
+if __name__ == "__main__":
+    main()
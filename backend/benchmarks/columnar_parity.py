@@ -0,0 +1,306 @@
+"""
+Parity check of the columnar search engine against the SQL/ORM path.
+
+Loads a synthetic dataset into a temporary SQLite database (or
+--database-url), adds edge cases (NULL prices and flags, vendors without
+items, mixed-case names), then runs a matrix of searches through both
+engines and compares the complete ranked result lists: same vendors with
+identical response fields, in the same order (both engines return vendors
+with equal sort values in id order), and the same preference facet counts.
+
+Then writes through the ORM (a vote, a new vendor, a deleted vendor) and the
+importer, and checks that the incrementally refreshed snapshot equals a
+fresh full load (including its catalog version, after ORM writes) and still
+matches SQL.
+
+Exits 1 on any mismatch, so it can gate CI.
+
+Usage (from the backend directory):
+    python -m benchmarks.columnar_parity
+    python -m benchmarks.columnar_parity --vendors 3000 --verbose
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+
+PREFERENCE_SETS = [[], ["vegetarian"], ["vegan", "gluten_free"], ["keto", "unknown_pref"]]
+
+USER_MODES = {
+    "none": lambda prefs: {},
+    "single": lambda prefs: {"user1_preferences": prefs},
+    "single+price": lambda prefs: {"user1_preferences": prefs, "user1_max_price": 12.0},
+    "user2": lambda prefs: {"user2_preferences": prefs, "user2_max_price": 15.0},
+    "dual+price": lambda prefs: {
+        "user1_preferences": prefs, "user1_max_price": 14.0,
+        "user2_preferences": ["high_protein"], "user2_max_price": 11.0,
+    },
+    "group": lambda prefs: {"users": [
+        {"preferences": prefs, "max_price": 16.0},
+        {"preferences": ["vegetarian"]},
+        {},
+        {"preferences": ["gluten_free"], "max_price": 13.0},
+    ]},
+}
+
+SORTS = [("item_count", "desc"), ("rating", "desc"), ("rating", "asc"), ("distance", "asc")]
+
+# (name, request fields) beyond the matrix: text search, vendor filters, pages
+EXTRA_CASES = [
+    ("query:burger", {"search_query": "burger"}),
+    ("query:BURGER+vegetarian", {"search_query": "  BURGER ", "user1_preferences": ["vegetarian"]}),
+    ("query:main+dual", {"search_query": "main", "user1_preferences": ["vegan"], "user2_max_price": 10.0}),
+    ("query:wildcard (SQL)", {"search_query": "b%r"}),
+    ("query:non-ascii (SQL)", {"search_query": "café"}),
+    ("filters:delivery", {"vendor_filters": ["delivery"]}),
+    ("filters:usa+takeout", {"vendor_filters": ["USA", "takeout "], "user1_preferences": ["vegetarian"]}),
+    ("filters:open", {"vendor_filters": ["open"], "sort_by": "rating"}),
+    ("filters:unknown", {"vendor_filters": ["rooftop"]}),
+    ("price:only", {"user1_max_price": 9.5, "sort_by": "rating"}),
+    ("distance:no-location", {"sort_by": "distance"}),
+    ("distance:lat-only", {"lat": 45.68, "sort_by": "distance"}),
+    ("page:3", {"user1_preferences": ["vegetarian"], "page": 3, "page_size": 7}),
+    ("group:one", {"users": [{"preferences": ["vegan"], "max_price": 12.0}]}),
+    ("group:inactive", {"users": [{}, {}, {}], "sort_by": "rating"}),
+    ("group:eight", {"users": [
+        {"preferences": [pref], "max_price": 10.0 + i} for i, pref in enumerate(
+            ["vegetarian", "vegan", "gluten_free", "no_milk", "organic", "halal", "kosher", "unknown_pref"]
+        )
+    ]}),
+    ("group:query", {"search_query": "main", "users": [
+        {"preferences": ["vegan"]}, {"max_price": 9.0}, {"preferences": ["keto"], "max_price": 20.0},
+    ]}),
+]
+
+
+def build_cases():
+    from app.seed import BOZEMAN_LAT, BOZEMAN_LNG
+
+    for prefs, mode, (sort_by, direction), located in itertools.product(
+        PREFERENCE_SETS, USER_MODES, SORTS, (False, True)
+    ):
+        fields = USER_MODES[mode](prefs)
+        fields.update(sort_by=sort_by, sort_direction=direction)
+        if located:
+            fields.update(lat=BOZEMAN_LAT, lng=BOZEMAN_LNG)
+        name = f"{'+'.join(prefs) or 'any'}/{mode}/{sort_by}-{direction}/{'near' if located else 'all'}"
+        yield name, fields
+    yield from EXTRA_CASES
+
+
+def load_dataset(engine, vendor_count: int) -> None:
+    """Synthetic vendors plus rows exercising NULL and empty-menu semantics."""
+    from sqlalchemy import func, select, text
+
+    from app import bulk_load
+    from app.database import Base
+    from app.models.vendor import Vendor
+    from app.services.item_group_service import ItemGroupService
+    from app.synthetic import SyntheticConfig, generate
+
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(Vendor.__table__)).scalar():
+            return
+    bulk_load.load(engine, generate(SyntheticConfig(vendors=vendor_count, seed=7)), batch_size=2_000)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE items SET price = NULL WHERE id % 23 = 0"))
+        conn.execute(text("UPDATE items SET vegan = NULL, keto = NULL WHERE id % 29 = 0"))
+        conn.execute(text("UPDATE items SET name = upper(name) WHERE id % 7 = 0"))
+        conn.execute(text("UPDATE vendors SET name = upper(name), cuisine_usa = NULL WHERE id % 11 = 0"))
+        conn.execute(text("DELETE FROM items WHERE vendor_id % 97 = 0"))
+        ItemGroupService.rebuild(conn)  # raw SQL bypasses the ORM hook
+
+
+def sql_results(db, request):
+    """All SQL/ORM path results of a search, in result order, before pagination, and its facets."""
+    from app.services.facet_service import FacetCounter
+    from app.services.vendor_service import VendorService
+
+    vendors = VendorService._fetch_search_vendors(db, request)
+    user_count = len(request.user_filters())
+    facets = FacetCounter(user_count, VendorService._text_groups(db, request)) if request.facets else None
+    entries = sorted(VendorService._sort_entries(vendors, request, facets=facets))
+    results = [VendorService._process_single_vendor(vendors[index], request) for *_, index in entries]
+    return results, facets.facets() if facets is not None else None
+
+
+def compare(expected, actual) -> str:
+    """Empty string if the ranked lists are identical, else the first difference."""
+    if len(expected) != len(actual):
+        return f"{len(actual)} results, expected {len(expected)}"
+    for position, (want, got) in enumerate(zip(expected, actual)):
+        if want != got:
+            return f"at position {position}: expected {want.model_dump()}, got {got.model_dump()}"
+    return ""
+
+
+def check_case(db, name: str, fields: dict, verbose: bool, timings: dict) -> bool:
+    from app.schemas.vendor import VendorSearchRequest
+    from app.services.columnar_search import ColumnarSearch
+
+    request = VendorSearchRequest(**fields, facets=True)
+
+    start = time.perf_counter()
+    expected, expected_facets = sql_results(db, request)
+    timings["sql"] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    ranked = ColumnarSearch.snapshot().rank(request)
+    page = ColumnarSearch.search_vendors(db, request)
+    timings["columnar"] += time.perf_counter() - start
+
+    if ranked is None:
+        ok = page is None  # Unsupported requests must be handed to SQL
+        problem = "" if ok else "expected a fallback to SQL"
+        detail = "falls back to SQL"
+    else:
+        problem = compare(expected, ranked.responses())
+        offset = (request.page - 1) * request.page_size
+        page_keys = [v.id for v in page[0]] if page else None
+        if not problem and (page is None or page[1] != len(expected)
+                            or page_keys != [v.id for v in ranked.responses(offset, offset + request.page_size)]):
+            problem = "page does not match the ranked results"
+        if not problem and page is not None and page[2] != expected_facets:
+            problem = f"facets {page[2].model_dump()}, expected {expected_facets.model_dump()}"
+        ok = not problem
+        detail = f"{len(expected)} results"
+
+    if not ok:
+        print(f"❌ {name}: {problem}")
+    elif verbose:
+        print(f"✅ {name}: {detail}")
+    return ok
+
+
+def snapshots_equal(a, b) -> str:
+    """Empty string if two snapshots hold the same data."""
+    import numpy as np
+
+    for field in ("vendor_ids", "vendor_lat", "vendor_lng", "vendor_filters", "item_ids", "item_vendor",
+                  "item_flags", "item_upvotes", "item_total_votes"):
+        if not np.array_equal(getattr(a, field), getattr(b, field)):
+            return field
+    if not np.array_equal(a.item_price, b.item_price, equal_nan=True):
+        return "item_price"
+    for field in ("vendors", "vendor_text", "item_names"):
+        if list(getattr(a, field)) != list(getattr(b, field)):
+            return field
+    return ""
+
+
+def check_refresh(engine, db, verbose: bool) -> bool:
+    """Write through the ORM and the importer; compare the refreshed snapshot with a full load."""
+    from sqlalchemy import select
+
+    from app.importer import import_records
+    from app.models.item import Item
+    from app.models.vendor import Vendor
+    from app.services.columnar_search import ColumnarSearch
+
+    def vote(session):
+        item = session.scalars(select(Item).order_by(Item.id).limit(1)).one()
+        item.upvotes += 5
+        item.total_votes += 5
+
+    def add_vendor(session):
+        vendor = Vendor(name="Parity Vegan Kitchen", lat=45.677, lng=-111.04, delivery=True)
+        vendor.items = [
+            Item(name="Tofu Bowl", price=11.0, vegan=True, vegetarian=True, upvotes=9, total_votes=10),
+            Item(name="Lentil Soup", price=None, vegan=True, gluten_free=True, upvotes=3, total_votes=4),
+        ]
+        session.add(vendor)
+
+    def move_item(session):
+        item = session.scalars(select(Item).order_by(Item.id.desc()).limit(1)).one()
+        item.vendor_id = session.scalars(select(Vendor.id).order_by(Vendor.id).limit(1)).one()
+
+    def delete_vendor(session):
+        session.delete(session.scalars(select(Vendor).order_by(Vendor.id.desc()).limit(1)).one())
+
+    records = "\n".join(json.dumps(record) for record in [
+        {"name": "Imported Keto Grill", "lat": 45.69, "lng": -111.03, "takeout": True,
+         "items": [{"name": "Steak Salad", "price": 16.5, "dietary_flags": {"keto": True, "gluten_free": True}}]},
+        {"name": "Imported Cafe", "lat": 45.66, "lng": -111.05, "items": []},
+    ])
+
+    changes = [
+        ("ORM vote", vote), ("ORM new vendor", add_vendor), ("ORM item moved", move_item),
+        ("ORM vendor deleted", delete_vendor),
+        ("import", lambda session: import_records(io.StringIO(records), "vendors", "jsonl", engine=engine)),
+    ]
+    ok = True
+    for name, change in changes:
+        change(db)
+        db.commit()
+        ColumnarSearch.wait_for_refresh()
+        full = ColumnarSearch._read(engine)
+        difference = snapshots_equal(ColumnarSearch.snapshot(), full)
+        if not difference and name != "import" and not ColumnarSearch.covers(full.catalog_version):
+            difference = "catalog_version"  # ORM commits advance it; imports wait for a reload
+        if difference:
+            ok = False
+            print(f"❌ refresh after {name}: {difference} differs from a full load")
+            continue
+        results = [
+            check_case(db, f"{name}/{case}", fields, verbose, {"sql": 0.0, "columnar": 0.0})
+            for case, fields in [
+                ("rating", {"sort_by": "rating"}),
+                ("vegan", {"user1_preferences": ["vegan"], "user1_max_price": 12.0}),
+            ]
+        ]
+        ok = ok and all(results)
+        if all(results):
+            print(f"✅ refresh after {name}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the columnar search engine with the SQL path")
+    parser.add_argument("--database-url", help="Database to use (default: a temporary SQLite file)")
+    parser.add_argument("--vendors", type=int, default=1000, help="Synthetic vendors to load into an empty database")
+    parser.add_argument("--verbose", action="store_true", help="Print every case")
+    args = parser.parse_args()
+
+    temp_dir = None
+    database_url = args.database_url
+    if not database_url:
+        temp_dir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(temp_dir.name, 'parity.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["ENVIRONMENT"] = "benchmark"
+    os.environ["SEARCH_ENGINE"] = "columnar"
+
+    from app.database import SessionLocal, engine
+    from app.services.columnar_search import ColumnarSearch
+
+    if not ColumnarSearch.available():
+        print("❌ numpy is not installed")
+        sys.exit(1)
+
+    load_dataset(engine, args.vendors)
+    snapshot = ColumnarSearch.load(engine)
+    print(f"Columnar parity on {engine.dialect.name}: {snapshot.vendor_count} vendors, {snapshot.item_count} items")
+
+    timings = {"sql": 0.0, "columnar": 0.0}
+    with SessionLocal() as db:
+        cases = list(build_cases())
+        results = [check_case(db, name, fields, args.verbose, timings) for name, fields in cases]
+        passed = sum(results)
+        print(f"{'✅' if passed == len(cases) else '❌'} {passed}/{len(cases)} searches match "
+              f"(SQL {timings['sql']:.2f}s, columnar {timings['columnar']:.2f}s)")
+        refreshed = check_refresh(engine, db, args.verbose)
+
+    engine.dispose()
+    if temp_dir is not None:
+        temp_dir.cleanup()
+    if passed != len(cases) or not refreshed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Reproducible benchmark datasets.
+
+Builds vendor/item tables with the synthetic generator (app/synthetic.py)
+at a given size. Each vendor copies a seed template menu with jittered
+prices and a random subset of items, so dietary flag distributions match
+the seed data. Vendors are spread around Bozeman with a radius growing with
+the dataset size, keeping vendor density roughly constant.
+"""
+from sqlalchemy import func, inspect, select
+
+SIZES = {"100": 100, "10k": 10_000, "100k": 100_000}
+
+BATCH_SIZE = 2_000
+
+
+def default_database_url(size_name: str) -> str:
+    return f"sqlite:///benchmarks/data/search_{size_name}.db"
+
+
+def dataset_config(vendor_count: int, seed: int = 42):
+    """
+    Generator settings for benchmark datasets.
+
+    Template flags are kept as-is (no correlations or noise) so datasets
+    stay identical to the ones stored baselines were measured on.
+    """
+    from app.synthetic import SyntheticConfig
+
+    return SyntheticConfig(vendors=vendor_count, seed=seed, correlations=False)
+
+
+def build_dataset(engine, vendor_count: int, seed: int = 42, rebuild: bool = False) -> bool:
+    """
+    Create tables and load a dataset of vendor_count vendors into engine.
+
+    Skips the load if the database already holds vendor_count vendors
+    (unless rebuild is set, or its tables predate columns of the current
+    models). Returns True if data was (re)loaded.
+    """
+    from app import bulk_load
+    from app.database import Base
+    from app.models.item_group import ItemGroup
+    from app.models.vendor import Vendor
+    from app.services.item_group_service import ItemGroupService
+    from app.synthetic import generate
+
+    Base.metadata.create_all(bind=engine)
+
+    with engine.connect() as conn:
+        inspector = inspect(conn)
+        outdated = any(
+            {column.name for column in table.columns} - {column["name"] for column in inspector.get_columns(table.name)}
+            for table in Base.metadata.sorted_tables
+        )
+        existing = conn.execute(select(func.count()).select_from(Vendor.__table__)).scalar()
+        has_groups = conn.execute(select(func.count()).select_from(ItemGroup.__table__)).scalar() > 0
+    if existing == vendor_count and not rebuild and not outdated:
+        if existing and not has_groups:
+            # Built before item groups existed
+            with engine.begin() as conn:
+                ItemGroupService.rebuild(conn)
+        return False
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    bulk_load.load(engine, generate(dataset_config(vendor_count, seed)), batch_size=BATCH_SIZE)
+    return True
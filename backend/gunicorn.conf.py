@@ -0,0 +1,47 @@
+"""
+Gunicorn settings for multi-worker deployments (uvicorn workers).
+
+Usage (from the backend directory):
+    gunicorn -c gunicorn.conf.py app.main:app
+
+WEB_CONCURRENCY sets the number of worker processes (default: available
+CPUs, capped at 4). Search post-processing is CPU-bound Python, so workers
+rather than threads are what spread it across cores. Set CACHE_BACKEND=sqlite
+so workers share cached payloads and search responses.
+"""
+import os
+import sys
+
+
+def _available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):  # Linux: respects CPU pinning
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", min(_available_cpus(), 4)))
+
+# Import the app once in the master and fork it into the workers (faster
+# worker boot, shared memory pages). Set GUNICORN_PRELOAD=false to import
+# the app in each worker instead.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+
+def post_fork(server, worker):
+    """
+    Drop database connections inherited from the master.
+
+    ``close=False`` leaves the parent's connections open for the parent
+    and gives this worker a fresh, empty pool, so no socket is ever shared
+    between processes.
+    """
+    if "app.database" in sys.modules:
+        from app.database import engine
+
+        engine.dispose(close=False)
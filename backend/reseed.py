@@ -1,18 +1,17 @@
-"""Drop all data and reseed the database with new pattern."""
-from app.database import SessionLocal, engine, Base
-from app.models.vendor import Vendor
-from app.models.item import Item
+"""Reseed the database with the seed restaurants without dropping tables.
 
-db = SessionLocal()
+Data is loaded into staging tables and swapped in atomically, so a running
+API keeps serving the current catalog until the swap commits.
+"""
+from app.seed import build_seed_rows
+from app.services.import_service import ImportService
 
-# Drop all tables and recreate
-print("Dropping all tables...")
-Base.metadata.drop_all(bind=engine)
-print("Creating tables...")
-Base.metadata.create_all(bind=engine)
 
-# Now run seed
-from app.seed import seed_database
-print("Seeding database...")
-seed_database()
-print("Done! Database reseeded with new varied patterns.")
+def report(stage, **progress):
+    details = ", ".join(f"{key}={value}" for key, value in progress.items())
+    print(f"  {stage}{': ' + details if details else ''}")
+
+
+print("Reseeding database...")
+result = ImportService.reseed(build_seed_rows(), progress=report)
+print(f"Done! Swapped in {result['vendors']} vendors / {result['items']} items.")
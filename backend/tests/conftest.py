@@ -0,0 +1,25 @@
+import pytest
+from sqlalchemy import create_engine
+
+from app import database
+from app.config import settings
+
+
+@pytest.fixture(scope="module")
+def sqlite_engine(tmp_path_factory):
+    """
+    An empty SQLite database for one test module. app.database's engine and
+    sessions, and settings.DATABASE_URL (read by Alembic), point at it.
+    """
+    url = f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}"
+    engine = create_engine(url)
+    previous = database.SessionLocal.kw["bind"]
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(settings, "DATABASE_URL", url)
+        monkeypatch.setattr(database, "engine", engine)
+        database.SessionLocal.configure(bind=engine)
+        try:
+            yield engine
+        finally:
+            database.SessionLocal.configure(bind=previous)
+            engine.dispose()
@@ -0,0 +1,51 @@
+"""Admin endpoint authentication and the /admin/import upload limit."""
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+
+TOKEN = "test-admin-token"
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", TOKEN)
+    monkeypatch.setattr(settings, "IMPORT_MAX_UPLOAD_BYTES", 1000)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    return TestClient(app)  # Not entered: no lifespan, so no schema checks
+
+
+def auth(token=TOKEN):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_admin_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+    assert client.get("/api/v1/admin/jobs", headers=auth()).status_code == 403
+
+
+@pytest.mark.parametrize("headers", [{}, auth("wrong")], ids=["missing", "wrong"])
+def test_admin_requires_token(client, headers):
+    assert client.get("/api/v1/admin/jobs", headers=headers).status_code == 401
+    assert client.post("/api/v1/admin/import", content=b"{}", headers=headers).status_code == 401
+    assert client.post("/seed", headers=headers).status_code == 401
+
+
+def test_admin_with_token(client):
+    assert client.get("/api/v1/admin/jobs", headers=auth()).status_code == 200
+
+
+def test_import_rejects_declared_oversize_body(client, tmp_path):
+    response = client.post("/api/v1/admin/import", content=b"x" * 1001, headers=auth())
+    assert response.status_code == 413
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_import_rejects_oversize_chunked_body(client, tmp_path):
+    chunks = (b"x" * 300 for _ in range(4))  # No Content-Length
+    response = client.post("/api/v1/admin/import", content=chunks, headers=auth())
+    assert response.status_code == 413
+    assert list(tmp_path.iterdir()) == []
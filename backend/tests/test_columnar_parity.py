@@ -0,0 +1,46 @@
+"""
+Columnar search engine against the SQL path (see benchmarks/columnar_parity.py),
+on a reduced case set: every seventh case of the matrix plus the extra cases.
+"""
+import pytest
+
+pytest.importorskip("numpy")
+
+from benchmarks.columnar_parity import EXTRA_CASES, build_cases, check_case, check_refresh, load_dataset  # noqa: E402
+
+MATRIX = list(build_cases())[:-len(EXTRA_CASES)]
+CASES = MATRIX[::7] + EXTRA_CASES
+
+
+@pytest.fixture(scope="module")
+def engine(sqlite_engine):
+    from app.config import settings
+    from app.services import columnar_search
+    from app.services.columnar_search import ColumnarSearch
+
+    load_dataset(sqlite_engine, 200)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(settings, "SEARCH_ENGINE", "columnar")
+        # Module state: later tests must not refresh this database's snapshot
+        monkeypatch.setattr(columnar_search, "_snapshot", None)
+        monkeypatch.setattr(columnar_search, "_engine", None)
+        ColumnarSearch.load(sqlite_engine)
+        yield sqlite_engine
+
+
+@pytest.fixture
+def db(engine):
+    from app.database import SessionLocal
+
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.mark.parametrize("fields", [fields for _, fields in CASES], ids=[name for name, _ in CASES])
+def test_search_matches_sql(db, request, fields):
+    assert check_case(db, request.node.callspec.id, fields, False, {"sql": 0.0, "columnar": 0.0})
+
+
+def test_refresh_matches_full_load(engine, db):
+    # Writes to the dataset, so it runs last
+    assert check_refresh(engine, db, False)
@@ -0,0 +1,82 @@
+"""
+Preference facet counts against the searches they predict: for every user
+and preference, the count must equal the result count of the search with
+that preference added, on each search path.
+"""
+import pytest
+
+from app.config import settings
+from app.schemas.vendor import UserFilters, VendorSearchRequest
+from app.seed import BOZEMAN_LAT, BOZEMAN_LNG
+from app.services.vendor_service import VendorService
+from benchmarks.columnar_parity import load_dataset
+
+CASES = {
+    "any": {},
+    "query+inactive-user2": {"search_query": "  BURGER ", "user1_preferences": ["vegetarian"]},
+    "price-only-user1": {"user1_max_price": 9.5},
+    "unknown-pref+price": {
+        "user1_preferences": ["unknown_pref"], "user2_preferences": ["vegan"], "user2_max_price": 10.0
+    },
+    "query+dual": {"search_query": "main", "user1_preferences": ["vegan"], "user2_max_price": 10.0},
+    "near+delivery": {
+        "lat": BOZEMAN_LAT, "lng": BOZEMAN_LNG, "vendor_filters": ["delivery"], "user2_preferences": ["keto"]
+    },
+    "group": {"users": [{"preferences": ["vegetarian"]}, {}, {"max_price": 8.0}]},
+}
+
+
+@pytest.fixture(scope="module")
+def dataset(sqlite_engine):
+    load_dataset(sqlite_engine, 120)
+    return sqlite_engine
+
+
+@pytest.fixture(params=["sql", "sql-batch", "columnar"])
+def search(request, dataset, monkeypatch):
+    """The search path under test: request -> (results, total, facets)."""
+    from app.database import SessionLocal
+
+    if request.param == "columnar":
+        pytest.importorskip("numpy")
+        from app.services import columnar_search
+        from app.services.columnar_search import ColumnarSearch
+
+        monkeypatch.setattr(settings, "SEARCH_ENGINE", "columnar")
+        monkeypatch.setattr(columnar_search, "_snapshot", None)
+        monkeypatch.setattr(columnar_search, "_engine", None)
+
+    with SessionLocal() as db:
+        if request.param == "sql":
+            yield lambda search_request: VendorService._search_sql(db, search_request)
+        elif request.param == "sql-batch":
+            # A second search with the same candidates makes it a shared fetch
+            yield lambda search_request: VendorService.search_batch(
+                db, [search_request, search_request.model_copy(update={"page": 2})]
+            )[0]
+        else:
+            def columnar(search_request):
+                result = ColumnarSearch.search_vendors(db, search_request)
+                assert result is not None, "fell back to SQL"
+                return result
+
+            yield columnar
+
+
+def with_preference(request: VendorSearchRequest, index: int, preference: str) -> VendorSearchRequest:
+    users = list(request.user_filters())
+    users[index] = UserFilters(preferences=[*users[index].preferences, preference], max_price=users[index].max_price)
+    return request.model_copy(update={"users": users, "facets": False})
+
+
+@pytest.mark.parametrize("fields", CASES.values(), ids=CASES.keys())
+def test_facet_counts_match_facet_searches(search, fields):
+    request = VendorSearchRequest(**fields, facets=True)
+    _, _, facets = search(request)
+    mismatches = []
+    for index, counts in enumerate(facets.users):
+        for preference, count in counts.items():
+            _, total, _ = search(with_preference(request, index, preference))
+            if count != total:
+                mismatches.append(f"user {index + 1} {preference}: facet {count}, search {total}")
+    assert mismatches == []
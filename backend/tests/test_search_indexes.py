@@ -0,0 +1,22 @@
+"""
+Search queries use the search indexes (see benchmarks/explain_search.py),
+on a temporary SQLite database migrated to head.
+"""
+import pytest
+
+from benchmarks.explain_search import SCENARIOS, capture_statements, explain, load_dataset, migrate
+
+
+@pytest.fixture(scope="module")
+def engine(sqlite_engine):
+    migrate(str(sqlite_engine.url))
+    load_dataset(sqlite_engine, 500)
+    return sqlite_engine
+
+
+@pytest.mark.parametrize("fields, expected", [s[1:] for s in SCENARIOS], ids=[s[0] for s in SCENARIOS])
+def test_search_uses_indexes(engine, fields, expected):
+    used = set()
+    for statement, parameters in capture_statements(engine, fields):
+        used |= explain(engine, statement, parameters)[1]
+    assert expected <= used, f"missing {sorted(expected - used)}, used {sorted(used)}"
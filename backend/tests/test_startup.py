@@ -0,0 +1,29 @@
+"""
+Startup path of the API process (see benchmarks/bench_import.py).
+
+app.main is imported in fresh interpreters, so modules already loaded by
+other tests do not count. The wall-clock budget is only checked when
+IMPORT_BUDGET_MS is set: timings on shared runners are too noisy to gate on
+by default.
+"""
+import os
+import statistics
+
+import pytest
+
+from benchmarks.bench_import import DEFAULT_BUDGET_MS, imported_lazy_modules, profile_once
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_lazy_modules_not_imported_at_startup(monkeypatch):
+    monkeypatch.chdir(BACKEND_DIR)
+    assert imported_lazy_modules() == []
+
+
+@pytest.mark.skipif("IMPORT_BUDGET_MS" not in os.environ, reason="set IMPORT_BUDGET_MS to check the import time")
+def test_import_within_budget(monkeypatch):
+    monkeypatch.chdir(BACKEND_DIR)
+    profile_once()  # Not measured: the first import may write bytecode caches
+    totals = [profile_once()["app.main"][1] / 1000 for _ in range(3)]
+    assert statistics.median(totals) <= DEFAULT_BUDGET_MS, f"app.main imports in {totals} ms"
@@ -0,0 +1,103 @@
+"""
+Change version allocation and the catalog version delta sync trusts.
+
+The PostgreSQL tests run against an empty scratch database given by
+TEST_POSTGRESQL_URL (its tables are recreated).
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.item import Item
+from app.models.vendor import Vendor
+from app.services.sync_service import SyncPage, SyncService
+
+POSTGRESQL_URL = os.environ.get("TEST_POSTGRESQL_URL")
+
+
+def add_vendors(engine, count: int) -> None:
+    with sessionmaker(bind=engine)() as session:
+        for index in range(count):
+            vendor = Vendor(name=f"Vendor {index}", lat=45.68, lng=-111.04)
+            vendor.items = [Item(name="Bowl", price=10.0, upvotes=0, total_votes=0)]
+            session.add(vendor)
+        session.commit()
+
+
+@pytest.fixture(params=["sqlite", pytest.param("postgresql", marks=pytest.mark.skipif(
+    not POSTGRESQL_URL, reason="set TEST_POSTGRESQL_URL to a scratch PostgreSQL database"
+))])
+def engine(request, sqlite_engine):
+    if request.param == "sqlite":
+        engine = sqlite_engine
+    else:
+        engine = create_engine(POSTGRESQL_URL)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    add_vendors(engine, 2)
+    yield engine
+    if engine is not sqlite_engine:
+        engine.dispose()
+
+
+def test_reserve_hands_out_new_ascending_versions(engine):
+    with engine.begin() as conn:
+        before = SyncService.state(conn)
+        versions = SyncService.reserve(conn, 5)
+    assert versions == sorted(set(versions)) and len(versions) == 5
+    assert versions[0] > before.allocated
+    with engine.connect() as conn:
+        assert SyncService.state(conn).version >= versions[-1]
+
+
+def test_orm_commit_records_its_versions(engine):
+    with sessionmaker(bind=engine)() as session:
+        item = session.scalars(select(Item).limit(1)).one()
+        item.upvotes += 1
+        session.flush()
+        first, last = SyncService.reserved_range(session)
+        session.commit()
+        assert (item.change_version, item.vendor.change_version) == (first, last)
+
+
+def test_sync_since_the_catalog_version_is_empty(engine):
+    with engine.connect() as conn:
+        version = SyncService.state(conn).version
+        page = SyncPage(conn, version, 100)
+        assert list(page) == [] and not page.reset and page.next_since == version
+
+
+@pytest.mark.skipif(not POSTGRESQL_URL, reason="set TEST_POSTGRESQL_URL to a scratch PostgreSQL database")
+def test_concurrent_writers_do_not_wait_and_sync_skips_nothing():
+    engine = create_engine(POSTGRESQL_URL)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    add_vendors(engine, 2)
+    Session = sessionmaker(bind=engine)
+    with engine.connect() as conn:
+        since = SyncService.state(conn).version
+
+    with Session() as first, Session() as second:
+        first_item = first.scalars(select(Item).order_by(Item.id).limit(1)).one()
+        first_item.upvotes += 1
+        first.flush()  # Takes the lower versions and stays open
+        second_item = second.scalars(select(Item).order_by(Item.id.desc()).limit(1)).one()
+        second_item.upvotes += 1
+        changed_ids = {first_item.id, second_item.id}
+        # Fails instead of waiting for `first`, as it would if versions were taken under a row lock
+        second.connection().exec_driver_sql("SET LOCAL lock_timeout = '2s'")
+        second.commit()
+
+        with engine.connect() as conn:
+            page = SyncPage(conn, since, 100)
+            assert list(page) == [], "changes above an open transaction's versions must wait"
+            since = page.next_since
+        first.commit()
+
+    with engine.connect() as conn:
+        changed = {change.data["id"] for change in SyncPage(conn, since, 100) if change.kind == "item"}
+    assert changed == changed_ids
+    engine.dispose()